@@ -1,13 +1,36 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from src.Api.chatController import router as chat_router
+from src.Api.Dependencies import AppContainer
+from src.Infrastructure.Database.AsyncConnection import get_async_pool_stats
+from src.SharedKernel.Metrics.Prometheus import CONTENT_TYPE, render_prometheus
+from src.SharedKernel.Tracing.Tracer import format_traceparent, get_tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Constrói o grafo de dependências (handler, factory, resolver, repositórios
+    e memória) uma única vez no startup e o libera no shutdown.
+    """
+    container = AppContainer()
+    await container.startup()
+    app.state.container = container
+    try:
+        yield
+    finally:
+        await container.shutdown()
 
 
 app = FastAPI(
     title="Appointment Chat API",
     version="0.1.0",
     description="API de chat para agendamentos",
+    lifespan=lifespan,
 )
 
 # Configuração de CORS
@@ -22,6 +45,25 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Abre o span raiz de cada requisição (continuando o trace do header
+    ``traceparent``, se houver) e devolve o ``traceparent`` na resposta.
+    """
+    tracer = get_tracer()
+    with tracer.remote_parent(request.headers.get("traceparent")):
+        with tracer.span(
+            "http.request",
+            **{"http.method": request.method, "http.route": request.url.path},
+        ) as span:
+            response = await call_next(request)
+            span.set_attribute("http.status_code", response.status_code)
+            if span.recording:
+                response.headers["traceparent"] = format_traceparent(span)
+            return response
+
+
 app.include_router(chat_router)
 
 
@@ -33,3 +75,32 @@ def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/health/db", tags=["Health"])
+def database_health_check() -> dict:
+    """
+    Estatísticas do pool async do PostgreSQL (tamanho, conexões livres,
+    requisições esperando por conexão etc.) para monitoramento.
+    """
+    return {"status": "ok", "pool": get_async_pool_stats()}
+
+
+@app.get("/metrics", tags=["Health"])
+def metrics() -> Response:
+    """
+    Métricas do processo no formato texto do Prometheus (latência por
+    turno, por agente e por provedor, tokens, cache, retries etc.).
+    """
+    return Response(content=render_prometheus(), media_type=CONTENT_TYPE)
+
+
+@app.get("/debug/traces", tags=["Health"])
+def recent_traces(limit: int = Query(20, ge=1, le=200)) -> dict:
+    """
+    Traces mais recentes guardados em memória, com a árvore de spans de
+    cada turno (HTTP, agentes, LLM, Redis e PostgreSQL). Desligado por
+    padrão (404); liga com TRACING_DEBUG_ENDPOINT=true.
+    """
+    tracer = get_tracer()
+    if not tracer.debug_endpoint:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {"traces": tracer.memory.traces(limit)}
@@ -1,12 +1,90 @@
-from fastapi import APIRouter
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from src.Application.Handlers.Chat.DTOs_.ChatCommand import ChatCommand
 from src.Application.Handlers.Chat.ChatCommandHandler import ChatCommandHandler
+from src.Api.Dependencies import get_chat_command_handler
+from src.SharedKernel.Deadline.Deadline import deadline_scope, start_deadline
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
+logger = get_logger(__name__)
+
+TIMEOUT_DETAIL = "Tempo limite para responder a mensagem excedido"
+
+
+def _turn_timeout(requested: Optional[float]) -> float:
+    """
+    Prazo do turno: CHAT_TURN_TIMEOUT_SECONDS (padrão 60), ou o header
+    X-Request-Timeout do cliente quando ele pede menos que isso.
+    """
+    limit = float(os.getenv("CHAT_TURN_TIMEOUT_SECONDS", "60"))
+    if requested is not None and 0 < requested < limit:
+        return requested
+    return limit
 
 
 @router.post("/chat")
-async def send_message(command: ChatCommand):
-    chat_command_handler = ChatCommandHandler()
-    result = await chat_command_handler.handle(command)
+async def send_message(
+    command: ChatCommand,
+    chat_command_handler: ChatCommandHandler = Depends(get_chat_command_handler),
+    request_timeout: Optional[float] = Header(default=None, alias="X-Request-Timeout"),
+):
+    timeout = _turn_timeout(request_timeout)
+    # O prazo chega aos agentes e às chamadas ao LLM pelo ContextVar; o
+    # wait_for garante o limite do turno mesmo fora das chamadas ao LLM
+    with deadline_scope(timeout):
+        try:
+            result = await asyncio.wait_for(chat_command_handler.handle(command), timeout)
+        except (asyncio.TimeoutError, DeadlineExceededError) as exc:
+            logger.warning("Turno da sessão %s excedeu o prazo de %ss: %r", command.session_id, timeout, exc)
+            raise HTTPException(status_code=504, detail=TIMEOUT_DETAIL)
     return {"message": result}
+
+
+@router.post("/chat/stream")
+async def stream_message(
+    command: ChatCommand,
+    chat_command_handler: ChatCommandHandler = Depends(get_chat_command_handler),
+    request_timeout: Optional[float] = Header(default=None, alias="X-Request-Timeout"),
+):
+    """
+    Variante em Server-Sent Events do /chat/chat: emite eventos `delta` com
+    partes da resposta do paciente e um evento `done` com a mensagem completa.
+    """
+    return StreamingResponse(
+        _stream_events(chat_command_handler, command, _turn_timeout(request_timeout)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_events(
+    chat_command_handler: ChatCommandHandler,
+    command: ChatCommand,
+    timeout: float,
+) -> AsyncIterator[str]:
+    parts: list[str] = []
+    try:
+        # No streaming o prazo vale a cada chamada ao LLM (tokens incluídos).
+        # A task que serve a resposta é só desta requisição.
+        start_deadline(timeout)
+        async for delta in chat_command_handler.handle_stream(command):
+            parts.append(delta)
+            yield _format_event("delta", {"delta": delta})
+        yield _format_event("done", {"message": "".join(parts).strip()})
+    except DeadlineExceededError as exc:
+        logger.warning("Streaming da sessão %s excedeu o prazo de %ss: %s", command.session_id, timeout, exc)
+        yield _format_event("error", {"detail": TIMEOUT_DETAIL})
+    except Exception:
+        logger.exception("Erro durante o streaming do chat")
+        yield _format_event("error", {"detail": "Erro ao processar a mensagem"})
+
+
+def _format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,151 @@
+from typing import Optional
+
+from fastapi import Request
+
+from src.Application.Handlers.Chat.ChatCommandHandler import ChatCommandHandler
+from src.Application.Handlers.Chat.ConversationSummarizer import ConversationSummarizer
+from src.Application.Handlers.Chat.SpeculativeRouting import SpeculativeRouting
+from src.Domain.Chatbot.Routing.TieredIntentRouter import TieredIntentRouter
+from src.Domain.Factories.AgentFactory import AgentFactory
+from src.Domain.Factories.AgentProfiles import AgentProfiles
+from src.Domain.Interfaces.Llm.LlmProviderResolver import LlmProviderResolver
+from src.Domain.Interfaces.Repositories.AsyncPatientRepository import AsyncPatientRepository
+from src.Domain.Interfaces.Repositories.AsyncPatientSymptomRepository import AsyncPatientSymptomRepository
+from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+from src.Infrastructure.Cache.LlmResponseCache import LlmResponseCache
+from src.Infrastructure.Cache.PatientCatalog import PatientCatalog
+from src.Infrastructure.Cache.RedisClient import close_redis_client
+from src.Infrastructure.Database.AsyncConnection import close_async_pool, open_async_pool
+from src.Infrastructure.Database.Connection import close_pool
+from src.Infrastructure.Llm.CachedLlm import CachedLlm
+from src.Infrastructure.Llm.DefaultLlmProviderResolver import DefaultLlmProviderResolver
+from src.Infrastructure.Llm.LlmClientRegistry import close_llm_client_registry
+from src.Infrastructure.Llm.MeteredLlm import MeteredLlm
+from src.Infrastructure.Llm.RetryingLlm import RetryingLlm
+from src.Infrastructure.Repositories.AsyncPatientRepositoryPostgres import AsyncPatientRepositoryPostgres
+from src.Infrastructure.Repositories.AsyncPatientSymptomRepositoryPostgres import AsyncPatientSymptomRepositoryPostgres
+from src.Infrastructure.Routing.RouterDecisionLog import RouterDecisionLog
+from src.SharedKernel.Logging.Logger import get_logger, get_message_logger
+from src.SharedKernel.Observer.Observer import LoggingObserver, MessageSubject
+from src.SharedKernel.Tracing.Tracer import get_tracer
+
+
+class AppContainer:
+    """
+    Grafo de dependências da aplicação.
+
+    É construído uma única vez no startup (lifespan do FastAPI) e compartilhado
+    por todas as requisições. Qualquer dependência pode ser injetada, o que
+    permite substituir Redis/PostgreSQL/LLM por fakes em scripts e benchmarks.
+    """
+
+    def __init__(
+        self,
+        *,
+        llm_provider_resolver: Optional[LlmProviderResolver] = None,
+        agent_factory: Optional[AgentFactory] = None,
+        agent_profiles: Optional[AgentProfiles] = None,
+        response_cache: Optional[LlmResponseCache] = None,
+        patient_repository: Optional[AsyncPatientRepository] = None,
+        patient_symptom_repository: Optional[AsyncPatientSymptomRepository] = None,
+        patient_catalog: Optional[PatientCatalog] = None,
+        chat_memory_store: Optional[ChatMemoryStore] = None,
+        message_subject: Optional[MessageSubject] = None,
+        intent_router: Optional[TieredIntentRouter] = None,
+        router_decision_log: Optional[RouterDecisionLog] = None,
+        speculative_routing: Optional[SpeculativeRouting] = None,
+        conversation_summarizer: Optional[ConversationSummarizer] = None,
+    ):
+        self.logger = get_logger(__name__)
+
+        self.llm_provider_resolver = llm_provider_resolver or DefaultLlmProviderResolver()
+        self.agent_profiles = agent_profiles or AgentProfiles()
+        # Retries por dentro das métricas (a latência medida inclui as novas
+        # tentativas) e cache por fora: acertos não chegam ao LLM nem às
+        # histogramas de latência usadas para ajustar os AgentProfiles; eles
+        # são contados em llm_response_cache_total
+        self.response_cache = response_cache or LlmResponseCache()
+        self.agent_factory = agent_factory or AgentFactory(
+            llm_provider_resolver=self.llm_provider_resolver,
+            agent_profiles=self.agent_profiles,
+            llm_decorators=[
+                RetryingLlm.decorator(),
+                MeteredLlm.decorator(),
+                CachedLlm.decorator(self.response_cache),
+            ],
+        )
+
+        # Repositórios async: nenhuma consulta bloqueia o event loop. As
+        # versões síncronas continuam disponíveis para scripts.
+        self._uses_default_database = (
+            patient_repository is None or patient_symptom_repository is None
+        ) and patient_catalog is None
+        self.patient_repository = patient_repository or AsyncPatientRepositoryPostgres()
+        self.patient_symptom_repository = (
+            patient_symptom_repository or AsyncPatientSymptomRepositoryPostgres()
+        )
+        self.patient_catalog = patient_catalog or PatientCatalog(
+            patient_repository=self.patient_repository,
+            patient_symptom_repository=self.patient_symptom_repository,
+        )
+        self.chat_memory_store = chat_memory_store or ChatMemoryStore()
+
+        if message_subject is None:
+            message_subject = MessageSubject()
+            message_subject.attach(LoggingObserver(get_message_logger()))
+        self.message_subject = message_subject
+
+        self.intent_router = intent_router or TieredIntentRouter()
+        self.router_decision_log = router_decision_log or RouterDecisionLog()
+        self.speculative_routing = speculative_routing or SpeculativeRouting()
+        self.conversation_summarizer = conversation_summarizer or ConversationSummarizer(
+            self.chat_memory_store,
+            llm_provider_resolver=self.llm_provider_resolver,
+        )
+
+        self.chat_command_handler = ChatCommandHandler(
+            agent_factory=self.agent_factory,
+            patient_catalog=self.patient_catalog,
+            chat_memory_store=self.chat_memory_store,
+            message_subject=self.message_subject,
+            intent_router=self.intent_router,
+            router_decision_log=self.router_decision_log,
+            speculative_routing=self.speculative_routing,
+            conversation_summarizer=self.conversation_summarizer,
+        )
+
+        self.logger.info("Container de dependências inicializado")
+
+    async def startup(self) -> None:
+        """
+        Aquece o que precisa estar pronto antes da primeira requisição
+        (pool async do PostgreSQL e catálogo de pacientes).
+        """
+        if self._uses_default_database:
+            await open_async_pool()
+        await self.patient_catalog.start()
+
+    async def shutdown(self) -> None:
+        """
+        Libera os recursos compartilhados (Redis, pool do PostgreSQL,
+        clientes LLM e exportadores de traces), depois de concluir os
+        resumos em andamento e entregar as mensagens pendentes aos
+        observadores.
+        """
+        await self.conversation_summarizer.drain()
+        await self.message_subject.close()
+        await self.patient_catalog.stop()
+        await close_redis_client()
+        await close_async_pool()
+        close_pool()
+        await close_llm_client_registry()
+        get_tracer().shutdown()
+        self.logger.info("Container de dependências finalizado")
+
+
+def get_container(request: Request) -> AppContainer:
+    return request.app.state.container
+
+
+def get_chat_command_handler(request: Request) -> ChatCommandHandler:
+    return get_container(request).chat_command_handler
@@ -1,11 +1,15 @@
-from typing import Any, List, Optional, Tuple
-import random
+import asyncio
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, List, Optional, Tuple
+
 from src.Domain.Chatbot.Abstractions.AgentInterface import (
     AgentInterface,
     AgentType,
     AgentResponse,
 )
+from src.Domain.Chatbot.Routing.TieredIntentRouter import TieredIntentRouter
 from src.Domain.Factories.AgentFactory import AgentFactory
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
 from src.Infrastructure.Llm.DefaultLlmProviderResolver import DefaultLlmProviderResolver
 from src.SharedKernel.Messages.Exceptions import (
     HandlerNotFoundError,
@@ -13,116 +17,422 @@ from src.SharedKernel.Messages.Exceptions import (
     AgentConfigurationError,
     AgentTypeNotFoundError,
 )
-from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Deadline.Deadline import check_deadline
+from src.SharedKernel.Logging.Logger import get_logger, get_message_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+from src.SharedKernel.Tracing.Tracer import Tracer, get_tracer
 from src.SharedKernel.Observer.Observer import MessageSubject, LoggingObserver
 from src.Application.Handlers.Chat.DTOs_.ChatCommand import ChatCommand
+from src.Application.Handlers.Chat.ConversationSummarizer import ConversationSummarizer
+from src.Application.Handlers.Chat.SpeculativeRouting import (
+    SpeculativeRouting,
+    SpeculativeStream,
+    cancel_task,
+)
 
-from src.Infrastructure.Repositories.PatientRepositoryPstgres import PatientRepositoryPostgres
-from src.Infrastructure.Repositories.PatientSymptomRepositoryPostgres import PatientSymptomRepositoryPostgres
-from src.Domain.Entities.Symptom import Symptom
 from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+from src.Infrastructure.Cache.ChatSession import ChatSession
+from src.Infrastructure.Cache.PatientCatalog import PatientCatalog
+from src.Infrastructure.Routing.RouterDecisionLog import RouterDecisionLog
 
 
 class ChatCommandHandler:
-    
-    def __init__(self, agent_factory: Optional[AgentFactory] = None):
+    """
+    Orquestra um turno de conversa: memória da sessão, roteamento entre
+    agentes e persistência das respostas.
+
+    A instância é compartilhada entre sessões concorrentes (singleton do
+    container), portanto não guarda estado por requisição em atributos: todo
+    estado da sessão vive em variáveis locais de cada turno.
+    """
+
+    DEFAULT_HISTORY_WINDOW = 20
+
+    def __init__(
+        self,
+        agent_factory: Optional[AgentFactory] = None,
+        *,
+        patient_catalog: Optional[PatientCatalog] = None,
+        chat_memory_store: Optional[ChatMemoryStore] = None,
+        message_subject: Optional[MessageSubject] = None,
+        intent_router: Optional[TieredIntentRouter] = None,
+        router_decision_log: Optional[RouterDecisionLog] = None,
+        speculative_routing: Optional[SpeculativeRouting] = None,
+        conversation_summarizer: Optional[ConversationSummarizer] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         self.logger = get_logger(__name__)
         self.agent_factory = agent_factory or AgentFactory(
             llm_provider_resolver=DefaultLlmProviderResolver()
         )
         
         # Configuração do sistema de observadores
-        self.message_subject = MessageSubject()
-        self.message_subject.attach(LoggingObserver(self.logger))
-
-        # Repositórios
-        self.patient_repository = PatientRepositoryPostgres()
-        self.patient_symptom_repository = PatientSymptomRepositoryPostgres()
-        self.chat_memory_store = ChatMemoryStore()
-
-        # Imagino que essas variaveis NAO devam ficar no controller pq tao armazenando memoria
-        # Mas funciona por enquanto
-        self.conversation_started = False
-        self.data = {
-            "symptom_list": [],
-            "disease": None,
-            "conversation_history": [],
-        }
-        self.history_window = 20
+        if message_subject is None:
+            message_subject = MessageSubject()
+            message_subject.attach(LoggingObserver(get_message_logger()))
+        self.message_subject = message_subject
+
+        # Catálogo de pacientes (em memória) e memória das sessões
+        self.patient_catalog = patient_catalog or PatientCatalog()
+        self.chat_memory_store = chat_memory_store or ChatMemoryStore()
+
+        # Roteamento em camadas: classificadores locais antes do RouterAgent
+        self.intent_router = intent_router or TieredIntentRouter()
+        self.router_decision_log = router_decision_log or RouterDecisionLog()
+        self.speculative_routing = speculative_routing or SpeculativeRouting()
+
+        # Resumo das mensagens antigas, feito em segundo plano após o commit
+        self.conversation_summarizer = conversation_summarizer or ConversationSummarizer(
+            self.chat_memory_store,
+            llm_provider_resolver=self.agent_factory.llm_provider_resolver,
+        )
+
+        # A janela cobre todo o histórico ainda não resumido (a lista só
+        # passa do limiar enquanto o resumo está em andamento)
+        self.history_window = (
+            self.conversation_summarizer.threshold
+            if self.conversation_summarizer.enabled
+            else self.DEFAULT_HISTORY_WINDOW
+        )
+
+        # Cada turno é a raiz dos spans de agentes, LLM, Redis e PostgreSQL
+        self.tracer = tracer or get_tracer()
+        metrics = metrics or get_metrics_registry()
+        self._turn_duration = metrics.histogram(
+            "chat_turn_duration_seconds",
+            "Duração dos turnos de conversa por modo (sync, stream) e desfecho",
+        )
         
         self.logger.info("💬 Chat inicializado e pronto para uso")
 
+    def _turn_attributes(self, command: ChatCommand, mode: str) -> dict:
+        return {"chat.session_id": str(command.session_id), "chat.mode": mode}
+
     async def handle(self, command: ChatCommand) -> str:
+        outcome = "error"
+        with self.tracer.span("chat.turn", **self._turn_attributes(command, "sync")) as span:
+            try:
+                response = await self._handle(command)
+                outcome = "ok"
+                return response
+            finally:
+                self._turn_duration.observe(span.elapsed, mode="sync", outcome=outcome)
+
+    async def handle_stream(self, command: ChatCommand) -> AsyncIterator[str]:
+        """
+        Mesmo fluxo de handle, mas repassa a resposta do paciente em partes
+        conforme o LLM gera os tokens. A mensagem completa só é registrada na
+        sessão quando o streaming termina.
+        """
+        outcome = "cancelled"
+        span = self.tracer.start_span("chat.turn", attributes=self._turn_attributes(command, "stream"))
+        deltas = self._handle_stream(command)
         try:
-            current_agent_type = "router"
-
-            session_id = str(command.session_id)
-            message = command.message
-            
-            memory_snapshot = await self._ensure_session_memory(session_id)
-            self._hydrate_session_state(memory_snapshot)
-
-            memory_snapshot = await self.chat_memory_store.append_history(session_id, "user", message)
-            self._hydrate_session_state(memory_snapshot)
-            conversation_context = self._format_conversation_history(self.data["conversation_history"])
-
-            # Notifica sobre a mensagem do usuário
-            self.message_subject.notify(
-                message=message,
-                role="user"
-            )
-            
             while True:
-                prompt_data = self._build_prompt_data(
-                    agent_type=current_agent_type,
-                    conversation_context=conversation_context,
-                )
-
-                agent = self._get_agent(
-                    agent_type=current_agent_type,
-                    llm_type='gpt',
-                    prompt_data=prompt_data
-                )
-
-                response = await agent.generate_response(message)
-                
-                # Notifica sobre a resposta do handler
+                # O span só é o atual enquanto o turno avança, não no consumidor
+                with self.tracer.activate(span):
+                    try:
+                        delta = await deltas.__anext__()
+                    except StopAsyncIteration:
+                        break
+                yield delta
+            outcome = "ok"
+        except Exception as exc:
+            outcome = "error"
+            span.record_exception(exc)
+            raise
+        finally:
+            with self.tracer.activate(span):
+                await deltas.aclose()
+            self.tracer.end_span(span)
+            self._turn_duration.observe(span.elapsed, mode="stream", outcome=outcome)
+
+    async def _handle(self, command: ChatCommand) -> str:
+        message = command.message
+        current_agent_type = "router"
+
+        session = await self._start_turn(str(command.session_id), message)
+        try:
+            while True:
+                # Sem prazo para mais um agente, o turno para aqui (a sessão é gravada)
+                check_deadline(f"o agente '{current_agent_type}'")
+                if current_agent_type == "router":
+                    current_agent_type, response = await self._route(message, session, stream=False)
+                    if response is None:
+                        continue
+                else:
+                    agent = self._create_turn_agent(agent_type=current_agent_type, session=session)
+                    response = await agent.generate_response(message, self._context_messages(session))
+
+                # Notifica e registra a resposta do agente na sessão
                 if response.message:
-                    self.message_subject.notify(
-                        message=response.message,
-                        role="assistant"
-                    )
-                    memory_snapshot = await self.chat_memory_store.append_history(
-                        session_id,
-                        "assistant",
-                        response.message,
-                    )
-                    self._hydrate_session_state(memory_snapshot)
-                    conversation_context = self._format_conversation_history(
-                        self.data["conversation_history"]
-                    )
-                
+                    self._record_assistant_message(session, response.message)
+
                 if response.agent_type == AgentType.FINAL:
                     return response.message
 
-                # Valida next_agent retornado pelo agent e aplica fallback mínimo
-                next_agent = response.next_agent or "sintomas"
-                # Se o agent factory não conhece esse tipo, cai para 'sintomas'
-                if not isinstance(next_agent, str) or next_agent not in self.agent_factory.agent_classes:
-                    self.logger.warning(
-                        f"Next agent inválido recebido: {next_agent!r}, usando 'sintomas' como fallback"
-                    )
-                    resolved_agent = "sintomas"
+                current_agent_type = self._resolve_next_agent(response.next_agent)
+        finally:
+            await self._finish_turn(session)
+
+    async def _handle_stream(self, command: ChatCommand) -> AsyncIterator[str]:
+        message = command.message
+        current_agent_type = "router"
+        speculative: Optional[SpeculativeStream] = None
+
+        session = await self._start_turn(str(command.session_id), message)
+        try:
+            while True:
+                check_deadline(f"o agente '{current_agent_type}'")
+                if current_agent_type == "router":
+                    current_agent_type, speculative = await self._route(message, session, stream=True)
+                    continue
+
+                if speculative is not None:
+                    chunks = speculative.replay()
                 else:
-                    resolved_agent = next_agent
+                    agent = self._create_turn_agent(agent_type=current_agent_type, session=session)
+                    chunks = agent.stream_response(message, self._context_messages(session))
 
-                self.logger.info(f"🔀 Direcionando conversa para o agente '{resolved_agent}'")
-                current_agent_type = resolved_agent
-            
-        except Exception as e:
+                response: Optional[AgentResponse] = None
+                async for chunk in chunks:
+                    if chunk.delta:
+                        yield chunk.delta
+                    if chunk.response is not None:
+                        response = chunk.response
+                speculative = None
+
+                if response is None:
+                    raise MessageProcessingError(
+                        f"O agente '{current_agent_type}' encerrou o streaming sem resposta"
+                    )
+
+                if response.message:
+                    self._record_assistant_message(session, response.message)
+
+                if response.agent_type == AgentType.FINAL:
+                    return
+
+                current_agent_type = self._resolve_next_agent(response.next_agent)
+        finally:
+            if speculative is not None:
+                await speculative.cancel()
+            await self._finish_turn(session)
+
+    async def _route(
+        self,
+        message: str,
+        session: ChatSession,
+        *,
+        stream: bool,
+    ) -> Tuple[str, Any]:
+        """
+        Decide o agente do turno: tiers locais, depois o RouterAgent (em
+        paralelo com o agente mais provável, se a especulação estiver ativa).
+        Retorna o agente e, quando a especulação acertou, a resposta já
+        gerada (AgentResponse, ou SpeculativeStream no streaming).
+        """
+        local_route = await self._route_locally(message, session)
+        if local_route is not None:
+            return self._set_route(session, local_route), None
+
+        if self.speculative_routing.enabled:
+            return await self._route_speculatively(message, session, stream=stream)
+
+        return await self._run_router(message, session), None
+
+    async def _run_router(self, message: str, session: ChatSession) -> str:
+        router = self._create_turn_agent(agent_type="router", session=session)
+        response = await router.generate_response(message, self._context_messages(session))
+        await self._record_llm_route(message, session, response.next_agent)
+        return self._set_route(session, response.next_agent)
+
+    async def _route_speculatively(
+        self,
+        message: str,
+        session: ChatSession,
+        *,
+        stream: bool,
+    ) -> Tuple[str, Any]:
+        predicted = self.speculative_routing.predict(session.last_route)
+        if predicted == "router" or predicted not in self.agent_factory.agent_classes:
+            predicted = self.speculative_routing.default_agent
+
+        speculative_agent = self._create_turn_agent(agent_type=predicted, session=session)
+        history = self._context_messages(session)
+        reservation = self.speculative_routing.try_reserve(speculative_agent, message, history)
+        if reservation is None:
+            return await self._run_router(message, session), None
+
+        started = perf_counter()
+        if stream:
+            speculative = SpeculativeStream(speculative_agent.stream_response(message, history))
+            task = speculative.task
+        else:
+            task = asyncio.create_task(self._timed(speculative_agent.generate_response(message, history)))
+
+        try:
+            next_agent = await self._run_router(message, session)
+        except BaseException:
+            await cancel_task(task)
             raise
+        router_seconds = perf_counter() - started
+
+        if next_agent != predicted:
+            await cancel_task(task)
+            self.speculative_routing.record_miss(reservation, predicted, next_agent)
+            return next_agent, None
+
+        if stream:
+            # Se o agente ainda está gerando, toda a espera do roteador foi economizada
+            agent_seconds = speculative.elapsed if speculative.elapsed is not None else router_seconds
+            self.speculative_routing.record_hit(reservation, router_seconds, agent_seconds)
+            return next_agent, speculative
+
+        response, agent_seconds = await task
+        self.speculative_routing.record_hit(reservation, router_seconds, agent_seconds)
+        return next_agent, response
+
+    @staticmethod
+    async def _timed(awaitable: Awaitable[AgentResponse]) -> Tuple[AgentResponse, float]:
+        started = perf_counter()
+        result = await awaitable
+        return result, perf_counter() - started
+
+    def _set_route(self, session: ChatSession, next_agent: Any) -> str:
+        resolved_agent = self._resolve_next_agent(next_agent)
+        session.set_last_route(resolved_agent)
+        return resolved_agent
+
+    async def _start_turn(self, session_id: str, message: str) -> ChatSession:
+        """
+        Carrega a sessão (uma única ida ao Redis), sorteia um paciente se ela
+        for nova e registra a mensagem do médico.
+        """
+        session = await self.chat_memory_store.load_session(
+            session_id,
+            history_limit=self.history_window,
+        )
+        if session.is_new:
+            symptom_list, disease = await self._get_random_user_disease_data()
+            session.set_profile(symptom_list=symptom_list, disease=disease)
+
+        session.add_message("user", message)
+
+        # Notifica sobre a mensagem do usuário
+        self.message_subject.notify(
+            message=message,
+            role="user"
+        )
+
+        return session
+
+    def _context_messages(self, session: ChatSession) -> List[LlmMessage]:
+        return session.context_messages(self.history_window)
+
+    async def _route_locally(self, message: str, session: ChatSession) -> Optional[str]:
+        """
+        Tenta decidir o próximo agente com os classificadores locais. Retorna
+        None quando nenhum tier tem confiança suficiente (escala para o LLM).
+        """
+        prediction = self.intent_router.classify(message, is_first_turn=not session.has_prior_history)
+        if prediction is None:
+            return None
+
+        self.logger.info(
+            "Roteamento local pelo tier '%s' (confiança %.2f): %s",
+            prediction.tier,
+            prediction.confidence,
+            prediction.label,
+        )
+        await self._log_route(
+            message=message,
+            session=session,
+            label=prediction.label,
+            tier=prediction.tier,
+            confidence=prediction.confidence,
+        )
+        return prediction.label
+
+    async def _record_llm_route(self, message: str, session: ChatSession, next_agent: Any) -> None:
+        label = (next_agent or "").strip().lower() if isinstance(next_agent, str) else ""
+        self.intent_router.record_llm_decision(label or "invalid")
+        await self._log_route(message=message, session=session, label=label, tier="llm")
+
+    async def _log_route(
+        self,
+        *,
+        message: str,
+        session: ChatSession,
+        label: str,
+        tier: str,
+        confidence: Optional[float] = None,
+    ) -> None:
+        # O histórico em texto só é montado quando o log de decisões está ativo
+        if not self.router_decision_log.enabled:
+            return
+        await self.router_decision_log.record(
+            message=message,
+            conversation_history=self._format_conversation_history(session.history),
+            label=label,
+            tier=tier,
+            confidence=confidence,
+        )
 
-    def _get_agent(self, agent_type: str, llm_type: str, prompt_data: dict[str, object]) -> AgentInterface:
+    def _record_assistant_message(self, session: ChatSession, message: str) -> None:
+        self.message_subject.notify(
+            message=message,
+            role="assistant"
+        )
+        session.add_message("assistant", message)
+
+    async def _finish_turn(self, session: ChatSession) -> None:
+        """
+        Grava a sessão em uma única transação, registra quantas idas ao
+        Redis o turno precisou e, se o histórico cresceu demais, agenda o
+        resumo em segundo plano (sem esperar por ele).
+        """
+        if await self.chat_memory_store.commit(session):
+            self.conversation_summarizer.maybe_schedule(session)
+        self.logger.info(
+            "Turno da sessão %s concluído com %d ida(s) ao Redis", session.session_id, session.round_trips
+        )
+
+    def _create_turn_agent(
+        self,
+        agent_type: str,
+        session: ChatSession,
+    ) -> AgentInterface:
+        prompt_data = self._build_prompt_data(agent_type=agent_type, session=session)
+
+        # O provedor vem do perfil do agente (AgentProfiles)
+        return self._get_agent(
+            agent_type=agent_type,
+            prompt_data=prompt_data
+        )
+
+    def _resolve_next_agent(self, next_agent: Any) -> str:
+        # Valida next_agent retornado pelo agent e aplica fallback mínimo
+        next_agent = next_agent or "sintomas"
+        # Se o agent factory não conhece esse tipo, cai para 'sintomas'
+        if not isinstance(next_agent, str) or next_agent not in self.agent_factory.agent_classes:
+            self.logger.warning(
+                "Next agent inválido recebido: %r, usando 'sintomas' como fallback", next_agent
+            )
+            resolved_agent = "sintomas"
+        else:
+            resolved_agent = next_agent
+
+        self.logger.info("🔀 Direcionando conversa para o agente '%s'", resolved_agent)
+        return resolved_agent
+
+    def _get_agent(
+        self,
+        agent_type: str,
+        prompt_data: dict[str, object],
+        llm_type: Optional[str] = None,
+    ) -> AgentInterface:
         try:
             return self.agent_factory.create_agent(
                 agent_type=agent_type,
@@ -139,52 +449,17 @@ class ChatCommandHandler:
             # For other unexpected errors, wrap as HandlerNotFoundError
             raise HandlerNotFoundError(f"Não foi possível obter o agente: {str(e)}")
 
-    async def _ensure_session_memory(self, session_id: str) -> dict[str, Any]:
-        """
-        Garante que a sessão possua memória persistida no Redis.
-
-        - Caso exista, retorna os dados.
-        - Caso não exista, cria um novo registro com dados aleatórios.
-        """
-        existing_memory = await self.chat_memory_store.get_memory(session_id)
-        if existing_memory:
-            return existing_memory
-
-        symptom_entities, disease = self._get_random_user_disease_data()
-        symptom_list = [symptom.symptom_name for symptom in symptom_entities]
+    async def _get_random_user_disease_data(self) -> Tuple[List[str], Optional[str]]:
+        patient = await self.patient_catalog.sample()
 
-        return await self.chat_memory_store.save_memory(
-            session_id=session_id,
-            symptom_list=symptom_list,
-            disease=disease,
-        )
-
-    def _get_random_user_disease_data(self) -> Tuple[List[Symptom], Optional[str]]:
-        all_patients = self.patient_repository.list_all()
-        
-        if not all_patients:
+        if patient is None:
             self.logger.warning("Nenhum paciente encontrado no banco de dados")
             return [], None
-        
-        random_patient = random.choice(all_patients)
-        random_user_id = random_patient.patient_id
-        
-        self.logger.info(f"Usuário aleatório selecionado: {random_user_id}")
-        
-        symptoms = self.patient_symptom_repository.list_symptoms_for_patient(random_user_id)
-        disease = random_patient.disease
-        
-        self.logger.info(f"Sintomas encontrados para o usuário {random_user_id}: {[symptom.symptom_name for symptom in symptoms]}")
-        
-        return symptoms, disease
 
-    def _hydrate_session_state(self, memory_snapshot: Optional[dict[str, Any]]) -> None:
-        if not memory_snapshot:
-            return
+        self.logger.info("Usuário aleatório selecionado: %s", patient.patient_id)
+        self.logger.info("Sintomas encontrados para o usuário %s: %s", patient.patient_id, patient.symptom_names)
 
-        self.data["symptom_list"] = memory_snapshot.get("symptom_list") or []
-        self.data["disease"] = memory_snapshot.get("disease")
-        self.data["conversation_history"] = memory_snapshot.get("history") or []
+        return list(patient.symptom_names), patient.disease
 
     def _format_conversation_history(self, history: List[dict[str, Any]]) -> str:
         if not history:
@@ -199,14 +474,16 @@ class ChatCommandHandler:
 
         return "\n".join(formatted_messages)
 
-    def _build_prompt_data(self, agent_type: str, conversation_context: str) -> dict[str, Any]:
-        prompt_data: dict[str, Any] = {
-            "conversation_history": conversation_context,
-        }
+    def _build_prompt_data(self, agent_type: str, session: ChatSession) -> dict[str, Any]:
+        # O histórico não entra mais no system prompt: vai como mensagens de chat
+        prompt_data: dict[str, Any] = {}
+
+        if session.summary:
+            prompt_data["conversation_summary"] = session.summary
 
         if agent_type == "sintomas":
-            prompt_data["symptom_list"] = self.data["symptom_list"]
-            prompt_data["disease"] = self.data["disease"]
+            prompt_data["symptom_list"] = session.symptom_list
+            prompt_data["disease"] = session.disease
 
         return prompt_data
 
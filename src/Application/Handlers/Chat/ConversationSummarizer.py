@@ -0,0 +1,194 @@
+import asyncio
+import os
+from time import perf_counter
+from typing import Dict, Optional
+
+from src.Domain.Chatbot.Agents.SintomasAgent.SintomasAgentConfig import (
+    GET_SUMMARY_MESSAGE,
+    SUMMARY_CONFIG,
+    SUMMARY_PROMPT,
+)
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface
+from src.Domain.Interfaces.Llm.LlmProviderResolver import LlmProviderResolver
+from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+from src.Infrastructure.Cache.ChatSession import ChatSession
+from src.Infrastructure.Llm.DefaultLlmProviderResolver import DefaultLlmProviderResolver
+from src.Infrastructure.Llm.LazyLlm import LazyLlm
+from src.Infrastructure.Llm.MeteredLlm import MeteredLlm
+from src.Infrastructure.Llm.RetryingLlm import RetryingLlm
+from src.SharedKernel.Deadline.Deadline import detached_deadline
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+from src.SharedKernel.Tracing.Tracer import get_tracer
+
+
+class ConversationSummarizer:
+    """
+    Resumo incremental das conversas, fora do caminho de latência do usuário.
+
+    Depois que o turno é gravado, se a lista de histórico da sessão passou de
+    ``threshold`` entradas, uma tarefa em segundo plano resume as mais antigas
+    (junto com o resumo anterior) e grava o novo resumo no hash de metadados,
+    removendo essas entradas da lista. Ficam sempre as ``keep_recent``
+    últimas mensagens, que os agentes recebem como histórico junto com o
+    resumo.
+
+    O LLM de resumo é resolvido pelo ``LlmProviderResolver`` e só é criado
+    no primeiro resumo (``LazyLlm``): turnos que não resumem não pagam por
+    ele, e a aplicação sobe sem a chave de um provedor que não usa.
+
+    Configuração via ambiente: CONVERSATION_SUMMARY_ENABLED (padrão "true"),
+    CONVERSATION_SUMMARY_THRESHOLD (padrão 30),
+    CONVERSATION_SUMMARY_KEEP_RECENT (padrão 20), SUMMARY_LLM_PROVIDER
+    (padrão "gpt") e SUMMARY_LLM_MODEL (padrão: modelo do SUMMARY_CONFIG).
+    """
+
+    def __init__(
+        self,
+        chat_memory_store: ChatMemoryStore,
+        *,
+        llm_provider_resolver: Optional[LlmProviderResolver] = None,
+        summary_llm: Optional[LlmInterface] = None,
+        summary_provider: Optional[str] = None,
+        summary_model: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        threshold: Optional[int] = None,
+        keep_recent: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.logger = get_logger(__name__)
+        self.chat_memory_store = chat_memory_store
+
+        if summary_llm is None:
+            summary_provider = summary_provider or os.getenv("SUMMARY_LLM_PROVIDER") or "gpt"
+            summary_model = summary_model or os.getenv("SUMMARY_LLM_MODEL") or SUMMARY_CONFIG.model
+            summary_llm = MeteredLlm(
+                RetryingLlm(
+                    LazyLlm.from_resolver(
+                        llm_provider_resolver or DefaultLlmProviderResolver(),
+                        summary_provider,
+                        SUMMARY_CONFIG.model_copy(update={"model": summary_model}),
+                        SUMMARY_PROMPT,
+                    ),
+                    agent_type="summary",
+                    provider=summary_provider,
+                ),
+                agent_type="summary",
+                provider=summary_provider,
+                metrics=metrics,
+            )
+        self.summary_llm = summary_llm
+        self.tracer = get_tracer()
+
+        if enabled is None:
+            enabled = os.getenv("CONVERSATION_SUMMARY_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+
+        if threshold is None:
+            threshold = int(os.getenv("CONVERSATION_SUMMARY_THRESHOLD", "30"))
+        if keep_recent is None:
+            keep_recent = int(os.getenv("CONVERSATION_SUMMARY_KEEP_RECENT", "20"))
+        if keep_recent >= threshold:
+            raise ValueError("CONVERSATION_SUMMARY_KEEP_RECENT deve ser menor que o limiar de resumo")
+        self.threshold = threshold
+        self.keep_recent = keep_recent
+
+        # Uma tarefa por sessão: turnos seguintes não disparam outro resumo
+        # enquanto o anterior não terminar
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        metrics = metrics or get_metrics_registry()
+        self._outcomes = metrics.counter(
+            "conversation_summaries_total",
+            "Resumos de conversa por resultado (ok, error)",
+        )
+        self._duration = metrics.histogram(
+            "conversation_summary_duration_seconds",
+            "Duração dos resumos em segundo plano",
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def maybe_schedule(self, session: ChatSession) -> Optional[asyncio.Task]:
+        """
+        Agenda o resumo da sessão se o histórico gravado passou do limiar.
+        Não espera a tarefa: chamado depois do commit do turno.
+        """
+        if not self.enabled or session.degraded or session.history_length is None:
+            return None
+        if session.history_length < self.threshold or session.session_id in self._tasks:
+            return None
+
+        count = session.history_length - self.keep_recent
+        # O resumo sobrevive ao turno: não herda o prazo da requisição
+        with detached_deadline():
+            task = asyncio.create_task(self._summarize(session.session_id, count))
+        self._tasks[session.session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(session.session_id, None))
+        return task
+
+    async def _summarize(self, session_id: str, count: int) -> None:
+        # Trace próprio: o resumo termina depois do turno que o agendou
+        span = self.tracer.start_span(
+            "chat.summary",
+            parent=None,
+            attributes={"chat.session_id": session_id, "summary.entries": count},
+        )
+        with self.tracer.activate(span):
+            try:
+                await self._run_summary(session_id, count)
+            finally:
+                self.tracer.end_span(span)
+
+    async def _run_summary(self, session_id: str, count: int) -> None:
+        started = perf_counter()
+        try:
+            source = await self.chat_memory_store.load_summary_source(session_id, count)
+            if source is None:
+                self._outcomes.inc(outcome="error")
+                return
+            previous_summary, entries = source
+            if not entries:
+                return
+
+            conversation = "\n".join(
+                f"{(entry.get('role') or 'user').upper()}: {entry.get('message') or ''}"
+                for entry in entries
+            )
+            response = await self.summary_llm.process(GET_SUMMARY_MESSAGE(previous_summary, conversation))
+            summary = (response.message or "").strip()
+            if not summary:
+                self.logger.warning("Resumo vazio para a sessão %s; histórico mantido", session_id)
+                self._outcomes.inc(outcome="error")
+                return
+
+            if not await self.chat_memory_store.save_summary(session_id, summary, entries):
+                self._outcomes.inc(outcome="error")
+                return
+
+            self._outcomes.inc(outcome="ok")
+            self.logger.info("Sessão %s: %d mensagens antigas resumidas", session_id, len(entries))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._outcomes.inc(outcome="error")
+            self.logger.error("Erro ao resumir a sessão %s: %s", session_id, exc)
+        finally:
+            self._duration.observe(perf_counter() - started)
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """
+        Aguarda os resumos em andamento (no shutdown) e cancela os que não
+        terminarem dentro de ``timeout`` segundos.
+        """
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        done, not_done = await asyncio.wait(tasks, timeout=timeout)
+        for task in not_done:
+            task.cancel()
+        await asyncio.gather(*not_done, return_exceptions=True)
+        if not_done:
+            self.logger.warning("%d resumo(s) de conversa cancelado(s) no shutdown", len(not_done))
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Optional, Sequence
+
+from src.Domain.Chatbot.Abstractions.AgentInterface import AgentInterface, AgentStreamChunk
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+
+class SpeculativeRouting:
+    """
+    Política do modo especulativo: enquanto o RouterAgent classifica a
+    mensagem, o agente mais provável (a rota do turno anterior ou
+    ``default_agent``) já começa a responder. Se o roteador concordar, a
+    resposta especulativa é usada; se discordar, ela é cancelada.
+
+    O gasto extra com especulações erradas é limitado por um balde de tokens
+    (estimados a partir do tamanho do prompt, histórico incluído) renovado a
+    cada minuto.
+
+    Configuração via ambiente: SPECULATIVE_ROUTING (padrão "false"),
+    SPECULATIVE_DEFAULT_AGENT (padrão "sintomas"), SPECULATIVE_TOKEN_BUDGET
+    (tokens por minuto, padrão 20000; 0 desativa o limite) e
+    SPECULATIVE_OUTPUT_TOKENS_ESTIMATE (padrão 400).
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: Optional[bool] = None,
+        default_agent: Optional[str] = None,
+        token_budget_per_minute: Optional[int] = None,
+        output_tokens_estimate: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.logger = get_logger(__name__)
+
+        if enabled is None:
+            enabled = os.getenv("SPECULATIVE_ROUTING", "false").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self.default_agent = default_agent or os.getenv("SPECULATIVE_DEFAULT_AGENT") or "sintomas"
+
+        if token_budget_per_minute is None:
+            token_budget_per_minute = int(os.getenv("SPECULATIVE_TOKEN_BUDGET", "20000"))
+        self.token_budget_per_minute = token_budget_per_minute
+
+        if output_tokens_estimate is None:
+            output_tokens_estimate = int(os.getenv("SPECULATIVE_OUTPUT_TOKENS_ESTIMATE", "400"))
+        self.output_tokens_estimate = output_tokens_estimate
+
+        self._available_tokens = float(token_budget_per_minute)
+        self._last_refill = time.monotonic()
+
+        metrics = metrics or get_metrics_registry()
+        self._outcomes = metrics.counter(
+            "speculative_routing_total",
+            "Especulações por resultado (hit, miss, skipped)",
+        )
+        self._latency_saved = metrics.histogram(
+            "speculative_routing_latency_saved_seconds",
+            "Latência economizada por especulações certas",
+        )
+        self._wasted_tokens = metrics.counter(
+            "speculative_routing_wasted_tokens_total",
+            "Tokens estimados gastos em especulações descartadas",
+        )
+
+    def predict(self, last_route: Optional[str]) -> str:
+        return last_route or self.default_agent
+
+    def estimate_tokens(
+        self,
+        agent: AgentInterface,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> int:
+        system_prompt = getattr(agent.llm, "system_prompt", "") or ""
+        # O histórico costuma ser a maior parte da entrada em conversas longas
+        history_chars = sum(len(item.content) for item in history or ())
+        return (len(system_prompt) + history_chars + len(message)) // 4 + self.output_tokens_estimate
+
+    def try_reserve(
+        self,
+        agent: AgentInterface,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> Optional[int]:
+        """
+        Reserva no orçamento o custo estimado da especulação (system prompt,
+        ``history`` enviado ao agente e mensagem). Retorna a reserva ou None
+        se o orçamento do minuto estiver esgotado.
+        """
+        estimate = self.estimate_tokens(agent, message, history)
+        if not self.token_budget_per_minute:
+            return estimate
+
+        self._refill()
+        if self._available_tokens < estimate:
+            self._outcomes.inc(outcome="skipped")
+            return None
+        self._available_tokens -= estimate
+        return estimate
+
+    def record_hit(self, reservation: int, router_seconds: float, agent_seconds: float) -> None:
+        # A especulação certa não é gasto extra: devolve a reserva
+        if self.token_budget_per_minute:
+            self._available_tokens = min(
+                self._available_tokens + reservation, float(self.token_budget_per_minute)
+            )
+        saved = min(router_seconds, agent_seconds)
+        self._outcomes.inc(outcome="hit")
+        self._latency_saved.observe(saved)
+        self.logger.info("Especulação confirmada pelo roteador (%.0f ms economizados)", saved * 1000)
+
+    def record_miss(self, reservation: int, predicted: str, routed: str) -> None:
+        self._outcomes.inc(outcome="miss")
+        self._wasted_tokens.inc(reservation)
+        self.logger.info("Especulação descartada: previsto '%s', roteador escolheu '%s'", predicted, routed)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._available_tokens = min(
+            float(self.token_budget_per_minute),
+            self._available_tokens + elapsed * self.token_budget_per_minute / 60.0,
+        )
+
+
+_END_OF_STREAM = object()
+
+
+class SpeculativeStream:
+    """
+    Consome em segundo plano o streaming de um agente especulativo,
+    guardando os chunks até o roteador confirmar a rota. Confirmada, os
+    chunks já gerados são repassados e o restante segue ao vivo.
+    """
+
+    def __init__(self, chunks: AsyncIterator[AgentStreamChunk]):
+        self._chunks = chunks
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._error: Optional[BaseException] = None
+        self._started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        self.task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for chunk in self._chunks:
+                self._queue.put_nowait(chunk)
+        except Exception as exc:
+            self._error = exc
+        finally:
+            self.elapsed = time.perf_counter() - self._started
+            self._queue.put_nowait(_END_OF_STREAM)
+
+    async def replay(self) -> AsyncIterator[AgentStreamChunk]:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is _END_OF_STREAM:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield chunk
+
+    async def cancel(self) -> None:
+        await cancel_task(self.task)
+
+
+async def cancel_task(task: asyncio.Task) -> None:
+    """Cancela a tarefa e aguarda seu término, descartando o resultado."""
+    if not task.done():
+        task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from typing import AsyncIterator, Optional, Sequence
 
 from pydantic import BaseModel, Field
 
-from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmMessage
 
 
 class AgentType(Enum):
@@ -18,13 +19,42 @@ class AgentResponse(BaseModel):
     payload: dict = Field(default_factory=dict)
 
 
+class AgentStreamChunk(BaseModel):
+    """
+    Parte de uma resposta em streaming: ``delta`` carrega texto parcial e o
+    último chunk traz o ``response`` completo (com o próximo agente).
+    """
+    delta: str | None = None
+    response: AgentResponse | None = None
+
+
 class AgentInterface(ABC):
     def __init__(self, llm: LlmInterface):
         self.llm = llm
 
     @abstractmethod
-    async def generate_response(self, message: str) -> AgentResponse:
+    async def generate_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AgentResponse:
         """
-        Gera uma resposta do agente com base na mensagem do usuário.
+        Gera uma resposta do agente com base na mensagem do usuário e nos
+        turnos anteriores da conversa (``history``).
         """
         raise NotImplementedError
+
+    async def stream_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[AgentStreamChunk]:
+        """
+        Gera a resposta do agente em partes. Por padrão entrega a resposta
+        completa de uma vez; agentes que respondem ao médico sobrescrevem
+        este método para repassar os tokens do LLM conforme chegam.
+        """
+        response = await self.generate_response(message, history)
+        if response.message:
+            yield AgentStreamChunk(delta=response.message)
+        yield AgentStreamChunk(response=response)
@@ -0,0 +1,83 @@
+from typing import AsyncIterator, Optional, Sequence
+
+from src.Domain.Chatbot.Abstractions.AgentInterface import (
+    AgentInterface,
+    AgentResponse,
+    AgentStreamChunk,
+)
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+from src.SharedKernel.Tracing.Tracer import Tracer, get_tracer
+
+
+class TracedAgent(AgentInterface):
+    """
+    Envolve o agente criado pelo AgentFactory: cada hop do turno vira um
+    span ``agent.<tipo>`` (pai das chamadas ao LLM) e alimenta o histograma
+    ``agent_hop_duration_seconds`` por agente.
+    """
+
+    def __init__(
+        self,
+        agent: AgentInterface,
+        agent_type: str,
+        *,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        super().__init__(agent.llm)
+        self.agent = agent
+        self.agent_type = agent_type
+        self.tracer = tracer or get_tracer()
+
+        metrics = metrics or get_metrics_registry()
+        self._duration = metrics.histogram(
+            "agent_hop_duration_seconds",
+            "Duração de cada hop de agente no turno (LLM e processamento do agente)",
+        )
+
+    async def generate_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AgentResponse:
+        outcome = "error"
+        with self.tracer.span(f"agent.{self.agent_type}", **{"agent.type": self.agent_type}) as span:
+            try:
+                response = await self.agent.generate_response(message, history)
+                span.set_attribute("agent.next", response.next_agent)
+                outcome = "ok"
+                return response
+            finally:
+                self._duration.observe(span.elapsed, agent=self.agent_type, outcome=outcome)
+
+    async def stream_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[AgentStreamChunk]:
+        outcome = "cancelled"
+        span = self.tracer.start_span(
+            f"agent.{self.agent_type}",
+            attributes={"agent.type": self.agent_type, "agent.stream": True},
+        )
+        chunks = self.agent.stream_response(message, history)
+        try:
+            while True:
+                with self.tracer.activate(span):
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+                if chunk.response is not None:
+                    span.set_attribute("agent.next", chunk.response.next_agent)
+                yield chunk
+            outcome = "ok"
+        except Exception as exc:
+            outcome = "error"
+            span.record_exception(exc)
+            raise
+        finally:
+            await chunks.aclose()
+            self.tracer.end_span(span)
+            self._duration.observe(span.elapsed, agent=self.agent_type, outcome=outcome)
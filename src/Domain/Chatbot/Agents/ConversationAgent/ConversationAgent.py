@@ -1,9 +1,14 @@
+from typing import AsyncIterator, Optional, Sequence
+
 from src.Domain.Chatbot.Abstractions.AgentInterface import (
     AgentInterface,
     AgentResponse,
+    AgentStreamChunk,
     AgentType,
 )
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
 from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
 
 
 class ConversationAgent(AgentInterface):
@@ -38,13 +43,17 @@ class ConversationAgent(AgentInterface):
             "onde sente",
         ]
 
-    async def generate_response(self, message: str) -> AgentResponse:
+    async def generate_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AgentResponse:
         """
         Mantém a conversa como paciente e indica qual agente deve responder em seguida.
         """
         try:
             user_message = message or ""
-            llm_response = await self.llm.process(user_message)
+            llm_response = await self.llm.process(user_message, history)
             reply = (llm_response.message or "").strip()
 
             if not reply:
@@ -57,14 +66,61 @@ class ConversationAgent(AgentInterface):
                 message=reply,
                 next_agent=next_agent,
             )
+        except DeadlineExceededError:
+            raise
         except Exception as exc:
-            self.logger.error(f"Erro no ConversationAgent: {str(exc)}")
+            self.logger.error("Erro no ConversationAgent: %s", exc)
             return AgentResponse(
                 agent_type=AgentType.FINAL,
                 message="Desculpe doutor, acho que me confundi um pouco agora.",
                 next_agent=self.default_next_agent,
             )
 
+    async def stream_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[AgentStreamChunk]:
+        """
+        Versão em streaming de generate_response: repassa os tokens do LLM e
+        termina com o AgentResponse completo.
+        """
+        user_message = message or ""
+        parts: list[str] = []
+        try:
+            async for delta in self.llm.stream(user_message, history):
+                parts.append(delta)
+                yield AgentStreamChunk(delta=delta)
+        except DeadlineExceededError:
+            raise
+        except Exception as exc:
+            self.logger.error("Erro no streaming do ConversationAgent: %s", exc)
+            if parts:
+                raise
+            reply = "Desculpe doutor, acho que me confundi um pouco agora."
+            yield AgentStreamChunk(delta=reply)
+            yield AgentStreamChunk(
+                response=AgentResponse(
+                    agent_type=AgentType.FINAL,
+                    message=reply,
+                    next_agent=self.default_next_agent,
+                )
+            )
+            return
+
+        reply = "".join(parts).strip()
+        if not reply:
+            reply = "Doutor, não entendi muito bem. Poderia repetir de outra forma?"
+            yield AgentStreamChunk(delta=reply)
+
+        yield AgentStreamChunk(
+            response=AgentResponse(
+                agent_type=AgentType.FINAL,
+                message=reply,
+                next_agent=self._decide_next_agent(user_message),
+            )
+        )
+
     def _decide_next_agent(self, user_message: str) -> str:
         if self._is_symptom_request(user_message):
             return "sintomas"
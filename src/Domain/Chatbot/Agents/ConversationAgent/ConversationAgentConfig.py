@@ -3,24 +3,15 @@ from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig as AgentConfig
 
 CONVERSATION_CONFIG = AgentConfig(
     model="gpt-5-mini",
-    max_completion_tokens=50000,
+    max_completion_tokens=4000,
+    reasoning_effort="low",
+    timeout=30.0,
 )
 
 
-def GET_CONVERSATION_PROMPT(**kwargs):
-    conversation_history = kwargs.get("conversation_history", "").strip()
-
-    history_section = ""
-    if conversation_history:
-        history_section = f"""
-CONSIDERE O HISTÓRICO RECENTE DA CONSULTA (mensagens antigas primeiro):
-{conversation_history}
----
-Use o histórico para manter consistência, lembrar o que já foi dito e evitar repetições.
-"""
-
-    return f"""
-{history_section}
+# Prefixo estático: idêntico em todos os turnos e sessões, para aproveitar o
+# cache de prompt dos provedores. O histórico vai como mensagens de chat.
+CONVERSATION_STATIC_PROMPT = """
 Você é um PACIENTE conversando com um estudante de medicina durante uma consulta virtual.
 Seu objetivo é manter uma conversa acolhedora, engajada e coerente com tudo que já foi dito.
 
@@ -36,3 +27,6 @@ ORIENTAÇÕES:
 Nunca quebre o personagem e mantenha o foco em construir confiança com o médico.
 """
 
+
+def GET_CONVERSATION_PROMPT(**kwargs):
+    return CONVERSATION_STATIC_PROMPT
@@ -1,9 +1,14 @@
+from typing import AsyncIterator, Optional, Sequence
+
 from src.Domain.Chatbot.Abstractions.AgentInterface import (
     AgentInterface,
     AgentResponse,
+    AgentStreamChunk,
     AgentType,
 )
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
 from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
 
 
 class FallbackAgent(AgentInterface):
@@ -12,11 +17,15 @@ class FallbackAgent(AgentInterface):
         super().__init__(llm)
         self.logger = get_logger(__name__)
 
-    async def generate_response(self, message: str) -> AgentResponse:
+    async def generate_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AgentResponse:
         try:
             last_message = message or ""
 
-            agent_response = await self.llm.process(message)
+            agent_response = await self.llm.process(message, history)
             response_text = (agent_response.message or "").strip()
 
             return AgentResponse(
@@ -25,10 +34,40 @@ class FallbackAgent(AgentInterface):
                 next_agent=None
             )
 
+        except DeadlineExceededError:
+            raise
         except Exception as e:
-            self.logger.error(f"Erro no FallbackAgent: {str(e)}")
+            self.logger.error("Erro no FallbackAgent: %s", e)
             return AgentResponse(
                 agent_type=AgentType.FINAL,
                 message="Ocorreu um erro inesperado ao processar sua mensagem.",
                 next_agent=None
             )
+
+    async def stream_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[AgentStreamChunk]:
+        parts: list[str] = []
+        try:
+            async for delta in self.llm.stream(message, history):
+                parts.append(delta)
+                yield AgentStreamChunk(delta=delta)
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            self.logger.error("Erro no streaming do FallbackAgent: %s", e)
+            if parts:
+                raise
+            response_text = "Ocorreu um erro inesperado ao processar sua mensagem."
+            yield AgentStreamChunk(delta=response_text)
+            parts.append(response_text)
+
+        yield AgentStreamChunk(
+            response=AgentResponse(
+                agent_type=AgentType.FINAL,
+                message="".join(parts).strip(),
+                next_agent=None
+            )
+        )
@@ -2,22 +2,13 @@ from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig as AgentConfig
 
 FALLBACK_CONFIG = AgentConfig(
     model="gpt-5-mini",
-    max_completion_tokens=50000
+    max_completion_tokens=2000,
+    reasoning_effort="low",
+    timeout=30.0,
 )
 
-def GET_FALLBACK_PROMPT(**kwargs):
-    conversation_history = kwargs.get("conversation_history", "").strip()
-    history_section = ""
-    if conversation_history:
-        history_section = f"""
-HISTÓRICO RECENTE DISPONÍVEL:
-{conversation_history}
----
-Use esse histórico para contextualizar sua resposta sem repetir tudo.
-"""
-
-    return f"""
-{history_section}
+# Prefixo estático (idêntico entre turnos); o histórico vai como mensagens de chat
+FALLBACK_STATIC_PROMPT = """
 Você é um assistente médico em um chat médico-paciente.
 Sua função é informar ao usuário que você não entendeu a mensagem enviada,
 mas **você deve permanecer no personagem do paciente**, mantendo o contexto da conversa.
@@ -28,3 +19,6 @@ REGRAS:
 3. Sugira que o usuário reformule ou seja mais específico.
 5. Não forneça respostas médicas.
 """
+
+def GET_FALLBACK_PROMPT(**kwargs):
+    return FALLBACK_STATIC_PROMPT
@@ -1,9 +1,14 @@
+from typing import AsyncIterator, Optional, Sequence
+
 from src.Domain.Chatbot.Abstractions.AgentInterface import (
     AgentInterface,
     AgentResponse,
+    AgentStreamChunk,
     AgentType,
 )
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
 from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
 
 
 class FinalAgent(AgentInterface):
@@ -20,10 +25,14 @@ class FinalAgent(AgentInterface):
             "Muito obrigado, doutor. Vou seguir direitinho as suas orientações."
         )
 
-    async def generate_response(self, message: str) -> AgentResponse:
+    async def generate_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AgentResponse:
         try:
             user_message = message or ""
-            llm_response = await self.llm.process(user_message)
+            llm_response = await self.llm.process(user_message, history)
             reply = (llm_response.message or "").strip() or self.default_message
 
             return AgentResponse(
@@ -31,11 +40,43 @@ class FinalAgent(AgentInterface):
                 message=reply,
                 next_agent=AgentType.FINAL,
             )
+        except DeadlineExceededError:
+            raise
         except Exception as exc:
-            self.logger.error(f"Erro no FinalAgent: {str(exc)}")
+            self.logger.error("Erro no FinalAgent: %s", exc)
             return AgentResponse(
                 agent_type=AgentType.FINAL,
                 message=self.default_message,
                 next_agent=AgentType.FINAL,
             )
 
+    async def stream_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[AgentStreamChunk]:
+        user_message = message or ""
+        parts: list[str] = []
+        try:
+            async for delta in self.llm.stream(user_message, history):
+                parts.append(delta)
+                yield AgentStreamChunk(delta=delta)
+        except DeadlineExceededError:
+            raise
+        except Exception as exc:
+            self.logger.error("Erro no streaming do FinalAgent: %s", exc)
+            if parts:
+                raise
+
+        reply = "".join(parts).strip()
+        if not reply:
+            reply = self.default_message
+            yield AgentStreamChunk(delta=reply)
+
+        yield AgentStreamChunk(
+            response=AgentResponse(
+                agent_type=AgentType.FINAL,
+                message=reply,
+                next_agent=AgentType.FINAL,
+            )
+        )
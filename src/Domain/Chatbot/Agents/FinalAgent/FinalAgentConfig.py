@@ -4,22 +4,13 @@ from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig as AgentConfig
 FINAL_CONFIG = AgentConfig(
     model="gpt-5-mini",
     max_completion_tokens=2000,
+    reasoning_effort="low",
+    timeout=30.0,
 )
 
 
-def GET_FINAL_PROMPT(**kwargs):
-    conversation_history = kwargs.get("conversation_history", "").strip()
-
-    history_section = ""
-    if conversation_history:
-        history_section = f"""
-CONSIDERE O HISTÓRICO COMPLETO DA CONSULTA (mensagens mais antigas primeiro):
-{conversation_history}
----
-"""
-
-    return f"""
-{history_section}
+# Prefixo estático (idêntico entre turnos); o histórico vai como mensagens de chat
+FINAL_STATIC_PROMPT = """
 Você é o PACIENTE. O médico já apresentou um diagnóstico e orientações finais.
 Seu papel agora é encerrar a consulta de forma cordial, mostrando gratidão e
 compromisso com as recomendações recebidas.
@@ -38,3 +29,6 @@ ORIENTAÇÕES:
 Mantenha o personagem em primeira pessoa, linguagem simples e tom humano.
 """
 
+
+def GET_FINAL_PROMPT(**kwargs):
+    return FINAL_STATIC_PROMPT
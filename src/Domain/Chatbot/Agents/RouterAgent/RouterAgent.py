@@ -1,5 +1,9 @@
+from typing import Optional, Sequence
+
 from src.SharedKernel.Logging.Logger import get_logger
 from src.Domain.Chatbot.Abstractions.AgentInterface import AgentInterface, AgentType, AgentResponse
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
 
 
 class RouterAgent(AgentInterface):
@@ -8,7 +12,11 @@ class RouterAgent(AgentInterface):
         self.logger = get_logger(__name__)
         self.current_agent = None
 
-    async def generate_response(self, message: str) -> AgentResponse:
+    async def generate_response(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AgentResponse:
         try:
             user_message = message
 
@@ -18,7 +26,7 @@ class RouterAgent(AgentInterface):
                     next_agent=self.current_agent
                 )
 
-            agent_result = await self.llm.process(user_message)
+            agent_result = await self.llm.process(user_message, history)
 
             predicted_agent = (agent_result.message or "").strip().lower()
 
@@ -32,8 +40,10 @@ class RouterAgent(AgentInterface):
                 next_agent=self.current_agent
             )
 
+        except DeadlineExceededError:
+            raise
         except Exception as e:
-            self.logger.error(f"Erro no RouterAgent: {str(e)}")
+            self.logger.error("Erro no RouterAgent: %s", e)
             self.current_agent = "sintomas"
             return AgentResponse(
                 agent_type=AgentType.NEXT,
@@ -1,21 +1,16 @@
 from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig as AgentConfig
 
+# O roteador responde uma única palavra: modelo rápido, raciocínio mínimo e
+# orçamento de saída pequeno. Ajustável por agente via AgentProfiles.
 ROUTER_CONFIG = AgentConfig(
-    model="gpt-5-mini",
-    max_completion_tokens=50000
+    model="gpt-5-nano",
+    max_completion_tokens=512,
+    reasoning_effort="minimal",
+    timeout=15.0,
 )
 
-def GET_ROUTER_PROMPT(**kwargs):
-    conversation_history = kwargs.get("conversation_history", "").strip()
-    history_section = ""
-    if conversation_history:
-        history_section = f"""
-HISTÓRICO RECENTE DO CHAT (mais antigo no topo):
-{conversation_history}
----
-"""
-
-    return f"""{history_section}
+# Prefixo estático (idêntico entre turnos); o histórico vai como mensagens de chat
+ROUTER_STATIC_PROMPT = """
 Você é um classificador de mensagens para um sistema de chat médico–paciente.
 Sua única função é **classificar a mensagem mais recente do usuário**.
 Você **não deve responder**, apenas classificar.
@@ -56,5 +51,5 @@ final
 fallback
 """
 
-
-
+def GET_ROUTER_PROMPT(**kwargs):
+    return ROUTER_STATIC_PROMPT
@@ -1,32 +1,20 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
 from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig as AgentConfig
 
 SINTOMAS_CONFIG = AgentConfig(
     model="gpt-5-mini",
-    max_completion_tokens=50000
-) 
-
-def GET_SINTOMAS_PROMPT(**kwargs):
-    symptom_list = kwargs.get("symptom_list") or []
-    disease = kwargs.get("disease", "")
-    conversation_history = kwargs.get("conversation_history", "").strip()
-
-    if symptom_list:
-        sintomas_formatados = "\n- " + "\n- ".join(symptom_list)
-    else:
-        sintomas_formatados = ""
-
-    history_section = ""
-    if conversation_history:
-        history_section = f"""
-CONSIDERE O HISTÓRICO RECENTE DA CONSULTA (mais antigo no topo):
-{conversation_history}
----
-Use esse histórico para manter consistência nas suas respostas e lembrar do que já foi dito.
-"""
-
-    return f"""
+    max_completion_tokens=4000,
+    reasoning_effort="low",
+    timeout=30.0,
+)
+
+# Prefixo estático: persona e regras, idêntico em todos os turnos e sessões
+# (aproveita o cache de prompt dos provedores). Depois dele vêm os dados do
+# paciente, que mudam por sessão. O histórico vai como mensagens de chat.
+SINTOMAS_STATIC_PROMPT = """
 Leia com atenção os detalhes escritos abaixo, execute as ações da forma exata como foram pedidas e se comporte da forma especificada.
-{history_section}
 
 1. CONTEXTO
 Você será implementado em um aplicativo web desenvolvido com o objetivo de treinar estudantes de medicina na prática de anamnese. Você assumirá o papel de um paciente
@@ -121,8 +109,57 @@ Isso tem algo a ver com a consulta?
 
 Mas lembrando, seja sempre cordial e apropriado.
 
-OBS. DADOS IMPORTANTES
+"""
+
+# Quantos perfis de paciente (sintomas + doença) ficam com o prompt já montado
+PATIENT_PROMPT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=PATIENT_PROMPT_CACHE_SIZE)
+def _compile_patient_prompt(symptoms: Tuple[str, ...], disease: Optional[str]) -> str:
+    """
+    Prefixo estático + dados do paciente, montado uma vez por perfil. Os
+    turnos seguintes da mesma sessão (e de outras sessões com o mesmo
+    perfil) reaproveitam a mesma string.
+    """
+    if symptoms:
+        sintomas_formatados = "\n- " + "\n- ".join(symptoms)
+    else:
+        sintomas_formatados = ""
+
+    patient_section = f"""OBS. DADOS IMPORTANTES
 Aqui estão os dados de sintomas e da doença
 sintomas aqui: {sintomas_formatados}
 doença aqui: {disease}
 """
+    return f"{SINTOMAS_STATIC_PROMPT}{patient_section}"
+
+
+def GET_SINTOMAS_PROMPT(**kwargs):
+    symptom_list = kwargs.get("symptom_list") or []
+    disease = kwargs.get("disease", "")
+    return _compile_patient_prompt(tuple(symptom_list), disease)
+
+
+# Configuração do resumo incremental da conversa (ConversationSummarizer)
+SUMMARY_CONFIG = AgentConfig(
+    model="gpt-5-mini",
+    max_completion_tokens=4000,
+    reasoning_effort="low",
+    timeout=60.0,
+)
+
+SUMMARY_PROMPT = """
+Você é um assistente que resume conversas médico-paciente.
+Você receberá o resumo anterior da conversa (se houver) e as mensagens seguintes a ele.
+Produza um único resumo, curto e claro, com o essencial da conversa até o momento,
+incorporando o resumo anterior.
+Não perca informações médicas relevantes: sintomas já revelados pelo paciente,
+perguntas feitas pelo médico e hipóteses ou orientações mencionadas.
+Responda apenas com o resumo.
+"""
+
+
+def GET_SUMMARY_MESSAGE(previous_summary: Optional[str], conversation: str) -> str:
+    previous_section = f"Resumo anterior:\n{previous_summary}\n\n" if previous_summary else ""
+    return f"{previous_section}Mensagens seguintes:\n{conversation}\n\nResumo:"
@@ -0,0 +1,41 @@
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+ROUTER_LABELS = ("sintomas", "conversation", "final", "fallback")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class IntentPrediction(BaseModel):
+    label: str
+    confidence: float
+    tier: str
+
+
+class IntentClassifier(ABC):
+    """Classificador local (sem LLM) da mensagem do médico."""
+
+    tier: str = "local"
+
+    @abstractmethod
+    def classify(self, message: str, *, is_first_turn: bool = False) -> Optional[IntentPrediction]:
+        """
+        Retorna a categoria prevista com a confiança, ou None quando não há
+        nenhum indício para decidir. ``is_first_turn`` indica que a sessão
+        ainda não tem histórico (a mensagem abre a consulta).
+        """
+        raise NotImplementedError
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos, para regras e tokens estáveis."""
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(normalize_text(text))
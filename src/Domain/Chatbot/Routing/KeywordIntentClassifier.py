@@ -0,0 +1,109 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.Domain.Chatbot.Routing.IntentClassifier import (
+    IntentClassifier,
+    IntentPrediction,
+    normalize_text,
+)
+
+# (categoria, padrão sobre o texto normalizado, confiança)
+DEFAULT_RULES: List[Tuple[str, str, float]] = [
+    (
+        "sintomas",
+        r"\b(sintomas?|sente|sentindo|sentiu|dor(es)?|doi|doendo|febre|tosse|nausea|enjoo|"
+        r"vomit\w*|tontura|cansaco|falta de ar|coceira|sangr\w*|inchac\w*|diarreia)\b",
+        0.9,
+    ),
+    (
+        "sintomas",
+        r"\b(desde quando|ha quanto tempo|quando (isso )?comecou|onde doi|que horas|"
+        r"com que frequencia|piora quando|melhora quando)\b",
+        0.9,
+    ),
+    (
+        "final",
+        r"\b(ate a proxima|ate logo|ate mais|pode ir|boa recuperacao|melhoras|tchau|"
+        r"(consulta|atendimento) (esta )?(encerrad[ao]|finalizad[ao]))\b",
+        0.92,
+    ),
+    (
+        "conversation",
+        r"\b(seu diagnostico|o diagnostico|vou (te |lhe )?(receitar|prescrever|passar|pedir|encaminhar)|"
+        r"recomendo|(voce|o senhor|a senhora) (tem|esta com) (uma |um )?(gripe|virose|dengue|infeccao|"
+        r"alergia|sinusite|gastrite|enxaqueca))\b",
+        0.88,
+    ),
+]
+
+# Só valem no primeiro turno: um cumprimento isolado abre a consulta e vai
+# para 'sintomas'; mais adiante ("boa noite, doutor") pode ser despedida, e
+# a decisão fica com os tiers seguintes, que consideram o contexto
+OPENING_RULES: List[Tuple[str, str, float]] = [
+    (
+        "sintomas",
+        r"^(ola|oi|bom dia|boa tarde|boa noite)[\s,!.]*"
+        r"((doutor|doutora|senhor|senhora|tudo bem|como vai|como (voce )?esta)[\s,!.?]*)*$",
+        0.95,
+    ),
+]
+
+# Penalidade aplicada quando regras de categorias diferentes disparam juntas
+AMBIGUITY_PENALTY = 0.3
+
+_REPEATED_CHUNK = re.compile(r"(\w{2,4})\1{2,}")
+_VOWELS = set("aeiou")
+
+
+class KeywordIntentClassifier(IntentClassifier):
+    """
+    Primeiro tier do roteador: regras de palavras-chave/regex sobre a última
+    mensagem. Só decide com confiança alta quando exatamente uma categoria é
+    indicada; mensagens ambíguas ficam para os tiers seguintes.
+    """
+
+    tier = "keyword"
+
+    def __init__(
+        self,
+        rules: Optional[List[Tuple[str, str, float]]] = None,
+        opening_rules: Optional[List[Tuple[str, str, float]]] = None,
+    ):
+        self._rules = self._compile(rules or DEFAULT_RULES)
+        self._opening_rules = self._compile(OPENING_RULES if opening_rules is None else opening_rules)
+
+    @staticmethod
+    def _compile(rules: List[Tuple[str, str, float]]) -> List[Tuple[str, re.Pattern, float]]:
+        return [(label, re.compile(pattern), confidence) for label, pattern, confidence in rules]
+
+    def classify(self, message: str, *, is_first_turn: bool = False) -> Optional[IntentPrediction]:
+        text = normalize_text(message)
+        if not text:
+            return None
+
+        if self._is_gibberish(text):
+            return IntentPrediction(label="fallback", confidence=0.9, tier=self.tier)
+
+        rules = self._opening_rules + self._rules if is_first_turn else self._rules
+        scores: Dict[str, float] = {}
+        for label, pattern, confidence in rules:
+            if pattern.search(text):
+                scores[label] = max(scores.get(label, 0.0), confidence)
+
+        if not scores:
+            return None
+
+        label, confidence = max(scores.items(), key=lambda item: item[1])
+        if len(scores) > 1:
+            confidence -= AMBIGUITY_PENALTY
+        return IntentPrediction(label=label, confidence=confidence, tier=self.tier)
+
+    @staticmethod
+    def _is_gibberish(text: str) -> bool:
+        # Apenas um "token" longo sem estrutura (ex.: "ejdaedeadeadead", "sdfghjkl")
+        tokens = text.split()
+        if len(tokens) != 1 or len(tokens[0]) < 6 or not tokens[0].isalpha():
+            return False
+        token = tokens[0]
+        vowel_ratio = sum(char in _VOWELS for char in token) / len(token)
+        return vowel_ratio < 0.2 or (len(token) >= 10 and bool(_REPEATED_CHUNK.search(token)))
@@ -0,0 +1,105 @@
+import json
+import math
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.Domain.Chatbot.Routing.IntentClassifier import (
+    IntentClassifier,
+    IntentPrediction,
+    tokenize,
+)
+
+
+class NaiveBayesIntentClassifier(IntentClassifier):
+    """
+    Segundo tier do roteador: Naive Bayes multinomial (unigramas e bigramas)
+    treinado com as decisões do roteador LLM registradas em produção.
+
+    O modelo é um JSON pequeno gerado por ``tests/router_tier_evaluation.py
+    --train-model``; a confiança devolvida é a probabilidade posterior da
+    categoria vencedora.
+    """
+
+    tier = "model"
+
+    def __init__(
+        self,
+        class_counts: Dict[str, int],
+        token_counts: Dict[str, Dict[str, int]],
+        alpha: float = 1.0,
+    ):
+        self.class_counts = dict(class_counts)
+        self.token_counts = {label: dict(counts) for label, counts in token_counts.items()}
+        self.alpha = alpha
+
+        self._vocabulary = {token for counts in self.token_counts.values() for token in counts}
+        total_docs = sum(self.class_counts.values()) or 1
+        self._log_priors = {
+            label: math.log(count / total_docs) for label, count in self.class_counts.items()
+        }
+        self._totals = {
+            label: sum(self.token_counts.get(label, {}).values()) for label in self.class_counts
+        }
+
+    @staticmethod
+    def features(message: str) -> list:
+        tokens = tokenize(message)
+        return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+    @classmethod
+    def train(
+        cls,
+        samples: Iterable[Tuple[str, str]],
+        alpha: float = 1.0,
+    ) -> "NaiveBayesIntentClassifier":
+        """Treina a partir de pares (mensagem, categoria)."""
+        class_counts: Counter = Counter()
+        token_counts: Dict[str, Counter] = {}
+        for message, label in samples:
+            class_counts[label] += 1
+            token_counts.setdefault(label, Counter()).update(cls.features(message))
+        return cls(class_counts, token_counts, alpha=alpha)
+
+    def classify(self, message: str, *, is_first_turn: bool = False) -> Optional[IntentPrediction]:
+        features = [f for f in self.features(message) if f in self._vocabulary]
+        if not features or not self.class_counts:
+            return None
+
+        vocabulary_size = len(self._vocabulary)
+        log_scores: Dict[str, float] = {}
+        for label, log_prior in self._log_priors.items():
+            counts = self.token_counts.get(label, {})
+            denominator = self._totals[label] + self.alpha * vocabulary_size
+            log_scores[label] = log_prior + sum(
+                math.log((counts.get(f, 0) + self.alpha) / denominator) for f in features
+            )
+
+        # Softmax estável para transformar as pontuações em probabilidades
+        best_label = max(log_scores, key=log_scores.get)
+        best_score = log_scores[best_label]
+        normalizer = sum(math.exp(score - best_score) for score in log_scores.values())
+        return IntentPrediction(label=best_label, confidence=1.0 / normalizer, tier=self.tier)
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "class_counts": self.class_counts,
+            "token_counts": self.token_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NaiveBayesIntentClassifier":
+        return cls(
+            class_counts=data.get("class_counts") or {},
+            token_counts=data.get("token_counts") or {},
+            alpha=float(data.get("alpha", 1.0)),
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesIntentClassifier":
+        with open(path, "r", encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
@@ -0,0 +1,73 @@
+import os
+from typing import List, Optional
+
+from src.Domain.Chatbot.Routing.IntentClassifier import IntentClassifier, IntentPrediction, ROUTER_LABELS
+from src.Domain.Chatbot.Routing.KeywordIntentClassifier import KeywordIntentClassifier
+from src.Domain.Chatbot.Routing.NaiveBayesIntentClassifier import NaiveBayesIntentClassifier
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+LLM_TIER = "llm"
+
+
+class TieredIntentRouter:
+    """
+    Roteamento em camadas: os classificadores locais são consultados em
+    ordem (regras e, se houver, o modelo treinado) e o primeiro que decidir
+    com confiança >= ``confidence_threshold`` evita a chamada ao RouterAgent.
+    Abaixo do limiar, ``classify`` retorna None e o turno escala para o LLM.
+
+    Configuração via ambiente: ROUTER_LOCAL_TIER (padrão "true"),
+    ROUTER_CONFIDENCE_THRESHOLD (padrão 0.85) e ROUTER_MODEL_PATH (modelo
+    Naive Bayes opcional).
+    """
+
+    def __init__(
+        self,
+        classifiers: Optional[List[IntentClassifier]] = None,
+        *,
+        confidence_threshold: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.logger = get_logger(__name__)
+
+        if enabled is None:
+            enabled = os.getenv("ROUTER_LOCAL_TIER", "true").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+
+        if confidence_threshold is None:
+            confidence_threshold = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.85"))
+        self.confidence_threshold = confidence_threshold
+
+        if classifiers is None:
+            classifiers = [KeywordIntentClassifier()]
+            model_path = os.getenv("ROUTER_MODEL_PATH")
+            if model_path:
+                classifiers.append(NaiveBayesIntentClassifier.load(model_path))
+                self.logger.info("Modelo do roteador carregado de %s", model_path)
+        self.classifiers = classifiers
+
+        metrics = metrics or get_metrics_registry()
+        self._decisions = metrics.counter(
+            "router_tier_decisions_total",
+            "Decisões de roteamento por tier (keyword, model, llm) e categoria",
+        )
+
+    def classify(self, message: str, *, is_first_turn: bool = False) -> Optional[IntentPrediction]:
+        if not self.enabled:
+            return None
+
+        for classifier in self.classifiers:
+            prediction = classifier.classify(message, is_first_turn=is_first_turn)
+            if (
+                prediction is not None
+                and prediction.label in ROUTER_LABELS
+                and prediction.confidence >= self.confidence_threshold
+            ):
+                self._decisions.inc(tier=prediction.tier, label=prediction.label)
+                return prediction
+        return None
+
+    def record_llm_decision(self, label: str) -> None:
+        self._decisions.inc(tier=LLM_TIER, label=label)
@@ -1,7 +1,10 @@
 # src/HandlerFactory.py
-from typing import Dict, Type, Tuple, Optional
+from typing import Callable, Dict, Type, Tuple, Optional, Sequence
 
 from src.Domain.Chatbot.Abstractions.AgentInterface import AgentInterface
+from src.Domain.Chatbot.Abstractions.TracedAgent import TracedAgent
+from src.Domain.Factories.AgentProfiles import AgentProfiles
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface
 from src.Domain.Interfaces.Llm.LlmProviderResolver import LlmProviderResolver
 from src.SharedKernel.Messages.Exceptions import (
     HandlerNotFoundError,
@@ -31,10 +34,34 @@ from src.Domain.Chatbot.Agents.FinalAgent.FinalAgentConfig import (
 )
 
 
+# Seção anexada ao system prompt de qualquer agente quando a sessão já tem
+# um resumo: fica depois das partes estáveis e só muda quando o resumo é refeito.
+SUMMARY_SECTION = """
+RESUMO DA CONVERSA ATÉ AQUI (mensagens mais antigas, já fora do histórico):
+{summary}
+---
+"""
+
+
+# Envolve o LLM resolvido para um agente (métricas, cache, retries...).
+# Recebe o LLM, o tipo do agente e o provedor.
+LlmDecorator = Callable[[LlmInterface, str, str], LlmInterface]
+
+
 class AgentFactory:
-    def __init__(self, llm_provider_resolver: LlmProviderResolver):
+    def __init__(
+        self,
+        llm_provider_resolver: LlmProviderResolver,
+        *,
+        agent_profiles: Optional[AgentProfiles] = None,
+        llm_decorators: Optional[Sequence[LlmDecorator]] = None,
+    ):
         self.logger = get_logger(__name__)
         self.llm_provider_resolver = llm_provider_resolver
+        # Provedor e parâmetros do LLM de cada agente (recarregáveis sem restart)
+        self.agent_profiles = agent_profiles or AgentProfiles()
+        # Aplicados em ordem: o último fica por fora
+        self.llm_decorators = list(llm_decorators or ())
 
         # --- Agentes de alto nível (antes: handlers com agente) ---
         self.agent_classes: Dict[str, Type[AgentInterface]] = {
@@ -81,20 +108,31 @@ class AgentFactory:
                     f"Configuração de agent não encontrada: {agent_type}"
                 )
 
+            # llm_type explícito tem precedência sobre o provedor do perfil
+            profile = self.agent_profiles.get(agent_type)
+            llm_type = llm_type or profile.provider
             if not llm_type:
                 raise AgentTypeNotFoundError(f"Tipo de llm não registrado: {llm_type}")
 
             config, prompt_getter = self.agent_configs[agent_type]
-            prompt = prompt_getter(**(prompt_data or {}))
+            config = profile.apply(config)
+            prompt_data = dict(prompt_data or {})
+            summary = prompt_data.pop("conversation_summary", None)
+            prompt = prompt_getter(**prompt_data)
+            if summary:
+                prompt = f"{prompt}{SUMMARY_SECTION.format(summary=summary)}"
             llm = self.llm_provider_resolver.resolve(
                 llm_type=llm_type,
                 config=config,
                 system_prompt=prompt,
             )
+            for decorate in self.llm_decorators:
+                llm = decorate(llm, agent_type, llm_type)
 
             agent_class = self.agent_classes[agent_type]
 
-            return agent_class(llm=llm)
+            # Cada hop do turno vira um span e alimenta a latência por agente
+            return TracedAgent(agent_class(llm=llm), agent_type)
 
         except Exception:
             self.logger.exception("Erro ao criar agent")
@@ -0,0 +1,128 @@
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig
+from src.SharedKernel.Logging.Logger import get_logger
+
+DEFAULT_PROFILE_KEY = "default"
+
+
+class AgentProfile(BaseModel):
+    """
+    Perfil de execução de um agente: provedor e parâmetros do LLM. Campos
+    None mantêm o valor do ``*_CONFIG`` do agente.
+    """
+
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    max_completion_tokens: Optional[int] = None
+    reasoning_effort: Optional[str] = None
+    thinking_budget: Optional[int] = None
+    timeout: Optional[float] = None
+
+    def merged(self, other: "AgentProfile") -> "AgentProfile":
+        """Sobrepõe os campos definidos em ``other`` a este perfil."""
+        return self.model_copy(update=other.model_dump(exclude_none=True))
+
+    def apply(self, config: LlmConfig) -> LlmConfig:
+        updates = self.model_dump(exclude={"provider"}, exclude_none=True)
+        return config.model_copy(update=updates) if updates else config
+
+
+class AgentProfiles:
+    """
+    Perfis declarativos por agente (provedor, modelo, orçamento de saída,
+    esforço de raciocínio e timeout), aplicados pelo AgentFactory sobre os
+    ``*_CONFIG`` de cada agente.
+
+    O JSON tem uma chave por agente e a chave opcional ``default``, aplicada
+    a todos antes da específica::
+
+        {"default": {"provider": "gpt"},
+         "router": {"model": "gpt-5-nano", "max_completion_tokens": 256}}
+
+    Fontes, em ordem de precedência crescente: o arquivo AGENT_PROFILES_PATH
+    (recarregado quando o mtime muda, sem reiniciar a API; o mtime é
+    consultado no máximo a cada AGENT_PROFILES_RELOAD_SECONDS, padrão 5) e o
+    JSON inline em AGENT_PROFILES. Se a releitura falhar, os perfis anteriores continuam
+    valendo. Sem provedor em nenhuma fonte, vale LLM_DEFAULT_PROVIDER
+    (padrão "gpt").
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Optional[str] = None,
+        overrides: Optional[Dict[str, Any]] = None,
+        default_provider: Optional[str] = None,
+        reload_interval: Optional[float] = None,
+    ):
+        self.logger = get_logger(__name__)
+        self.path = path or os.getenv("AGENT_PROFILES_PATH") or None
+
+        if overrides is None:
+            overrides = json.loads(os.getenv("AGENT_PROFILES") or "{}")
+        self._overrides = self._parse(overrides)
+
+        self.default_provider = default_provider or os.getenv("LLM_DEFAULT_PROVIDER") or "gpt"
+
+        if reload_interval is None:
+            reload_interval = float(os.getenv("AGENT_PROFILES_RELOAD_SECONDS", "5"))
+        self.reload_interval = reload_interval
+
+        self._file_profiles: Dict[str, AgentProfile] = {}
+        self._mtime: Optional[float] = None
+        self._resolved: Dict[str, AgentProfile] = {}
+        self._reload_if_changed()
+        self._next_check = time.monotonic() + self.reload_interval
+
+    @staticmethod
+    def _parse(raw: Dict[str, Any]) -> Dict[str, AgentProfile]:
+        return {str(name): AgentProfile(**(values or {})) for name, values in raw.items()}
+
+    def get(self, agent_type: str) -> AgentProfile:
+        # get roda em todo hop de agente, no event loop: o os.stat é espaçado
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self._reload_if_changed()
+        profile = self._resolved.get(agent_type)
+        if profile is None:
+            profile = AgentProfile(provider=self.default_provider)
+            for source in (self._file_profiles, self._overrides):
+                for key in (DEFAULT_PROFILE_KEY, agent_type):
+                    if key in source:
+                        profile = profile.merged(source[key])
+            self._resolved[agent_type] = profile
+        return profile
+
+    def _reload_if_changed(self) -> None:
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as exc:
+            if self._mtime is not None:
+                self.logger.error("Arquivo de perfis %s indisponível: %s", self.path, exc)
+                self._mtime = None
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as profile_file:
+                profiles = self._parse(json.load(profile_file))
+        except (OSError, ValueError, TypeError, AttributeError) as exc:
+            # Mantém os perfis anteriores; tenta de novo na próxima alteração
+            self.logger.error("Perfis de agentes inválidos em %s: %s", self.path, exc)
+            self._mtime = mtime
+            return
+
+        self._file_profiles = profiles
+        self._mtime = mtime
+        self._resolved = {}
+        self.logger.info("Perfis de agentes carregados de %s: %s", self.path, sorted(profiles))
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Sequence
 
 from pydantic import BaseModel, Field
 
@@ -11,20 +11,69 @@ class LlmResponse(BaseModel):
     payload: dict = Field(default_factory=dict)
 
 
+class LlmMessage(BaseModel):
+    """Mensagem de chat estruturada: ``role`` é "user" ou "assistant"."""
+    role: str
+    content: str
+
+
 class LlmConfig(BaseModel):
     model: str
     max_completion_tokens: int
+    # Parâmetros opcionais (None = padrão do provedor). reasoning_effort vale
+    # para os modelos de raciocínio da OpenAI e thinking_budget para o Gemini.
+    reasoning_effort: Optional[str] = None
+    thinking_budget: Optional[int] = None
+    timeout: Optional[float] = None
 
 
 class LlmInterface(ABC):
     def __init__(self, config: LlmConfig, system_prompt: str):
         self.config = config
         self.system_prompt = system_prompt
+        # Uso de tokens da última chamada (inclusive streaming), quando o provedor informa
+        self.last_usage: Optional[dict] = None
+        # Provedor e modelo que atenderam a última chamada, para decoradores
+        # que podem trocar de provedor (HedgedLlm); None = os configurados
+        self.last_provider: Optional[str] = None
+        self.last_model: Optional[str] = None
         self.logger = get_logger(__name__)
 
     @abstractmethod
-    async def process(self, message: str) -> LlmResponse:
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        """
+        Processa a mensagem usando o LLM e retorna uma resposta. ``history``
+        traz os turnos anteriores da conversa, enviados como mensagens de
+        chat entre o system prompt e a mensagem atual.
         """
-        Processa a mensagem usando o LLM e retorna uma resposta.
+        raise NotImplementedError
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Processa a mensagem devolvendo a resposta em partes (tokens) à medida
+        que são geradas. Provedores sem streaming nativo entregam a resposta
+        completa em uma única parte.
         """
-        raise NotImplementedError
\ No newline at end of file
+        response = await self.process(message, history)
+        if response.message:
+            yield response.message
+
+    def build_messages(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> List[LlmMessage]:
+        """Conversa completa: system prompt, turnos anteriores e mensagem atual."""
+        return [
+            LlmMessage(role="system", content=self.system_prompt),
+            *(history or ()),
+            LlmMessage(role="user", content=message),
+        ]
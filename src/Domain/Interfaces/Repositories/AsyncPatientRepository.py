@@ -0,0 +1,20 @@
+from abc import ABC
+from abc import abstractmethod
+from typing import List, Optional
+from uuid import UUID
+
+from src.Domain.Entities.Patient import Patient
+
+
+class AsyncPatientRepository(ABC):
+    @abstractmethod
+    async def get_patient(self, id: str) -> Patient:
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, patient_id: UUID) -> Optional[Patient]:
+        pass
+
+    @abstractmethod
+    async def list_all(self) -> List[Patient]:
+        pass
@@ -0,0 +1,21 @@
+from abc import ABC
+from abc import abstractmethod
+from typing import Dict, List
+from uuid import UUID
+
+from src.Domain.Entities.PatientSymptom import PatientSymptom
+from src.Domain.Entities.Symptom import Symptom
+
+
+class AsyncPatientSymptomRepository(ABC):
+    @abstractmethod
+    async def get_patient_symptoms(self, id: str) -> list[PatientSymptom]:
+        pass
+
+    @abstractmethod
+    async def list_symptoms_for_patient(self, patient_id: UUID) -> List[Symptom]:
+        pass
+
+    @abstractmethod
+    async def list_symptom_names_by_patient(self) -> Dict[UUID, List[str]]:
+        pass
@@ -0,0 +1,24 @@
+from abc import ABC
+from abc import abstractmethod
+from typing import List, Optional
+from uuid import UUID
+
+from src.Domain.Entities.Symptom import Symptom
+
+
+class AsyncSymptomRepository(ABC):
+    @abstractmethod
+    async def get_symptom(self, id: str) -> Symptom:
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, symptom_id: UUID) -> Optional[Symptom]:
+        pass
+
+    @abstractmethod
+    async def get_by_name(self, name: str) -> Optional[Symptom]:
+        pass
+
+    @abstractmethod
+    async def list_all(self) -> List[Symptom]:
+        pass
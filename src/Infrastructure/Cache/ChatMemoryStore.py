@@ -4,25 +4,49 @@ import json
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-from redis.exceptions import RedisError
+from redis.asyncio.client import Redis
+from redis.exceptions import RedisError, WatchError
 
+from src.Infrastructure.Cache.ChatSession import ChatSession
 from src.Infrastructure.Cache.RedisClient import get_redis_client
 from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Tracing.Tracer import traced
 
 
 class ChatMemoryStore:
     """
     Camada simples de persistência de memória do chat no Redis.
+
+    Cada sessão usa duas chaves:
+
+    - ``<prefixo><session_id>:meta`` (hash): metadados da sessão
+      (``symptom_list`` e ``disease``, serializados em JSON, além de
+      ``last_route`` e ``summary``);
+    - ``<prefixo><session_id>:history`` (lista): uma entrada JSON por mensagem.
+
+    Assim, adicionar uma mensagem é um RPUSH + LTRIM (O(1) amortizado e
+    atômico no Redis) em vez de ler, alterar e regravar o JSON inteiro da
+    sessão. Sessões no formato antigo (uma string JSON em
+    ``<prefixo><session_id>``) são migradas na primeira leitura ou em lote
+    via ``migrate_legacy_sessions``.
+
+    O caminho de um turno de conversa usa ``load_session``/``commit``: uma
+    leitura e uma escrita (pipeline) por turno.
     """
 
+    META_SUFFIX = ":meta"
+    HISTORY_SUFFIX = ":history"
+    SUMMARY_WRITE_ATTEMPTS = 3
+
     def __init__(
         self,
         *,
         key_prefix: str = "chat:session:",
         ttl_seconds: Optional[int] = None,
         max_history_entries: int = 50,
+        redis_client: Optional[Redis] = None,
     ):
-        self._redis = get_redis_client()
+        self._redis = redis_client or get_redis_client()
         self._logger = get_logger(__name__)
         self._key_prefix = key_prefix
         self._ttl = ttl_seconds
@@ -31,6 +55,12 @@ class ChatMemoryStore:
     def _build_key(self, session_id: str) -> str:
         return f"{self._key_prefix}{session_id}"
 
+    def _meta_key(self, session_id: str) -> str:
+        return f"{self._build_key(session_id)}{self.META_SUFFIX}"
+
+    def _history_key(self, session_id: str) -> str:
+        return f"{self._build_key(session_id)}{self.HISTORY_SUFFIX}"
+
     def _base_memory(
         self,
         *,
@@ -44,23 +74,328 @@ class ChatMemoryStore:
             "history": history or [],
         }
 
-    async def get_memory(self, session_id: str) -> Optional[dict[str, Any]]:
-        key = self._build_key(session_id)
+    def _build_entry(self, role: str, message: str) -> dict[str, Any]:
+        return {
+            "role": role,
+            "message": message,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _encode_meta(self, symptom_list: Optional[list[str]], disease: Optional[str]) -> dict[str, str]:
+        return {
+            "symptom_list": json.dumps(symptom_list or []),
+            "disease": json.dumps(disease),
+        }
+
+    def _decode_meta(self, key: str, raw_meta: dict[str, str]) -> dict[str, Any]:
+        try:
+            symptom_list = json.loads(raw_meta.get("symptom_list") or "[]")
+            disease = json.loads(raw_meta.get("disease") or "null")
+        except json.JSONDecodeError:
+            self._logger.warning("Metadados inválidos na memória do chat para %s", key)
+            symptom_list, disease = [], None
+        return {
+            "symptom_list": symptom_list,
+            "disease": disease,
+            "last_route": raw_meta.get("last_route") or None,
+            "summary": raw_meta.get("summary") or None,
+        }
+
+    def _decode_history(self, key: str, raw_entries: list[str]) -> list[dict[str, Any]]:
+        history = []
+        for raw_entry in raw_entries:
+            try:
+                history.append(json.loads(raw_entry))
+            except json.JSONDecodeError:
+                self._logger.warning("Entrada de histórico inválida ignorada em %s", key)
+        return history
+
+    def _history_range(self, history_limit: Optional[int]) -> tuple[int, int]:
+        if history_limit:
+            return -history_limit, -1
+        return 0, -1
+
+    def _refresh_ttl(self, pipe, *keys: str) -> None:
+        if self._ttl:
+            for key in keys:
+                pipe.expire(key, self._ttl)
+
+    @traced("redis.get_memory", **{"db.system": "redis"})
+    async def get_memory(
+        self,
+        session_id: str,
+        *,
+        history_limit: Optional[int] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Retorna metadados e histórico da sessão em uma única ida ao Redis.
+        Com ``history_limit``, apenas as últimas N entradas são lidas.
+        """
+        meta_key = self._meta_key(session_id)
+        history_key = self._history_key(session_id)
+        start, end = self._history_range(history_limit)
         try:
-            raw_data = await self._redis.get(key)
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(meta_key)
+                pipe.lrange(history_key, start, end)
+                raw_meta, raw_history = await pipe.execute()
         except RedisError as exc:
-            self._logger.error("Erro ao recuperar memória do Redis para %s: %s", key, exc)
+            self._logger.error("Erro ao recuperar memória do Redis para %s: %s", meta_key, exc)
             return None
 
-        if not raw_data:
-            return None
+        if not raw_meta:
+            migrated = await self.migrate_legacy_session(session_id)
+            if migrated is None:
+                return None
+            if history_limit:
+                migrated["history"] = migrated["history"][-history_limit:]
+            return migrated
+
+        memory = self._decode_meta(meta_key, raw_meta)
+        memory["history"] = self._decode_history(history_key, raw_history)
+        return memory
+
+    @traced("redis.load_session", **{"db.system": "redis"})
+    async def load_session(
+        self,
+        session_id: str,
+        *,
+        history_limit: Optional[int] = None,
+    ) -> ChatSession:
+        """
+        Carrega a sessão inteira (metadados, histórico recente e eventual
+        chave no formato antigo) em uma única ida ao Redis. Se o Redis
+        falhar, retorna uma sessão degradada, que não será gravada.
+        """
+        meta_key = self._meta_key(session_id)
+        history_key = self._history_key(session_id)
+        legacy_key = self._build_key(session_id)
+        start, end = self._history_range(history_limit)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(meta_key)
+                pipe.lrange(history_key, start, end)
+                pipe.get(legacy_key)
+                raw_meta, raw_history, raw_legacy = await pipe.execute()
+        except RedisError as exc:
+            self._logger.error("Erro ao carregar sessão do Redis para %s: %s", meta_key, exc)
+            session = ChatSession(session_id, is_new=True, degraded=True)
+            session.round_trips += 1
+            return session
+
+        if raw_meta:
+            meta = self._decode_meta(meta_key, raw_meta)
+            session = ChatSession(
+                session_id,
+                symptom_list=meta["symptom_list"],
+                disease=meta["disease"],
+                history=self._decode_history(history_key, raw_history),
+                last_route=meta["last_route"],
+                summary=meta["summary"],
+            )
+        elif raw_legacy:
+            session = self._session_from_legacy(session_id, raw_legacy, history_limit)
+        else:
+            session = ChatSession(session_id, is_new=True)
 
+        session.round_trips += 1
+        return session
+
+    def _session_from_legacy(
+        self,
+        session_id: str,
+        raw_legacy: str,
+        history_limit: Optional[int],
+    ) -> ChatSession:
         try:
-            return json.loads(raw_data)
+            legacy = json.loads(raw_legacy)
         except json.JSONDecodeError:
-            self._logger.warning("Payload inválido na memória do chat para %s", key)
+            self._logger.warning("Payload inválido na memória do chat para %s", self._build_key(session_id))
+            return ChatSession(session_id, is_new=True)
+
+        legacy_history = legacy.get("history") or []
+        if self._max_history_entries:
+            legacy_history = legacy_history[-self._max_history_entries :]
+
+        return ChatSession(
+            session_id,
+            symptom_list=legacy.get("symptom_list"),
+            disease=legacy.get("disease"),
+            history=legacy_history[-history_limit:] if history_limit else list(legacy_history),
+            legacy_history=legacy_history,
+        )
+
+    @traced("redis.commit", **{"db.system": "redis"})
+    async def commit(self, session: ChatSession) -> bool:
+        """
+        Grava tudo o que mudou na sessão durante o turno em uma única
+        transação (MULTI/EXEC): metadados, novas mensagens, LTRIM e TTL.
+        Retorna False se a gravação falhar ou a sessão estiver degradada.
+        """
+        if session.degraded:
+            self._logger.warning(
+                "Sessão %s carregada sem Redis; alterações do turno não serão gravadas",
+                session.session_id,
+            )
+            return False
+
+        if not session.has_pending_changes:
+            return True
+
+        meta_key = self._meta_key(session.session_id)
+        history_key = self._history_key(session.session_id)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                meta_mapping = dict(session.meta_updates)
+                if session.meta_dirty:
+                    meta_mapping.update(self._encode_meta(session.symptom_list, session.disease))
+                if meta_mapping:
+                    pipe.hset(meta_key, mapping=meta_mapping)
+                if session.legacy_history is not None:
+                    # Migração do formato antigo: regrava o histórico completo
+                    pipe.delete(history_key)
+                    if session.legacy_history:
+                        pipe.rpush(
+                            history_key,
+                            *(json.dumps(entry) for entry in session.legacy_history),
+                        )
+                    pipe.delete(self._build_key(session.session_id))
+                if session.pending_entries:
+                    pipe.rpush(
+                        history_key,
+                        *(json.dumps(entry) for entry in session.pending_entries),
+                    )
+                if self._max_history_entries:
+                    pipe.ltrim(history_key, -self._max_history_entries, -1)
+                self._refresh_ttl(pipe, meta_key, history_key)
+                # Tamanho final da lista, usado para decidir se a sessão deve ser resumida
+                pipe.llen(history_key)
+                results = await pipe.execute()
+        except RedisError as exc:
+            session.round_trips += 1
+            self._logger.error("Erro ao gravar sessão no Redis para %s: %s", meta_key, exc)
+            return False
+
+        session.round_trips += 1
+        session.history_length = results[-1]
+        session.mark_committed()
+        return True
+
+    @traced("redis.load_summary_source", **{"db.system": "redis"})
+    async def load_summary_source(
+        self,
+        session_id: str,
+        count: int,
+    ) -> Optional[tuple[Optional[str], list[dict[str, Any]]]]:
+        """
+        Lê, em uma ida ao Redis, o resumo atual da sessão e as ``count``
+        entradas mais antigas do histórico (as que serão resumidas).
+        Retorna None se o Redis falhar.
+        """
+        meta_key = self._meta_key(session_id)
+        history_key = self._history_key(session_id)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.hget(meta_key, "summary")
+                pipe.lrange(history_key, 0, count - 1)
+                summary, raw_history = await pipe.execute()
+        except RedisError as exc:
+            self._logger.error("Erro ao ler histórico para resumo em %s: %s", history_key, exc)
+            return None
+        return summary or None, self._decode_history(history_key, raw_history)
+
+    @traced("redis.save_summary", **{"db.system": "redis"})
+    async def save_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summarized_entries: list[dict[str, Any]],
+    ) -> bool:
+        """
+        Grava o novo resumo e remove do início do histórico as entradas que
+        ele passou a cobrir, na mesma transação.
+
+        Enquanto o LLM resumia, turnos concorrentes podem ter aplicado o
+        LTRIM do ``commit`` e empurrado a lista para a frente. Por isso o
+        corte não é por posição: com WATCH na lista, só saem as entradas
+        resumidas que ainda estão no início dela. Se o início não bater com
+        o que foi resumido, nada é gravado e retorna False.
+        """
+        meta_key = self._meta_key(session_id)
+        history_key = self._history_key(session_id)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                for _ in range(self.SUMMARY_WRITE_ATTEMPTS):
+                    try:
+                        await pipe.watch(history_key)
+                        raw_head = await pipe.lrange(history_key, 0, len(summarized_entries) - 1)
+                        remaining = self._summarized_at_head(
+                            self._decode_history(history_key, raw_head),
+                            summarized_entries,
+                        )
+                        if remaining is None:
+                            await pipe.unwatch()
+                            self._logger.warning(
+                                "Histórico de %s mudou durante o resumo; resumo descartado",
+                                history_key,
+                            )
+                            return False
+
+                        pipe.multi()
+                        pipe.hset(meta_key, "summary", summary)
+                        if remaining:
+                            pipe.ltrim(history_key, remaining, -1)
+                        self._refresh_ttl(pipe, meta_key, history_key)
+                        await pipe.execute()
+                        return True
+                    except WatchError:
+                        # Um commit concorrente alterou a lista: verifica de novo
+                        continue
+        except RedisError as exc:
+            self._logger.error("Erro ao gravar resumo da sessão em %s: %s", meta_key, exc)
+            return False
+
+        self._logger.warning("Histórico de %s em disputa; resumo adiado", history_key)
+        return False
+
+    @staticmethod
+    def _summarized_at_head(
+        head: list[dict[str, Any]],
+        summarized_entries: list[dict[str, Any]],
+    ) -> Optional[int]:
+        """
+        Quantas entradas resumidas ainda abrem a lista (as demais já saíram
+        pelo LTRIM do ``commit``). None se o início da lista não for um
+        sufixo das entradas resumidas.
+        """
+        if not summarized_entries:
+            return 0
+        last = summarized_entries[-1]
+        remaining = next(
+            (index + 1 for index in range(len(head) - 1, -1, -1) if head[index] == last),
+            0,
+        )
+        if head[:remaining] != summarized_entries[len(summarized_entries) - remaining:]:
             return None
+        return remaining
+
+    @traced("redis.get_history", **{"db.system": "redis"})
+    async def get_history(
+        self,
+        session_id: str,
+        *,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        history_key = self._history_key(session_id)
+        start, end = self._history_range(limit)
+        try:
+            raw_history = await self._redis.lrange(history_key, start, end)
+        except RedisError as exc:
+            self._logger.error("Erro ao recuperar histórico do Redis para %s: %s", history_key, exc)
+            return []
+        return self._decode_history(history_key, raw_history)
 
+    @traced("redis.save_memory", **{"db.system": "redis"})
     async def save_memory(
         self,
         session_id: str,
@@ -69,44 +404,111 @@ class ChatMemoryStore:
         *,
         history: Optional[list[dict[str, Any]]] = None,
     ) -> dict[str, Any]:
-        key = self._build_key(session_id)
         data = self._base_memory(
             symptom_list=symptom_list,
             disease=disease,
             history=history,
         )
-        return await self._write_data(key, data)
+        await self._write_session(session_id, data)
+        return data
 
+    @traced("redis.append_history", **{"db.system": "redis"})
     async def append_history(self, session_id: str, role: str, message: str) -> dict[str, Any]:
         """
-        Adiciona uma entrada (role/message) ao histórico, respeitando o limite configurado.
+        Adiciona uma entrada (role/message) ao histórico, respeitando o limite
+        configurado, em uma única transação (RPUSH + LTRIM + EXPIRE).
+        Retorna a entrada adicionada.
         """
-        key = self._build_key(session_id)
-        data = await self.get_memory(session_id) or self._base_memory()
+        meta_key = self._meta_key(session_id)
+        history_key = self._history_key(session_id)
+        entry = self._build_entry(role, message)
 
-        history = data.get("history") or []
-        history.append(
-            {
-                "role": role,
-                "message": message,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-        )
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(history_key, json.dumps(entry))
+                if self._max_history_entries:
+                    pipe.ltrim(history_key, -self._max_history_entries, -1)
+                self._refresh_ttl(pipe, meta_key, history_key)
+                await pipe.execute()
+        except RedisError as exc:
+            self._logger.error("Erro ao salvar histórico no Redis para %s: %s", history_key, exc)
+
+        return entry
 
+    async def _write_session(self, session_id: str, data: dict[str, Any]) -> None:
+        meta_key = self._meta_key(session_id)
+        history_key = self._history_key(session_id)
+        history = data.get("history") or []
         if self._max_history_entries:
             history = history[-self._max_history_entries :]
 
-        data["history"] = history
-        return await self._write_data(key, data)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    meta_key,
+                    mapping=self._encode_meta(data.get("symptom_list"), data.get("disease")),
+                )
+                pipe.delete(history_key)
+                if history:
+                    pipe.rpush(history_key, *(json.dumps(entry) for entry in history))
+                self._refresh_ttl(pipe, meta_key, history_key)
+                await pipe.execute()
+        except RedisError as exc:
+            self._logger.error("Erro ao salvar memória no Redis para %s: %s", meta_key, exc)
 
-    async def _write_data(self, key: str, data: dict[str, Any]) -> dict[str, Any]:
+    @traced("redis.migrate_legacy_session", **{"db.system": "redis"})
+    async def migrate_legacy_session(self, session_id: str) -> Optional[dict[str, Any]]:
+        """
+        Converte uma sessão gravada no formato antigo (string JSON única) para
+        o layout hash + lista e remove a chave antiga. Retorna a memória
+        migrada ou None se não houver sessão antiga.
+        """
+        legacy_key = self._build_key(session_id)
         try:
-            if self._ttl:
-                await self._redis.set(key, json.dumps(data), ex=self._ttl)
-            else:
-                await self._redis.set(key, json.dumps(data))
+            raw_data = await self._redis.get(legacy_key)
         except RedisError as exc:
-            self._logger.error("Erro ao salvar memória no Redis para %s: %s", key, exc)
+            self._logger.error("Erro ao recuperar memória antiga do Redis para %s: %s", legacy_key, exc)
+            return None
 
+        if not raw_data:
+            return None
+
+        try:
+            legacy = json.loads(raw_data)
+        except json.JSONDecodeError:
+            self._logger.warning("Payload inválido na memória do chat para %s", legacy_key)
+            return None
+
+        data = self._base_memory(
+            symptom_list=legacy.get("symptom_list"),
+            disease=legacy.get("disease"),
+            history=legacy.get("history"),
+        )
+        await self._write_session(session_id, data)
+
+        try:
+            await self._redis.delete(legacy_key)
+        except RedisError as exc:
+            self._logger.error("Erro ao remover memória antiga do Redis para %s: %s", legacy_key, exc)
+
+        self._logger.info("Sessão %s migrada para o layout hash + lista", session_id)
         return data
 
+    @traced("redis.migrate_legacy_sessions", **{"db.system": "redis"})
+    async def migrate_legacy_sessions(self, *, batch_size: int = 500) -> int:
+        """
+        Migra em lote todas as chaves ``<prefixo>*`` ainda no formato antigo.
+        Retorna a quantidade de sessões migradas.
+        """
+        migrated = 0
+        async for key in self._redis.scan_iter(match=f"{self._key_prefix}*", count=batch_size):
+            if key.endswith(self.META_SUFFIX) or key.endswith(self.HISTORY_SUFFIX):
+                continue
+            if await self._redis.type(key) != "string":
+                continue
+
+            session_id = key[len(self._key_prefix):]
+            if await self.migrate_legacy_session(session_id) is not None:
+                migrated += 1
+
+        return migrated
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
+
+
+class ChatSession:
+    """
+    Unidade de trabalho de um turno de conversa.
+
+    É carregada uma única vez no início do turno (``ChatMemoryStore.load_session``),
+    alterada em memória durante o turno e gravada de uma vez no final
+    (``ChatMemoryStore.commit``). Também contabiliza quantas idas ao Redis o
+    turno fez, para instrumentação.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        *,
+        symptom_list: Optional[list[str]] = None,
+        disease: Optional[str] = None,
+        history: Optional[list[dict[str, Any]]] = None,
+        is_new: bool = False,
+        degraded: bool = False,
+        legacy_history: Optional[list[dict[str, Any]]] = None,
+        last_route: Optional[str] = None,
+        summary: Optional[str] = None,
+    ):
+        self.session_id = session_id
+        self.symptom_list: list[str] = symptom_list or []
+        self.disease = disease
+        self.history: list[dict[str, Any]] = history or []
+        # Mesma conversa já no formato de mensagens do LLM, estendida a cada
+        # add_message (não é reconstruída a cada agente do turno)
+        self.messages: list[LlmMessage] = [
+            LlmMessage(role=entry.get("role") or "user", content=entry.get("message") or "")
+            for entry in self.history
+        ]
+        self.is_new = is_new
+        # Sessão montada sem o Redis (erro na leitura): nunca é gravada para
+        # não sobrescrever a sessão real quando o Redis voltar.
+        self.degraded = degraded
+        # Histórico completo de uma sessão no formato antigo, regravado no commit
+        self.legacy_history = legacy_history
+        # Agente escolhido pelo roteador no último turno (usado na especulação)
+        self.last_route = last_route
+        # Resumo das mensagens antigas, já removidas da lista de histórico
+        self.summary = summary
+        # Tamanho da lista de histórico no Redis após o último commit
+        self.history_length: Optional[int] = None
+        self.round_trips = 0
+
+        self._pending_entries: list[dict[str, Any]] = []
+        self._meta_dirty = is_new or legacy_history is not None
+        self._meta_updates: dict[str, str] = {}
+
+    @property
+    def pending_entries(self) -> list[dict[str, Any]]:
+        return self._pending_entries
+
+    @property
+    def meta_dirty(self) -> bool:
+        return self._meta_dirty
+
+    @property
+    def meta_updates(self) -> dict[str, str]:
+        """Campos avulsos do hash de metadados alterados no turno."""
+        return self._meta_updates
+
+    @property
+    def has_prior_history(self) -> bool:
+        """Se a conversa já tinha mensagens (ou resumo) antes deste turno."""
+        return bool(self.summary) or len(self.history) > len(self._pending_entries)
+
+    @property
+    def has_pending_changes(self) -> bool:
+        return self._meta_dirty or bool(self._meta_updates) or bool(self._pending_entries)
+
+    def set_profile(self, symptom_list: list[str], disease: Optional[str]) -> None:
+        self.symptom_list = symptom_list
+        self.disease = disease
+        self._meta_dirty = True
+
+    def set_last_route(self, route: str) -> None:
+        if route != self.last_route:
+            self.last_route = route
+            self._meta_updates["last_route"] = route
+
+    def add_message(self, role: str, message: str) -> dict[str, Any]:
+        entry = {
+            "role": role,
+            "message": message,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        self.history.append(entry)
+        self.messages.append(LlmMessage(role=role, content=message))
+        self._pending_entries.append(entry)
+        return entry
+
+    def context_messages(self, window: int) -> list[LlmMessage]:
+        """
+        Até ``window`` mensagens anteriores à última mensagem do médico, que é
+        enviada à parte como mensagem atual.
+        """
+        end = len(self.messages)
+        for index in range(end - 1, -1, -1):
+            if self.messages[index].role == "user":
+                end = index
+                break
+        return self.messages[max(0, end - window):end]
+
+    def mark_committed(self) -> None:
+        self._pending_entries = []
+        self._meta_updates = {}
+        self._meta_dirty = False
+        self.legacy_history = None
+        self.is_new = False
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from redis.asyncio.client import Redis
+from redis.exceptions import RedisError
+
+from src.Domain.Chatbot.Routing.IntentClassifier import tokenize
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage, LlmResponse
+from src.Infrastructure.Cache.RedisClient import get_redis_client
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+# Vetor esparso: índice da dimensão -> peso (normalizado)
+Vector = Dict[int, float]
+Embedder = Callable[[str], Vector]
+
+
+def normalize_message(message: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação: "Bom dia!" e "bom dia" são iguais."""
+    return " ".join(tokenize(message))
+
+
+def hashing_embedder(dimensions: int = 512) -> Embedder:
+    """
+    Embedding local e barato (feature hashing de trigramas de caracteres),
+    suficiente para reconhecer variações de digitação e pontuação sem
+    chamar nenhuma API.
+    """
+
+    def embed(text: str) -> Vector:
+        padded = f"  {normalize_message(text)}  "
+        vector: Vector = {}
+        for index in range(len(padded) - 2):
+            digest = hashlib.blake2b(padded[index : index + 3].encode(), digest_size=4).digest()
+            bucket = int.from_bytes(digest, "little") % dimensions
+            vector[bucket] = vector.get(bucket, 0.0) + 1.0
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {bucket: weight / norm for bucket, weight in vector.items()}
+
+    return embed
+
+
+def cosine(left: Vector, right: Vector) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(bucket, 0.0) for bucket, weight in left.items())
+
+
+def parse_agent_allowlist(raw: str) -> Dict[str, int]:
+    """
+    "router:1,fallback,final:0" -> {"router": 1, "fallback": 0, "final": 0}.
+    O número é quantas mensagens anteriores entram na chave do cache.
+    """
+    agents: Dict[str, int] = {}
+    for item in raw.split(","):
+        name, _, depth = item.strip().partition(":")
+        if name:
+            agents[name.strip().lower()] = int(depth) if depth.strip() else 0
+    return agents
+
+
+class LlmResponseCache:
+    """
+    Cache de respostas do LLM para agentes determinísticos (roteador,
+    fallback, final), compartilhado por todas as sessões.
+
+    - L1: LRU em memória com TTL e tamanho máximo (``max_entries``);
+    - L2: Redis (``llm:cache:<hash>``) com o mesmo TTL, compartilhado entre
+      workers. Acertos no L2 são promovidos ao L1.
+
+    A chave combina agente, provedor, modelo, hash do system prompt (que já
+    inclui dados do paciente e resumo), as ``N`` mensagens anteriores
+    configuradas para o agente e a mensagem normalizada.
+
+    Para os agentes em ``similarity_agents``, uma busca por similaridade
+    (cosseno entre embeddings, padrão ``hashing_embedder``) serve também
+    mensagens quase iguais dentro do mesmo contexto. Os embeddings ficam só
+    em memória, então essa busca vale para o que o próprio worker já viu, e
+    saem junto com a entrada do L1 (no máximo ``max_entries`` no total).
+
+    Configuração via ambiente: RESPONSE_CACHE_ENABLED (padrão "false"),
+    RESPONSE_CACHE_AGENTS (padrão "router:1,fallback:0,final:0"),
+    RESPONSE_CACHE_TTL_SECONDS (padrão 3600), RESPONSE_CACHE_MAX_ENTRIES
+    (padrão 5000), RESPONSE_CACHE_SIMILARITY_AGENTS (padrão vazio) e
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD (padrão 0.8).
+    """
+
+    KEY_PREFIX = "llm:cache:"
+
+    def __init__(
+        self,
+        *,
+        enabled: Optional[bool] = None,
+        agents: Optional[Dict[str, int]] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        similarity_agents: Optional[Sequence[str]] = None,
+        similarity_threshold: Optional[float] = None,
+        embedder: Optional[Embedder] = None,
+        use_redis: bool = True,
+        redis_client: Optional[Redis] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.logger = get_logger(__name__)
+
+        if enabled is None:
+            enabled = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+
+        if agents is None:
+            agents = parse_agent_allowlist(
+                os.getenv("RESPONSE_CACHE_AGENTS") or "router:1,fallback:0,final:0"
+            )
+        self.agents = agents
+
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+        self.ttl = ttl_seconds
+
+        if max_entries is None:
+            max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+        self.max_entries = max_entries
+
+        if similarity_agents is None:
+            similarity_agents = parse_agent_allowlist(os.getenv("RESPONSE_CACHE_SIMILARITY_AGENTS") or "")
+        self.similarity_agents = set(similarity_agents)
+
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", "0.8"))
+        self.similarity_threshold = similarity_threshold
+        self._embed = embedder or hashing_embedder()
+
+        self._redis = (redis_client or get_redis_client()) if use_redis else None
+        # chave -> (expira_em, resposta)
+        self._entries: "OrderedDict[str, Tuple[float, LlmResponse]]" = OrderedDict()
+        # contexto -> {chave: embedding}, só para os agentes com similaridade
+        self._vectors: Dict[str, Dict[str, Vector]] = {}
+        # chave -> contexto, para remover o embedding quando a entrada sai do L1
+        self._vector_contexts: Dict[str, str] = {}
+
+        metrics = metrics or get_metrics_registry()
+        self._lookups = metrics.counter(
+            "llm_response_cache_total",
+            "Consultas ao cache de respostas por agente e resultado (l1, l2, similar, miss)",
+        )
+
+    def covers(self, agent_type: str) -> bool:
+        return self.enabled and agent_type in self.agents
+
+    def context_fingerprint(
+        self,
+        agent_type: str,
+        provider: str,
+        model: str,
+        system_prompt: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> str:
+        depth = self.agents.get(agent_type, 0)
+        recent = list(history or ())[-depth:] if depth else []
+        parts = [agent_type, provider, model, hashlib.sha256(system_prompt.encode()).hexdigest()]
+        parts.extend(f"{item.role}:{normalize_message(item.content)}" for item in recent)
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    @staticmethod
+    def entry_key(context: str, message: str) -> str:
+        return hashlib.sha256(f"{context}\x1f{normalize_message(message)}".encode()).hexdigest()
+
+    async def get(self, agent_type: str, context: str, message: str) -> Optional[LlmResponse]:
+        key = self.entry_key(context, message)
+
+        response = self._get_local(key)
+        if response is not None:
+            self._lookups.inc(agent=agent_type, result="l1")
+            return response
+
+        response = await self._get_remote(key)
+        if response is not None:
+            self._put_local(key, response)
+            self._lookups.inc(agent=agent_type, result="l2")
+            return response
+
+        if agent_type in self.similarity_agents:
+            similar_key = self._find_similar(context, message)
+            response = self._get_local(similar_key) if similar_key else None
+            if response is not None:
+                self._lookups.inc(agent=agent_type, result="similar")
+                return response
+
+        self._lookups.inc(agent=agent_type, result="miss")
+        return None
+
+    async def put(self, agent_type: str, context: str, message: str, response: LlmResponse) -> None:
+        if not response.message:
+            return
+        key = self.entry_key(context, message)
+        self._put_local(key, response)
+        if agent_type in self.similarity_agents and key in self._entries:
+            self._vectors.setdefault(context, {})[key] = self._embed(message)
+            self._vector_contexts[key] = context
+        await self._put_remote(key, response)
+
+    def _get_local(self, key: str) -> Optional[LlmResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._drop_vector(key)
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _put_local(self, key: str, response: LlmResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._drop_vector(evicted)
+
+    def _drop_vector(self, key: str) -> None:
+        context = self._vector_contexts.pop(key, None)
+        if context is None:
+            return
+        vectors = self._vectors[context]
+        del vectors[key]
+        if not vectors:
+            del self._vectors[context]
+
+    def _find_similar(self, context: str, message: str) -> Optional[str]:
+        vectors = self._vectors.get(context)
+        if not vectors:
+            return None
+        query = self._embed(message)
+        best_key, best_score = None, self.similarity_threshold
+        for key, vector in vectors.items():
+            score = cosine(query, vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    async def _get_remote(self, key: str) -> Optional[LlmResponse]:
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(f"{self.KEY_PREFIX}{key}")
+        except RedisError as exc:
+            self.logger.warning("Cache de respostas indisponível no Redis: %s", exc)
+            return None
+        if not raw:
+            return None
+        try:
+            return LlmResponse(**json.loads(raw))
+        except (ValueError, TypeError):
+            return None
+
+    async def _put_remote(self, key: str, response: LlmResponse) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                f"{self.KEY_PREFIX}{key}",
+                response.model_dump_json(),
+                ex=max(1, int(self.ttl)),
+            )
+        except RedisError as exc:
+            self.logger.warning("Erro ao gravar no cache de respostas do Redis: %s", exc)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._vectors.clear()
+        self._vector_contexts.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "contexts": len(self._vectors),
+            "vectors": len(self._vector_contexts),
+        }
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import psycopg
+from psycopg import sql
+
+from src.Domain.Interfaces.Repositories.AsyncPatientRepository import AsyncPatientRepository
+from src.Domain.Interfaces.Repositories.AsyncPatientSymptomRepository import AsyncPatientSymptomRepository
+from src.Infrastructure.Database.Config import get_database_dsn
+from src.Infrastructure.Repositories.AsyncPatientRepositoryPostgres import AsyncPatientRepositoryPostgres
+from src.Infrastructure.Repositories.AsyncPatientSymptomRepositoryPostgres import AsyncPatientSymptomRepositoryPostgres
+from src.SharedKernel.Logging.Logger import get_logger
+
+
+SAMPLING_STRATEGIES = ("uniform", "stratified", "weighted")
+
+
+class PatientProfile:
+    """Paciente pronto para uma nova sessão: doença e nomes dos sintomas."""
+
+    __slots__ = ("patient_id", "disease", "symptom_names")
+
+    def __init__(self, patient_id: UUID, disease: Optional[str], symptom_names: Tuple[str, ...]):
+        self.patient_id = patient_id
+        self.disease = disease
+        self.symptom_names = symptom_names
+
+
+class _CatalogSnapshot:
+    """Visão imutável do catálogo, trocada atomicamente a cada refresh."""
+
+    def __init__(self, profiles: List[PatientProfile], disease_weights: Dict[str, float]):
+        self.profiles = profiles
+        self.by_disease: Dict[Optional[str], List[PatientProfile]] = {}
+        for profile in profiles:
+            self.by_disease.setdefault(profile.disease, []).append(profile)
+        self.diseases = list(self.by_disease.keys())
+        self.cumulative_weights = list(
+            accumulate(disease_weights.get(disease or "", 1.0) for disease in self.diseases)
+        )
+        self.loaded_at = time.monotonic()
+
+
+class PatientCatalog:
+    """
+    Catálogo em memória de pacientes e sintomas usado para sortear o paciente
+    de cada nova sessão sem nenhuma ida ao PostgreSQL.
+
+    O catálogo é carregado uma vez (no startup) e renovado em segundo plano
+    quando o TTL expira ou quando chega um NOTIFY no canal configurado; durante
+    o refresh continua servindo a versão anterior.
+
+    Estratégias de sorteio:
+    - ``uniform``: cada paciente com a mesma probabilidade;
+    - ``stratified``: sorteia a doença uniformemente e depois um paciente dela;
+    - ``weighted``: sorteia a doença pelos pesos informados (padrão 1.0).
+
+    Configuração via ambiente: PATIENT_CATALOG_TTL_SECONDS (padrão 300),
+    PATIENT_SAMPLING, PATIENT_SAMPLING_WEIGHTS (JSON, ex.: {"dengue": 2}) e
+    PATIENT_CATALOG_NOTIFY_CHANNEL.
+    """
+
+    def __init__(
+        self,
+        patient_repository: Optional[AsyncPatientRepository] = None,
+        patient_symptom_repository: Optional[AsyncPatientSymptomRepository] = None,
+        *,
+        ttl_seconds: Optional[float] = None,
+        sampling: Optional[str] = None,
+        disease_weights: Optional[Dict[str, float]] = None,
+        notify_channel: Optional[str] = None,
+    ):
+        self._logger = get_logger(__name__)
+        self._patient_repository = patient_repository or AsyncPatientRepositoryPostgres()
+        self._patient_symptom_repository = (
+            patient_symptom_repository or AsyncPatientSymptomRepositoryPostgres()
+        )
+
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("PATIENT_CATALOG_TTL_SECONDS", "300"))
+        self._ttl = ttl_seconds
+
+        sampling = (sampling or os.getenv("PATIENT_SAMPLING") or "uniform").lower().strip()
+        if sampling not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Estratégia de sorteio de pacientes inválida: {sampling!r}")
+        self._sampling = sampling
+
+        if disease_weights is None:
+            disease_weights = json.loads(os.getenv("PATIENT_SAMPLING_WEIGHTS") or "{}")
+        self._disease_weights = {str(k): float(v) for k, v in disease_weights.items()}
+        invalid = {k: v for k, v in self._disease_weights.items() if not math.isfinite(v) or v < 0}
+        if invalid:
+            raise ValueError(f"Pesos de sorteio de pacientes inválidos (devem ser >= 0): {invalid}")
+
+        self._notify_channel = notify_channel or os.getenv("PATIENT_CATALOG_NOTIFY_CHANNEL")
+
+        self._snapshot: Optional[_CatalogSnapshot] = None
+        self._stale = False
+        # Incrementado a cada invalidação: um refresh só limpa ``_stale`` se
+        # nenhuma chegou enquanto ele lia o banco
+        self._generation = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._snapshot.profiles) if self._snapshot else 0
+
+    async def start(self) -> None:
+        """
+        Carrega o catálogo e, se configurado, passa a escutar o canal NOTIFY.
+        """
+        await self.refresh()
+        if self._notify_channel and self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen_for_changes())
+
+    async def stop(self) -> None:
+        for task in (self._listener_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._listener_task = None
+        self._refresh_task = None
+
+    def invalidate(self) -> None:
+        """Marca o catálogo como desatualizado; o próximo sorteio agenda um refresh."""
+        self._generation += 1
+        self._stale = True
+
+    async def refresh(self) -> None:
+        generation = self._generation
+        profiles = await self._load_profiles()
+        snapshot = _CatalogSnapshot(profiles, self._disease_weights)
+        if self._sampling == "weighted" and profiles and snapshot.cumulative_weights[-1] <= 0:
+            # random.choices falharia em todo sorteio; mantém o catálogo anterior
+            raise ValueError("PATIENT_SAMPLING_WEIGHTS zera o peso de todas as doenças do catálogo")
+        self._snapshot = snapshot
+        self._stale = self._generation != generation
+        self._logger.info("Catálogo de pacientes carregado com %s pacientes", len(profiles))
+
+    async def _load_profiles(self) -> List[PatientProfile]:
+        patients, symptoms_by_patient = await asyncio.gather(
+            self._patient_repository.list_all(),
+            self._patient_symptom_repository.list_symptom_names_by_patient(),
+        )
+        return [
+            PatientProfile(
+                patient_id=patient.patient_id,
+                disease=patient.disease,
+                symptom_names=tuple(symptoms_by_patient.get(patient.patient_id, ())),
+            )
+            for patient in patients
+        ]
+
+    async def sample(self) -> Optional[PatientProfile]:
+        """
+        Sorteia um paciente segundo a estratégia configurada. Só acessa o
+        banco se o catálogo ainda não tiver sido carregado.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            await self.refresh()
+            snapshot = self._snapshot
+        elif self._needs_refresh(snapshot):
+            self._schedule_refresh()
+
+        if not snapshot.profiles:
+            return None
+
+        if self._sampling == "uniform":
+            return random.choice(snapshot.profiles)
+
+        if self._sampling == "stratified":
+            disease = random.choice(snapshot.diseases)
+        else:
+            disease = random.choices(
+                snapshot.diseases, cum_weights=snapshot.cumulative_weights
+            )[0]
+        return random.choice(snapshot.by_disease[disease])
+
+    def _needs_refresh(self, snapshot: _CatalogSnapshot) -> bool:
+        if self._stale:
+            return True
+        return bool(self._ttl) and time.monotonic() - snapshot.loaded_at >= self._ttl
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_in_background())
+
+    async def _refresh_in_background(self) -> None:
+        # Repete enquanto chegarem invalidações durante o refresh: a leitura
+        # em andamento pode ser anterior à alteração avisada
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                self._logger.error("Erro ao atualizar o catálogo de pacientes: %s", exc)
+                return
+            if not self._stale:
+                return
+
+    async def _listen_for_changes(self) -> None:
+        """
+        Escuta LISTEN/NOTIFY no PostgreSQL e invalida o catálogo a cada aviso.
+        Reconecta com espera crescente se a conexão cair.
+        """
+        delay = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    get_database_dsn(), autocommit=True
+                ) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self._notify_channel)))
+                    self._logger.info("Escutando alterações de pacientes no canal %s", self._notify_channel)
+                    delay = 1.0
+                    async for _ in conn.notifies():
+                        self.invalidate()
+                        self._schedule_refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._logger.error("Erro no listener do catálogo de pacientes: %s", exc)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
@@ -52,3 +52,15 @@ def get_redis_client() -> Redis:
         decode_responses=True,
     )
 
+
+async def close_redis_client() -> None:
+    """
+    Fecha o cliente Redis compartilhado (se já tiver sido criado) e limpa o
+    cache para que uma nova chamada a get_redis_client crie outro cliente.
+    """
+    if get_redis_client.cache_info().currsize == 0:
+        return
+
+    client = get_redis_client()
+    get_redis_client.cache_clear()
+    await client.aclose()
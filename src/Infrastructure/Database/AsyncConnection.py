@@ -0,0 +1,88 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from psycopg import AsyncConnection
+
+from psycopg_pool import AsyncConnectionPool
+
+from src.Infrastructure.Database.Config import get_database_dsn, get_pool_settings
+from src.SharedKernel.Logging.Logger import get_logger
+
+_async_pool: Optional[AsyncConnectionPool] = None
+_logger = get_logger(__name__)
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    """
+    Retorna o pool async de conexões, criando-o (ainda fechado) caso
+    necessário. Use open_async_pool no startup para abri-lo e aquecê-lo.
+    """
+    global _async_pool
+    if _async_pool is None:
+        dsn = get_database_dsn()
+        settings = get_pool_settings()
+        _logger.info(
+            "Criando pool async de conexões com o PostgreSQL (min=%s, max=%s)",
+            settings["min_size"],
+            settings["max_size"],
+        )
+        _async_pool = AsyncConnectionPool(
+            conninfo=dsn,
+            **settings,
+            kwargs={"autocommit": True},
+            open=False,
+        )
+    return _async_pool
+
+
+async def open_async_pool(wait: bool = True) -> AsyncConnectionPool:
+    """
+    Abre o pool async. Com wait=True, aguarda até que min_size conexões
+    estejam estabelecidas (aquecimento no startup).
+    """
+    pool = get_async_pool()
+    if pool.closed:
+        await pool.open(wait=wait)
+        _logger.info("Pool async do PostgreSQL aberto: %s", pool.get_stats())
+    return pool
+
+
+@asynccontextmanager
+async def get_async_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    Context manager async para obter uma conexão do pool (abrindo-o na
+    primeira vez, caso o startup não o tenha aquecido):
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("select 1")
+    """
+    pool = get_async_pool()
+    if pool.closed:
+        await open_async_pool()
+    async with pool.connection() as conn:
+        yield conn
+
+
+def get_async_pool_stats() -> dict:
+    """
+    Estatísticas do pool async (conexões abertas, disponíveis, em espera
+    etc.) para monitoramento. Retorna um dicionário vazio se o pool não
+    existir.
+    """
+    if _async_pool is None:
+        return {}
+
+    stats = dict(_async_pool.get_stats())
+    stats["closed"] = _async_pool.closed
+    return stats
+
+
+async def close_async_pool() -> None:
+    """
+    Fecha o pool async, caso tenha sido inicializado.
+    """
+    global _async_pool
+    if _async_pool is not None:
+        _logger.info("Encerrando pool async de conexões com o PostgreSQL")
+        await _async_pool.close()
+        _async_pool = None
@@ -38,5 +38,36 @@ def get_database_dsn() -> str:
     )
 
 
+def _get_int_env(name: str, default: int) -> int:
+    raw_value = os.getenv(name)
+    if not raw_value:
+        return default
+    try:
+        return int(raw_value)
+    except ValueError:
+        raise RuntimeError(f"Variável {name} inválida: {raw_value!r}")
 
 
+def get_pool_settings() -> dict:
+    """
+    Retorna o dimensionamento dos pools de conexão (sync e async).
+
+    Variáveis opcionais:
+      DATABASE_POOL_MIN_SIZE (padrão 1)
+      DATABASE_POOL_MAX_SIZE (padrão 10)
+      DATABASE_POOL_MAX_IDLE (segundos, padrão 30)
+      DATABASE_POOL_TIMEOUT  (segundos de espera por uma conexão, padrão 30)
+    """
+    min_size = _get_int_env("DATABASE_POOL_MIN_SIZE", 1)
+    max_size = _get_int_env("DATABASE_POOL_MAX_SIZE", 10)
+    if min_size < 0 or max_size < max(min_size, 1):
+        raise RuntimeError(
+            "DATABASE_POOL_MAX_SIZE deve ser maior ou igual a DATABASE_POOL_MIN_SIZE"
+        )
+
+    return {
+        "min_size": min_size,
+        "max_size": max_size,
+        "max_idle": _get_int_env("DATABASE_POOL_MAX_IDLE", 30),
+        "timeout": _get_int_env("DATABASE_POOL_TIMEOUT", 30),
+    }
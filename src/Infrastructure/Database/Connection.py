@@ -2,7 +2,7 @@ from typing import Optional
 
 from psycopg_pool import ConnectionPool
 
-from src.Infrastructure.Database.Config import get_database_dsn
+from src.Infrastructure.Database.Config import get_database_dsn, get_pool_settings
 from src.SharedKernel.Logging.Logger import get_logger
 
 _pool: Optional[ConnectionPool] = None
@@ -16,9 +16,7 @@ def _ensure_pool() -> ConnectionPool:
         _logger.info("Inicializando pool de conexões com o PostgreSQL")
         _pool = ConnectionPool(
             conninfo=dsn,
-            min_size=1,
-            max_size=10,
-            max_idle=30,  # segundos
+            **get_pool_settings(),
             kwargs={"autocommit": True},
         )
     return _pool
@@ -42,3 +40,12 @@ def get_connection():
     return pool.connection()
 
 
+def close_pool() -> None:
+    """
+    Fecha o pool de conexões, caso tenha sido inicializado.
+    """
+    global _pool
+    if _pool is not None:
+        _logger.info("Encerrando pool de conexões com o PostgreSQL")
+        _pool.close()
+        _pool = None
@@ -0,0 +1,90 @@
+from typing import AsyncIterator, Optional, Sequence
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmMessage, LlmResponse
+from src.Infrastructure.Cache.LlmResponseCache import LlmResponseCache
+
+
+class CachedLlm(LlmInterface):
+    """
+    Decorador que consulta o ``LlmResponseCache`` antes de chamar o LLM e
+    grava as respostas obtidas. Respostas servidas do cache não trazem
+    ``usage`` (nenhum token foi gasto) e são marcadas com
+    ``payload["cached"] = True``.
+    """
+
+    def __init__(
+        self,
+        llm: LlmInterface,
+        *,
+        cache: LlmResponseCache,
+        agent_type: str,
+        provider: str,
+    ):
+        super().__init__(llm.config, llm.system_prompt)
+        self.llm = llm
+        self.cache = cache
+        self.agent_type = agent_type
+        self.provider = provider
+
+    @classmethod
+    def decorator(cls, cache: LlmResponseCache):
+        """
+        Decorador no formato de ``AgentFactory.llm_decorators``: só envolve
+        os agentes da allowlist do cache.
+        """
+
+        def decorate(llm: LlmInterface, agent_type: str, provider: str) -> LlmInterface:
+            if not cache.covers(agent_type):
+                return llm
+            return cls(llm, cache=cache, agent_type=agent_type, provider=provider)
+
+        return decorate
+
+    def _context(self, history: Optional[Sequence[LlmMessage]]) -> str:
+        return self.cache.context_fingerprint(
+            self.agent_type, self.provider, self.config.model, self.system_prompt, history
+        )
+
+    async def _lookup(self, context: str, message: str) -> Optional[LlmResponse]:
+        cached = await self.cache.get(self.agent_type, context, message)
+        if cached is None:
+            return None
+        self.last_usage = None
+        return LlmResponse(message=cached.message, payload={"cached": True})
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        context = self._context(history)
+        cached = await self._lookup(context, message)
+        if cached is not None:
+            return cached
+
+        response = await self.llm.process(message, history)
+        self.last_usage = self.llm.last_usage
+        await self.cache.put(self.agent_type, context, message, response)
+        return response
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        context = self._context(history)
+        cached = await self._lookup(context, message)
+        if cached is not None:
+            if cached.message:
+                yield cached.message
+            return
+
+        parts: list[str] = []
+        async for delta in self.llm.stream(message, history):
+            parts.append(delta)
+            yield delta
+        self.last_usage = self.llm.last_usage
+        # Só chega aqui se o streaming terminou: respostas parciais não são gravadas
+        await self.cache.put(
+            self.agent_type, context, message, LlmResponse(message="".join(parts).strip())
+        )
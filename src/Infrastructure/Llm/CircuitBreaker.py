@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um provedor LLM.
+
+    - closed: chamadas liberadas; ``failure_threshold`` falhas seguidas abrem
+      o circuito;
+    - open: o provedor não é chamado por ``reset_timeout`` segundos;
+    - half_open: passado esse tempo, uma única chamada de teste decide se o
+      circuito fecha (sucesso) ou volta a abrir (falha).
+
+    Configuração via ambiente: LLM_CIRCUIT_FAILURE_THRESHOLD (padrão 5) e
+    LLM_CIRCUIT_RESET_SECONDS (padrão 30).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.logger = get_logger(__name__)
+        self.name = name
+
+        if failure_threshold is None:
+            failure_threshold = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.failure_threshold = max(1, failure_threshold)
+
+        if reset_timeout is None:
+            reset_timeout = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+        self.reset_timeout = reset_timeout
+
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        metrics = metrics or get_metrics_registry()
+        self._transitions = metrics.counter(
+            "llm_circuit_transitions_total",
+            "Mudanças de estado do circuit breaker por provedor",
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Diz se o provedor pode ser chamado agora. No half_open só a primeira
+        chamada passa; quem recebe True deve registrar o resultado
+        (``record_success``/``record_failure``) ou desistir com ``release``.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                if self._state != self.OPEN:
+                    self._transition(self.OPEN)
+
+    def release(self) -> None:
+        """A chamada liberada foi cancelada sem resultado (ex.: perdeu o hedge)."""
+        with self._lock:
+            self._probing = False
+
+    def _transition(self, state: str) -> None:
+        self.logger.warning("Circuito do provedor %s: %s -> %s", self.name, self._state, state)
+        self._state = state
+        self._transitions.inc(provider=self.name, state=state)
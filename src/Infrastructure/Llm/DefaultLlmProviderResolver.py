@@ -1,22 +1,51 @@
+import os
 from typing import Dict, Optional, Type
 
 from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmConfig
 from src.Domain.Interfaces.Llm.LlmProviderResolver import LlmProviderResolver
 from src.SharedKernel.Messages.Exceptions import AgentTypeNotFoundError
 from src.Infrastructure.Llm.GemniLlm import GeminiLlm
+from src.Infrastructure.Llm.HedgedLlm import HedgedLlm, HedgingPolicy
+from src.Infrastructure.Llm.LazyLlm import LazyLlm
 from src.Infrastructure.Llm.OpenAiLlm import OpenAILlm
+from src.Infrastructure.Llm.SingleFlightLlm import SingleFlightGroup, SingleFlightLlm
 
 
 class DefaultLlmProviderResolver(LlmProviderResolver):
+    """
+    Resolve o provedor LLM pelo nome. Todo provedor registrado passa pelo
+    ``SingleFlightGroup``: chamadas idênticas simultâneas viram uma única
+    requisição (desative com LLM_SINGLE_FLIGHT=false).
 
+    Com LLM_HEDGE_PROVIDER definido (ex.: "gemini"), os demais provedores
+    viram um ``HedgedLlm`` com ele de secundário, usando o modelo
+    LLM_HEDGE_MODEL (padrão "gemini-2.5-flash"). O secundário só é criado
+    na primeira vez em que é chamado.
+    """
 
     def __init__(
         self,
         providers: Optional[Dict[str, Type[LlmInterface]]] = None,
+        *,
+        single_flight: Optional[SingleFlightGroup] = None,
+        single_flight_enabled: Optional[bool] = None,
+        hedge_provider: Optional[str] = None,
+        hedge_model: Optional[str] = None,
+        hedging: Optional[HedgingPolicy] = None,
     ) -> None:
         self._providers: Dict[str, Type[LlmInterface]] = {}
         self._register_default_providers()
 
+        if single_flight_enabled is None:
+            single_flight_enabled = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() not in ("0", "false", "no")
+        self.single_flight = (single_flight or SingleFlightGroup()) if single_flight_enabled else None
+
+        if hedge_provider is None:
+            hedge_provider = os.getenv("LLM_HEDGE_PROVIDER") or ""
+        self.hedge_provider = hedge_provider.lower().strip() or None
+        self.hedge_model = hedge_model or os.getenv("LLM_HEDGE_MODEL") or "gemini-2.5-flash"
+        self.hedging = (hedging or HedgingPolicy()) if self.hedge_provider else None
+
         if providers:
             for name, provider in providers.items():
                 self.register(name, provider)
@@ -40,11 +69,38 @@ class DefaultLlmProviderResolver(LlmProviderResolver):
         if not llm_type:
             raise AgentTypeNotFoundError("Tipo de LLM não informado")
 
-        provider_cls = self._providers.get(llm_type.lower())
+        name = llm_type.lower()
+        llm = self._build(name, config, system_prompt)
+
+        secondary = self.hedge_provider
+        if not secondary or secondary == name:
+            return llm
+        if secondary not in self._providers:
+            raise AgentTypeNotFoundError(f"Provedor de hedge não registrado: {secondary}")
+
+        secondary_config = config.model_copy(update={"model": self.hedge_model})
+        backup = LazyLlm(
+            secondary_config,
+            system_prompt,
+            lambda: self._build(secondary, secondary_config, system_prompt),
+        )
+        return HedgedLlm(
+            llm,
+            backup,
+            primary_name=name,
+            secondary_name=secondary,
+            policy=self.hedging,
+        )
+
+    def _build(self, name: str, config: LlmConfig, system_prompt: str) -> LlmInterface:
+        provider_cls = self._providers.get(name)
         if not provider_cls:
-            raise AgentTypeNotFoundError(f"Tipo de LLM não registrado: {llm_type}")
+            raise AgentTypeNotFoundError(f"Tipo de LLM não registrado: {name}")
 
-        return provider_cls(config=config, system_prompt=system_prompt)
+        llm = provider_cls(config=config, system_prompt=system_prompt)
+        if self.single_flight is None:
+            return llm
+        return SingleFlightLlm(llm, group=self.single_flight, provider=name)
 
     def available_types(self) -> tuple[str, ...]:
         return tuple(self._providers.keys())
@@ -1,54 +1,125 @@
-from src.Domain.Interfaces.Llm.LlmInterface import LlmResponse, LlmInterface, LlmConfig
-import os
-import asyncio
-from pathlib import Path
-from dotenv import load_dotenv
-from google import genai
+from typing import AsyncIterator, Optional, Sequence
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmResponse, LlmInterface, LlmConfig, LlmMessage
+from src.Infrastructure.Llm.LlmClientRegistry import (
+    LlmClientRegistry,
+    get_api_key,
+    get_llm_client_registry,
+)
+from src.Infrastructure.Llm.LlmUsage import gemini_usage, record_usage
 from google.genai import types
 
 class GeminiLlm(LlmInterface):
-    def __init__(self, config: LlmConfig, system_prompt: str):
+    def __init__(
+        self,
+        config: LlmConfig,
+        system_prompt: str,
+        client_registry: Optional[LlmClientRegistry] = None,
+    ):
         super().__init__(config, system_prompt)
         
-        # Carrega o .env da raiz do projeto
-        src_dir = Path(__file__).resolve().parents[2]
-        project_root = src_dir.parent
-        env_path = project_root / ".env"
-        
-        if env_path.exists():
-            load_dotenv(dotenv_path=env_path, override=False)
-        
-        api_key = os.getenv("GEMINI_API_KEY")
+        api_key = get_api_key("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY não encontrada nas variáveis de ambiente!")
-        self.client = genai.Client(api_key=api_key)
 
-    async def process(self, message: str) -> LlmResponse:
+        # O cliente (e seu pool HTTP) é compartilhado por todo o processo
+        registry = client_registry or get_llm_client_registry()
+        self.client = registry.get_gemini_client(api_key)
+        self.concurrency_limiter = registry.get_concurrency_limiter("gemini")
+
+    def _build_contents(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> list[types.Content]:
+        # Formato nativo do Gemini: o assistente é o papel "model" e o system
+        # prompt vai em system_instruction (ver _build_config)
+        contents = [
+            types.Content(
+                role="model" if item.role == "assistant" else "user",
+                parts=[types.Part(text=item.content)],
+            )
+            for item in history or ()
+        ]
+        contents.append(types.Content(role="user", parts=[types.Part(text=message)]))
+        return contents
+
+    def _build_config(self) -> types.GenerateContentConfig:
+        thinking_config = None
+        if self.config.thinking_budget is not None:
+            thinking_config = types.ThinkingConfig(thinking_budget=self.config.thinking_budget)
+        http_options = None
+        if self.config.timeout:
+            # O Gemini recebe o timeout em milissegundos
+            http_options = types.HttpOptions(timeout=int(self.config.timeout * 1000))
+        return types.GenerateContentConfig(
+            system_instruction=self.system_prompt,
+            max_output_tokens=self.config.max_completion_tokens,
+            thinking_config=thinking_config,
+            http_options=http_options,
+        )
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
         if not message:
             raise ValueError("Mensagem vazia não é permitida")
         try:
-            full_prompt = f"{self.system_prompt}\n\n{message}"
 
-            # Chamada compatível com a SDK
-            response = await asyncio.to_thread(
-                lambda: self.client.models.generate_content(
+            # Chamada nativa async da SDK (client.aio)
+            async with self.concurrency_limiter:
+                response = await self.client.models.generate_content(
                     model=self.config.model,
-                    contents=full_prompt,
-                    config=types.GenerateContentConfig(
-                        max_output_tokens=self.config.max_completion_tokens
-                    )
+                    contents=self._build_contents(message, history),
+                    config=self._build_config(),
                 )
-            )
 
             content = (
                     response.text
                     or (response.candidates[0].content.parts[0].text if response.candidates else "")
                     ).strip()
 
+            usage = record_usage("gemini", self.config.model, gemini_usage(response.usage_metadata))
+            self.last_usage = usage
+
             return LlmResponse(
-                message=content
+                message=content,
+                payload={"usage": usage} if usage else {},
             )
 
         except Exception as e:
-            self.logger.error(f"Erro no GeminiAgent: {str(e)}")
+            self.logger.error("Erro no GeminiAgent: %s", e)
+            raise RuntimeError(f"Erro ao processar mensagem com Gemini: {str(e)}")
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        if not message:
+            raise ValueError("Mensagem vazia não é permitida")
+        try:
+
+            async with self.concurrency_limiter:
+                stream = await self.client.models.generate_content_stream(
+                    model=self.config.model,
+                    contents=self._build_contents(message, history),
+                    config=self._build_config(),
+                )
+                usage_metadata = None
+                try:
+                    async for chunk in stream:
+                        usage_metadata = chunk.usage_metadata or usage_metadata
+                        if chunk.text:
+                            yield chunk.text
+                finally:
+                    # Libera a conexão da SDK se o consumidor abandonar o stream
+                    await stream.aclose()
+                # O uso acumulado vem no último chunk que o informa
+                self.last_usage = record_usage("gemini", self.config.model, gemini_usage(usage_metadata))
+
+        except Exception as e:
+            self.logger.error("Erro no streaming do GeminiAgent: %s", e)
             raise RuntimeError(f"Erro ao processar mensagem com Gemini: {str(e)}")
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmMessage, LlmResponse
+from src.Infrastructure.Llm.CircuitBreaker import CircuitBreaker
+from src.SharedKernel.Messages.Exceptions import ProviderUnavailableError
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+
+class HedgingPolicy:
+    """
+    Estado compartilhado pelos ``HedgedLlm`` do processo: um circuit breaker
+    por provedor e uma janela das latências recentes de cada provedor/modelo,
+    de onde sai o atraso do hedge (o percentil configurado).
+
+    Enquanto a janela tiver menos de ``min_samples`` amostras vale
+    ``default_delay``. Configuração via ambiente: LLM_HEDGE_PERCENTILE
+    (padrão 95), LLM_HEDGE_WINDOW (padrão 200 amostras),
+    LLM_HEDGE_MIN_SAMPLES (padrão 20) e LLM_HEDGE_DEFAULT_DELAY_MS
+    (padrão 2000).
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: Optional[float] = None,
+        window: Optional[int] = None,
+        min_samples: Optional[int] = None,
+        default_delay: Optional[float] = None,
+        breaker_factory: Optional[Callable[[str], CircuitBreaker]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        if percentile is None:
+            percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.percentile = min(max(percentile, 0.0), 100.0)
+
+        if window is None:
+            window = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+        self.window = max(1, window)
+
+        if min_samples is None:
+            min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.min_samples = max(1, min_samples)
+
+        if default_delay is None:
+            default_delay = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "2000")) / 1000
+        self.default_delay = default_delay
+
+        self._metrics = metrics or get_metrics_registry()
+        self._breaker_factory = breaker_factory or (
+            lambda name: CircuitBreaker(name, metrics=self._metrics)
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+
+        self._outcomes = self._metrics.counter(
+            "llm_hedge_total",
+            "Chamadas do provedor composto por provedor que respondeu e desfecho "
+            "(primary, hedge, failover, circuit_open, unavailable)",
+        )
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = self._breaker_factory(provider)
+            self._breakers[provider] = breaker
+        return breaker
+
+    def hedge_delay(self, key: str) -> float:
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return self.default_delay
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.percentile / 100 * len(ordered)))
+        return ordered[index]
+
+    def record_latency(self, key: str, seconds: float) -> None:
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self._latencies[key] = samples
+        samples.append(seconds)
+
+    def record_outcome(self, provider: str, outcome: str) -> None:
+        self._outcomes.inc(provider=provider, outcome=outcome)
+
+
+class HedgedLlm(LlmInterface):
+    """
+    Provedor composto: chama o primário e, se ele passar do percentil de
+    latência da ``HedgingPolicy``, dispara a mesma chamada no secundário e
+    fica com a resposta que chegar primeiro (a outra é cancelada). Erro do
+    primário leva direto ao secundário, e provedores com o circuito aberto
+    são pulados.
+
+    No streaming a corrida vale até o primeiro token; depois disso o stream
+    vencedor segue sozinho, já que não dá para trocar de provedor no meio da
+    resposta. O ``usage`` é sempre o do provedor que respondeu, e
+    ``last_provider``/``last_model`` dizem qual foi (o ``MeteredLlm`` usa
+    esses valores nos rótulos).
+    """
+
+    def __init__(
+        self,
+        primary: LlmInterface,
+        secondary: LlmInterface,
+        *,
+        primary_name: str,
+        secondary_name: str,
+        policy: HedgingPolicy,
+    ):
+        super().__init__(primary.config, primary.system_prompt)
+        self.primary = primary
+        self.secondary = secondary
+        self.primary_name = primary_name
+        self.secondary_name = secondary_name
+        self.policy = policy
+
+    def _latency_key(self, name: str, llm: LlmInterface, mode: str) -> str:
+        # Modelo e orçamento de saída aproximam o agente: o roteador e os
+        # agentes de conversa têm latências bem diferentes
+        return f"{name}:{llm.config.model}:{llm.config.max_completion_tokens}:{mode}"
+
+    async def _attempt(
+        self,
+        name: str,
+        llm: LlmInterface,
+        mode: str,
+        run: Callable[[LlmInterface], Awaitable[Any]],
+    ) -> Any:
+        breaker = self.policy.breaker(name)
+        started = perf_counter()
+        try:
+            result = await run(llm)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        self.policy.record_latency(self._latency_key(name, llm, mode), perf_counter() - started)
+        return result
+
+    async def _race(
+        self,
+        mode: str,
+        run: Callable[[LlmInterface], Awaitable[Any]],
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Tuple[Any, str, LlmInterface]:
+        """
+        Corre as tentativas e devolve o primeiro resultado bem-sucedido.
+        ``discard`` libera o resultado de uma perdedora que terminou na
+        mesma rodada que a vencedora (ex.: fecha o stream do provedor).
+        """
+        attempts: Dict[asyncio.Task, Tuple[str, LlmInterface]] = {}
+        secondary_started = False
+        outcome = "primary"
+
+        def launch(name: str, llm: LlmInterface) -> None:
+            task = asyncio.create_task(self._attempt(name, llm, mode, run))
+            attempts[task] = (name, llm)
+
+        def launch_secondary(reason: str) -> None:
+            nonlocal secondary_started, outcome
+            secondary_started = True
+            if self.policy.breaker(self.secondary_name).allow():
+                outcome = reason
+                launch(self.secondary_name, self.secondary)
+
+        if self.policy.breaker(self.primary_name).allow():
+            launch(self.primary_name, self.primary)
+            hedge_delay = self.policy.hedge_delay(self._latency_key(self.primary_name, self.primary, mode))
+        else:
+            launch_secondary("circuit_open")
+            hedge_delay = None
+        if not attempts:
+            self.policy.record_outcome(self.secondary_name, "unavailable")
+            raise ProviderUnavailableError(
+                f"Provedores {self.primary_name} e {self.secondary_name} com o circuito aberto"
+            )
+
+        last_error: Optional[BaseException] = None
+        try:
+            while attempts:
+                timeout = None if secondary_started else hedge_delay
+                done, _ = await asyncio.wait(
+                    attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Primário passou do percentil: dispara o backup
+                    launch_secondary("hedge")
+                    continue
+
+                for task in done:
+                    name, llm = attempts.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self.policy.record_outcome(name, outcome)
+                        return task.result(), name, llm
+                    last_error = error
+                    self.logger.warning("Provedor %s falhou: %s", name, error)
+                    if not secondary_started:
+                        launch_secondary("failover")
+        finally:
+            for task in attempts:
+                task.cancel()
+            await self._settle_losers(attempts, discard)
+
+        raise last_error
+
+    @staticmethod
+    async def _settle_losers(
+        attempts: Dict[asyncio.Task, Tuple[str, LlmInterface]],
+        discard: Optional[Callable[[Any], Awaitable[None]]],
+    ) -> None:
+        # cancel() não afeta uma tarefa que já terminou: o resultado dela
+        # (stream aberto e vaga no limitador do provedor) precisa ser liberado
+        if not attempts:
+            return
+        await asyncio.gather(*attempts, return_exceptions=True)
+        if discard is None:
+            return
+        for task in attempts:
+            if not task.cancelled() and task.exception() is None:
+                await discard(task.result())
+
+    def _served_by(self, name: str, llm: LlmInterface) -> None:
+        self.last_provider = name
+        self.last_model = llm.config.model
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        self.last_provider = self.last_model = None
+        response, name, llm = await self._race("process", lambda llm: llm.process(message, history))
+        self._served_by(name, llm)
+        self.last_usage = llm.last_usage
+        return response
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+
+        async def first_chunk(llm: LlmInterface) -> Tuple[AsyncIterator[str], Optional[str]]:
+            chunks = llm.stream(message, history)
+            try:
+                return chunks, await chunks.__anext__()
+            except StopAsyncIteration:
+                return chunks, None
+            except BaseException:
+                await chunks.aclose()
+                raise
+
+        async def close_stream(result: Tuple[AsyncIterator[str], Optional[str]]) -> None:
+            await result[0].aclose()
+
+        self.last_provider = self.last_model = None
+        (chunks, first), name, llm = await self._race("stream", first_chunk, close_stream)
+        # Definido antes do primeiro token para o tempo até ele sair com o
+        # rótulo certo
+        self._served_by(name, llm)
+        try:
+            if first is not None:
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+        except Exception:
+            self.policy.breaker(name).record_failure()
+            raise
+        finally:
+            await chunks.aclose()
+        self.last_usage = llm.last_usage
@@ -0,0 +1,67 @@
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig, LlmInterface, LlmMessage, LlmResponse
+from src.Domain.Interfaces.Llm.LlmProviderResolver import LlmProviderResolver
+
+
+class LazyLlm(LlmInterface):
+    """
+    Adia a criação do provedor LLM até a primeira chamada.
+
+    Útil para dependências usadas raramente (ex.: o LLM de resumo): quem não
+    chama ``process``/``stream`` não paga pelo cliente, pela leitura do .env
+    nem falha por falta da chave de API daquele provedor. Criado uma vez, o
+    provedor é reaproveitado por todas as chamadas seguintes.
+    """
+
+    def __init__(
+        self,
+        config: LlmConfig,
+        system_prompt: str,
+        factory: Callable[[], LlmInterface],
+    ):
+        super().__init__(config, system_prompt)
+        self._factory = factory
+        self._llm: Optional[LlmInterface] = None
+
+    @classmethod
+    def from_resolver(
+        cls,
+        resolver: LlmProviderResolver,
+        llm_type: str,
+        config: LlmConfig,
+        system_prompt: str,
+    ) -> "LazyLlm":
+        return cls(
+            config,
+            system_prompt,
+            lambda: resolver.resolve(llm_type=llm_type, config=config, system_prompt=system_prompt),
+        )
+
+    @property
+    def is_created(self) -> bool:
+        return self._llm is not None
+
+    @property
+    def llm(self) -> LlmInterface:
+        if self._llm is None:
+            self._llm = self._factory()
+        return self._llm
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        response = await self.llm.process(message, history)
+        self.last_usage = self.llm.last_usage
+        return response
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        async for delta in self.llm.stream(message, history):
+            yield delta
+        self.last_usage = self.llm.last_usage
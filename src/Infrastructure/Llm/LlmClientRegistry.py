@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from src.SharedKernel.Logging.Logger import get_logger
+
+
+DEFAULT_POOL_SIZE = 64
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 60.0
+DEFAULT_MAX_CONCURRENCY = 64
+
+
+@lru_cache(maxsize=1)
+def load_project_env() -> None:
+    """
+    Carrega o .env da raiz do projeto uma única vez por processo.
+    """
+    project_root = Path(__file__).resolve().parents[3]
+    env_path = project_root / ".env"
+    if env_path.exists():
+        load_dotenv(dotenv_path=env_path, override=False)
+
+
+def get_api_key(env_var: str) -> Optional[str]:
+    """
+    Recupera a chave de API a partir das variáveis de ambiente, recorrendo ao
+    .env local (carregado uma única vez) apenas quando necessário.
+    """
+    api_key = os.getenv(env_var)
+    if api_key:
+        return api_key
+
+    load_project_env()
+    return os.getenv(env_var)
+
+
+def get_pool_size() -> int:
+    """
+    Tamanho do pool HTTP (keep-alive) por cliente, configurável via
+    LLM_HTTP_POOL_SIZE.
+    """
+    raw_value = os.getenv("LLM_HTTP_POOL_SIZE")
+    if not raw_value:
+        return DEFAULT_POOL_SIZE
+
+    try:
+        pool_size = int(raw_value)
+    except ValueError:
+        raise ValueError(f"LLM_HTTP_POOL_SIZE inválido: {raw_value!r}")
+
+    if pool_size <= 0:
+        raise ValueError("LLM_HTTP_POOL_SIZE deve ser maior que zero")
+    return pool_size
+
+
+def get_max_concurrency(provider: str) -> int:
+    """
+    Limite de chamadas simultâneas por provedor. Usa
+    LLM_MAX_CONCURRENCY_<PROVIDER> (ex.: LLM_MAX_CONCURRENCY_OPENAI) e, na
+    ausência dele, LLM_MAX_CONCURRENCY.
+    """
+    raw_value = os.getenv(f"LLM_MAX_CONCURRENCY_{provider.upper()}") or os.getenv(
+        "LLM_MAX_CONCURRENCY"
+    )
+    if not raw_value:
+        return DEFAULT_MAX_CONCURRENCY
+
+    try:
+        max_concurrency = int(raw_value)
+    except ValueError:
+        raise ValueError(f"Limite de concorrência inválido para {provider}: {raw_value!r}")
+
+    if max_concurrency <= 0:
+        raise ValueError("O limite de concorrência deve ser maior que zero")
+    return max_concurrency
+
+
+class LlmClientRegistry:
+    """
+    Registro de clientes SDK (async) compartilhados por processo.
+
+    Cada cliente é criado uma única vez por (provedor, api key) e reutiliza o
+    mesmo pool de conexões HTTP com keep-alive, evitando um novo handshake
+    TLS a cada agente instanciado. Também mantém um limitador de concorrência
+    por provedor, de forma que apenas o event loop e esse limite explícito
+    restrinjam o número de chamadas em andamento.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None):
+        self._logger = get_logger(__name__)
+        self._pool_size = pool_size or get_pool_size()
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._limiters: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    def _http_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self._pool_size,
+            max_keepalive_connections=self._pool_size,
+            keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+        )
+
+    def _get_or_create(self, provider: str, api_key: str, builder) -> Any:
+        key = (provider, api_key)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                self._logger.info(
+                    "Criando cliente %s compartilhado (pool=%s)", provider, self._pool_size
+                )
+                client = builder(api_key)
+                self._clients[key] = client
+        return client
+
+    def get_openai_client(self, api_key: str) -> AsyncOpenAI:
+        # A URL base pode ser trocada via OPENAI_BASE_URL (lido pela própria SDK).
+        # Sem retries na SDK: o RetryingLlm repete respeitando o prazo da requisição
+        return self._get_or_create(
+            "openai",
+            api_key,
+            lambda key: AsyncOpenAI(
+                api_key=key,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(limits=self._http_limits()),
+            ),
+        )
+
+    def get_gemini_client(self, api_key: str) -> genai.client.AsyncClient:
+        return self._get_or_create(
+            "gemini",
+            api_key,
+            lambda key: genai.Client(
+                api_key=key,
+                http_options=types.HttpOptions(
+                    base_url=os.getenv("GEMINI_BASE_URL") or None,
+                    async_client_args={"limits": self._http_limits()},
+                ),
+            ).aio,
+        )
+
+    def get_concurrency_limiter(self, provider: str) -> asyncio.Semaphore:
+        limiter = self._limiters.get(provider)
+        if limiter is not None:
+            return limiter
+
+        with self._lock:
+            limiter = self._limiters.get(provider)
+            if limiter is None:
+                limiter = asyncio.Semaphore(get_max_concurrency(provider))
+                self._limiters[provider] = limiter
+        return limiter
+
+    async def aclose(self) -> None:
+        """
+        Fecha todos os clientes registrados e seus pools HTTP.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._limiters.clear()
+
+        for client in clients:
+            try:
+                if hasattr(client, "aclose"):
+                    await client.aclose()
+                else:
+                    await client.close()
+            except Exception as exc:
+                self._logger.warning("Erro ao fechar cliente LLM: %s", exc)
+
+
+@lru_cache(maxsize=1)
+def get_llm_client_registry() -> LlmClientRegistry:
+    """
+    Retorna o registro de clientes LLM compartilhado pelo processo.
+    """
+    return LlmClientRegistry()
+
+
+async def close_llm_client_registry() -> None:
+    """
+    Fecha os clientes do registro compartilhado, se ele já tiver sido criado.
+    """
+    if get_llm_client_registry.cache_info().currsize == 0:
+        return
+
+    registry = get_llm_client_registry()
+    get_llm_client_registry.cache_clear()
+    await registry.aclose()
@@ -0,0 +1,52 @@
+from typing import Any, Optional
+
+from src.SharedKernel.Metrics.Metrics import get_metrics_registry
+
+_metrics = get_metrics_registry()
+_prompt_tokens = _metrics.counter(
+    "llm_prompt_tokens_total",
+    "Tokens de entrada enviados aos provedores LLM",
+)
+_cached_prompt_tokens = _metrics.counter(
+    "llm_cached_prompt_tokens_total",
+    "Tokens de entrada servidos pelo cache de prompt do provedor",
+)
+_completion_tokens = _metrics.counter(
+    "llm_completion_tokens_total",
+    "Tokens gerados pelos provedores LLM",
+)
+
+
+def openai_usage(usage: Any) -> Optional[dict]:
+    """Normaliza o ``usage`` da OpenAI (inclui os tokens vindos do cache)."""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+    }
+
+
+def gemini_usage(usage_metadata: Any) -> Optional[dict]:
+    """Normaliza o ``usage_metadata`` do Gemini no mesmo formato da OpenAI."""
+    if usage_metadata is None:
+        return None
+    return {
+        "prompt_tokens": usage_metadata.prompt_token_count or 0,
+        "completion_tokens": usage_metadata.candidates_token_count or 0,
+        "cached_tokens": usage_metadata.cached_content_token_count or 0,
+    }
+
+
+def record_usage(provider: str, model: str, usage: Optional[dict]) -> Optional[dict]:
+    """
+    Contabiliza o uso de tokens por provedor/modelo, permitindo acompanhar a
+    taxa de acerto do cache de prompt (cached_tokens / prompt_tokens).
+    """
+    if usage:
+        _prompt_tokens.inc(usage["prompt_tokens"], provider=provider, model=model)
+        _cached_prompt_tokens.inc(usage["cached_tokens"], provider=provider, model=model)
+        _completion_tokens.inc(usage["completion_tokens"], provider=provider, model=model)
+    return usage
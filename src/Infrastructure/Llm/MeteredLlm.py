@@ -0,0 +1,155 @@
+import asyncio
+from time import perf_counter
+from typing import AsyncIterator, Optional, Sequence
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmMessage, LlmResponse
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+from src.SharedKernel.Tracing.Tracer import Span, Tracer, get_tracer
+
+
+class MeteredLlm(LlmInterface):
+    """
+    Decorador que mede cada chamada do agente ao LLM: latência (e tempo até
+    o primeiro token no streaming) e tokens, rotulados por agente, provedor
+    e modelo. São as métricas usadas para ajustar os perfis dos agentes
+    (AgentProfiles).
+
+    Cada chamada também vira um span ``llm.process``/``llm.stream`` com os
+    atributos ``gen_ai.*`` do OpenTelemetry (provedor, modelo e tokens) e o
+    tempo até o primeiro token.
+
+    Quando o LLM decorado informa quem atendeu (``last_provider``/
+    ``last_model``, ex.: o secundário de um ``HedgedLlm``), os rótulos e o
+    span usam esse provedor; falhas ficam com o provedor configurado.
+    """
+
+    def __init__(
+        self,
+        llm: LlmInterface,
+        *,
+        agent_type: str,
+        provider: str,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        super().__init__(llm.config, llm.system_prompt)
+        self.llm = llm
+        self._agent_type = agent_type
+        self._labels = {"agent": agent_type, "provider": provider, "model": llm.config.model}
+        self.tracer = tracer or get_tracer()
+        self._span_attributes = {
+            "gen_ai.system": provider,
+            "gen_ai.request.model": llm.config.model,
+            "gen_ai.request.max_tokens": llm.config.max_completion_tokens,
+            "llm.agent": agent_type,
+        }
+
+        metrics = metrics or get_metrics_registry()
+        self._latency = metrics.histogram(
+            "agent_llm_latency_seconds",
+            "Latência das chamadas ao LLM por agente",
+        )
+        self._first_token = metrics.histogram(
+            "agent_llm_first_token_seconds",
+            "Tempo até o primeiro token no streaming, por agente",
+        )
+        self._prompt_tokens = metrics.counter(
+            "agent_llm_prompt_tokens_total",
+            "Tokens de entrada por agente",
+        )
+        self._completion_tokens = metrics.counter(
+            "agent_llm_completion_tokens_total",
+            "Tokens gerados por agente",
+        )
+
+    @classmethod
+    def decorator(cls, metrics: Optional[MetricsRegistry] = None):
+        """Decorador no formato de ``AgentFactory.llm_decorators``."""
+        return lambda llm, agent_type, provider: cls(
+            llm, agent_type=agent_type, provider=provider, metrics=metrics
+        )
+
+    def _served_labels(self, span: Span) -> dict:
+        provider = self.llm.last_provider
+        if provider is None:
+            return self._labels
+        model = self.llm.last_model or self.llm.config.model
+        span.set_attribute("gen_ai.system", provider)
+        span.set_attribute("gen_ai.response.model", model)
+        return {"agent": self._agent_type, "provider": provider, "model": model}
+
+    def _record(
+        self,
+        started: float,
+        outcome: str,
+        usage: Optional[dict],
+        span: Span,
+        labels: Optional[dict] = None,
+    ) -> None:
+        labels = labels or self._labels
+        self._latency.observe(perf_counter() - started, outcome=outcome, **labels)
+        span.set_attribute("llm.outcome", outcome)
+        if usage:
+            self._prompt_tokens.inc(usage.get("prompt_tokens", 0), **labels)
+            self._completion_tokens.inc(usage.get("completion_tokens", 0), **labels)
+            span.set_attribute("gen_ai.usage.input_tokens", usage.get("prompt_tokens"))
+            span.set_attribute("gen_ai.usage.output_tokens", usage.get("completion_tokens"))
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        with self.tracer.span("llm.process", **self._span_attributes) as span:
+            started = perf_counter()
+            try:
+                response = await self.llm.process(message, history)
+            except asyncio.CancelledError:
+                self._record(started, "cancelled", None, span)
+                raise
+            except Exception:
+                self._record(started, "error", None, span)
+                raise
+            self.last_usage = response.payload.get("usage")
+            # Sem streaming o primeiro byte chega junto com a resposta inteira
+            span.set_attribute("llm.time_to_first_token_ms", round((perf_counter() - started) * 1000, 1))
+            self._record(started, "ok", self.last_usage, span, self._served_labels(span))
+            return response
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        span = self.tracer.start_span("llm.stream", attributes=self._span_attributes)
+        started = perf_counter()
+        first_token = True
+        labels = None
+        deltas = self.llm.stream(message, history)
+        try:
+            while True:
+                with self.tracer.activate(span):
+                    try:
+                        delta = await deltas.__anext__()
+                    except StopAsyncIteration:
+                        break
+                if first_token:
+                    elapsed = perf_counter() - started
+                    labels = self._served_labels(span)
+                    self._first_token.observe(elapsed, **labels)
+                    span.set_attribute("llm.time_to_first_token_ms", round(elapsed * 1000, 1))
+                    first_token = False
+                yield delta
+            self.last_usage = self.llm.last_usage
+            self._record(started, "ok", self.last_usage, span, labels or self._served_labels(span))
+        except (asyncio.CancelledError, GeneratorExit):
+            # Consumidor parou antes do fim (ex.: especulação descartada)
+            self._record(started, "cancelled", None, span, labels)
+            raise
+        except Exception as exc:
+            span.record_exception(exc)
+            self._record(started, "error", None, span, labels)
+            raise
+        finally:
+            await deltas.aclose()
+            self.tracer.end_span(span)
@@ -1,54 +1,117 @@
-from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmResponse, LlmConfig
-import os
-import asyncio
-from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI, OpenAIError
+from typing import AsyncIterator, Optional, Sequence
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmResponse, LlmConfig, LlmMessage
+from src.Infrastructure.Llm.LlmClientRegistry import (
+    LlmClientRegistry,
+    get_api_key,
+    get_llm_client_registry,
+)
+from src.Infrastructure.Llm.LlmUsage import openai_usage, record_usage
+from openai import OpenAIError
 
 
 class OpenAILlm(LlmInterface):
-    def __init__(self, config: LlmConfig, system_prompt: str):
+    def __init__(
+        self,
+        config: LlmConfig,
+        system_prompt: str,
+        client_registry: Optional[LlmClientRegistry] = None,
+    ):
         super().__init__(config, system_prompt)
         
-        api_key = os.getenv("OPENAI_API_KEY")
-
-        if not api_key:
-            # Carrega o .env da raiz do projeto somente se necessário
-            src_dir = Path(__file__).resolve().parents[2]
-            project_root = src_dir.parent
-            env_path = project_root / ".env"
-
-            if env_path.exists():
-                load_dotenv(dotenv_path=env_path, override=False)
-                api_key = os.getenv("OPENAI_API_KEY")
-        
+        api_key = get_api_key("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY não encontrada nas variáveis de ambiente!")
 
-        self.client = OpenAI(api_key=api_key)
+        # O cliente (e seu pool HTTP) é compartilhado por todo o processo
+        registry = client_registry or get_llm_client_registry()
+        self.client = registry.get_openai_client(api_key)
+        self.concurrency_limiter = registry.get_concurrency_limiter("openai")
 
-    async def process(self, message: str) -> LlmResponse:
+    def _build_messages(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> list[dict]:
+        # Formato nativo da Chat Completions: system, turnos anteriores e a mensagem atual
+        return [
+            {"role": item.role, "content": item.content}
+            for item in self.build_messages(message, history)
+        ]
+
+    def _request_options(self) -> dict:
+        options = {}
+        if self.config.reasoning_effort:
+            options["reasoning_effort"] = self.config.reasoning_effort
+        if self.config.timeout:
+            options["timeout"] = self.config.timeout
+        return options
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
         if not message:
             raise ValueError("Mensagem vazia não é permitida")
 
         try:
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.config.model,
-                max_completion_tokens=self.config.max_completion_tokens,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": message},
-                ],
-            )
+            async with self.concurrency_limiter:
+                response = await self.client.chat.completions.create(
+                    model=self.config.model,
+                    max_completion_tokens=self.config.max_completion_tokens,
+                    messages=self._build_messages(message, history),
+                    **self._request_options(),
+                )
 
             content = response.choices[0].message.content.strip()
+            usage = record_usage("openai", self.config.model, openai_usage(response.usage))
+            self.last_usage = usage
+
+            return LlmResponse(message=content, payload={"usage": usage} if usage else {})
+
+        except OpenAIError as exc:
+            self.logger.error("Erro no OpenAIAgent: %s", exc, exc_info=True)
+            raise
+        except Exception as exc:
+            self.logger.error("Erro inesperado no OpenAIAgent: %s", exc, exc_info=True)
+            raise RuntimeError("Erro ao processar mensagem com OpenAI") from exc
 
-            return LlmResponse(message=content)
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        if not message:
+            raise ValueError("Mensagem vazia não é permitida")
+
+        try:
+            async with self.concurrency_limiter:
+                stream = await self.client.chat.completions.create(
+                    model=self.config.model,
+                    max_completion_tokens=self.config.max_completion_tokens,
+                    messages=self._build_messages(message, history),
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **self._request_options(),
+                )
+                # Fecha a resposta HTTP mesmo se o consumidor parar antes do fim
+                async with stream:
+                    async for chunk in stream:
+                        if chunk.usage is not None:
+                            # Último chunk: só traz o uso de tokens
+                            self.last_usage = record_usage(
+                                "openai", self.config.model, openai_usage(chunk.usage)
+                            )
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            yield delta
 
         except OpenAIError as exc:
-            self.logger.error(f"Erro no OpenAIAgent: {str(exc)}", exc_info=True)
+            self.logger.error("Erro no streaming do OpenAIAgent: %s", exc, exc_info=True)
             raise
         except Exception as exc:
-            self.logger.error(f"Erro inesperado no OpenAIAgent: {str(exc)}", exc_info=True)
+            self.logger.error("Erro inesperado no streaming do OpenAIAgent: %s", exc, exc_info=True)
             raise RuntimeError("Erro ao processar mensagem com OpenAI") from exc
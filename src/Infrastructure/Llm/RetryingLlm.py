@@ -0,0 +1,223 @@
+import asyncio
+import os
+import random
+from typing import AsyncIterator, Optional, Sequence
+
+import httpx
+from openai import APIConnectionError
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmMessage, LlmResponse
+from src.SharedKernel.Deadline.Deadline import check_deadline, time_remaining
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Timeouts, falhas de conexão, 429 e 5xx valem nova tentativa. Os
+    provedores às vezes embrulham o erro do SDK (ex.: RuntimeError no
+    GeminiLlm), então a cadeia de causas também é verificada.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError, APIConnectionError)):
+            return True
+        # status_code na OpenAI, code no google-genai
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if isinstance(status, int):
+            return status in RETRYABLE_STATUS or status >= 500
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class RetryingLlm(LlmInterface):
+    """
+    Decorador que limita cada chamada ao LLM pelo prazo da requisição e
+    repete as falhas transitórias com backoff exponencial e jitter.
+
+    O timeout de cada tentativa é o menor entre o ``timeout`` do perfil do
+    agente e o tempo que resta até o prazo (``deadline_scope``). Uma nova
+    tentativa só acontece se, depois da espera, ainda sobrar pelo menos
+    ``min_attempt_budget`` segundos. No streaming só se repete o que falhou
+    antes do primeiro token.
+
+    Configuração via ambiente: LLM_MAX_RETRIES (padrão 2),
+    LLM_RETRY_BASE_DELAY_MS (padrão 200), LLM_RETRY_MAX_DELAY_MS (padrão
+    2000) e LLM_RETRY_MIN_BUDGET_MS (padrão 1000).
+    """
+
+    def __init__(
+        self,
+        llm: LlmInterface,
+        *,
+        agent_type: str,
+        provider: str,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        min_attempt_budget: Optional[float] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        super().__init__(llm.config, llm.system_prompt)
+        self.llm = llm
+        self.agent_type = agent_type
+        self._labels = {"agent": agent_type, "provider": provider}
+
+        if max_retries is None:
+            max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.max_retries = max(0, max_retries)
+
+        if base_delay is None:
+            base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY_MS", "200")) / 1000
+        self.base_delay = base_delay
+
+        if max_delay is None:
+            max_delay = float(os.getenv("LLM_RETRY_MAX_DELAY_MS", "2000")) / 1000
+        self.max_delay = max_delay
+
+        if min_attempt_budget is None:
+            min_attempt_budget = float(os.getenv("LLM_RETRY_MIN_BUDGET_MS", "1000")) / 1000
+        self.min_attempt_budget = min_attempt_budget
+
+        metrics = metrics or get_metrics_registry()
+        self._retries = metrics.counter(
+            "agent_llm_retries_total",
+            "Novas tentativas de chamadas ao LLM por agente e motivo (timeout, error)",
+        )
+        self._timeouts = metrics.counter(
+            "agent_llm_timeouts_total",
+            "Tentativas encerradas por timeout, por agente e causa (attempt, deadline)",
+        )
+        self._skipped = metrics.counter(
+            "agent_llm_retries_skipped_total",
+            "Falhas transitórias não repetidas por agente e motivo (budget, attempts)",
+        )
+
+    @classmethod
+    def decorator(cls, metrics: Optional[MetricsRegistry] = None):
+        """Decorador no formato de ``AgentFactory.llm_decorators``."""
+        return lambda llm, agent_type, provider: cls(
+            llm, agent_type=agent_type, provider=provider, metrics=metrics
+        )
+
+    def _attempt_timeout(self, first_token: bool = True) -> Optional[float]:
+        limits = [time_remaining()]
+        if first_token:
+            limits.append(self.config.timeout)
+        limits = [limit for limit in limits if limit is not None]
+        return max(min(limits), 0.0) if limits else None
+
+    def _on_timeout(self, error: BaseException) -> BaseException:
+        remaining = time_remaining()
+        if remaining is not None and remaining <= 0:
+            self._timeouts.inc(cause="deadline", **self._labels)
+            return DeadlineExceededError(
+                f"Prazo da requisição esgotado durante a chamada do agente {self.agent_type}"
+            )
+        self._timeouts.inc(cause="attempt", **self._labels)
+        return error
+
+    def _retry_delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Espera antes da próxima tentativa, ou None se não vale repetir."""
+        if not is_retryable_error(error):
+            return None
+        if attempt >= self.max_retries:
+            self._skipped.inc(reason="attempts", **self._labels)
+            return None
+
+        # Full jitter: espalha as novas tentativas de sessões concorrentes
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        remaining = time_remaining()
+        if remaining is not None and remaining - delay < self.min_attempt_budget:
+            self._skipped.inc(reason="budget", **self._labels)
+            return None
+
+        reason = "timeout" if isinstance(error, asyncio.TimeoutError) else "error"
+        self._retries.inc(reason=reason, **self._labels)
+        self.logger.warning(
+            "Chamada do agente %s falhou (%r); nova tentativa %d/%d em %.2fs",
+            self.agent_type,
+            error,
+            attempt + 1,
+            self.max_retries,
+            delay,
+        )
+        return delay
+
+    def _copy_served_by(self) -> None:
+        self.last_provider = self.llm.last_provider
+        self.last_model = self.llm.last_model
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        attempt = 0
+        while True:
+            check_deadline(f"chamar o LLM do agente {self.agent_type}")
+            try:
+                response = await asyncio.wait_for(
+                    self.llm.process(message, history), self._attempt_timeout()
+                )
+            except asyncio.TimeoutError as exc:
+                error = self._on_timeout(exc)
+            except Exception as exc:
+                error = exc
+            else:
+                self._copy_served_by()
+                self.last_usage = self.llm.last_usage
+                return response
+
+            delay = self._retry_delay(attempt, error)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _bounded(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        # O primeiro token respeita o timeout do perfil; os demais, só o prazo
+        first_token = True
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), self._attempt_timeout(first_token))
+            except StopAsyncIteration:
+                return
+            first_token = False
+            yield chunk
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        attempt = 0
+        while True:
+            check_deadline(f"chamar o LLM do agente {self.agent_type}")
+            chunks = self.llm.stream(message, history)
+            received = False
+            try:
+                async for chunk in self._bounded(chunks):
+                    if not received:
+                        self._copy_served_by()
+                        received = True
+                    yield chunk
+                self._copy_served_by()
+                self.last_usage = self.llm.last_usage
+                return
+            except asyncio.TimeoutError as exc:
+                error = self._on_timeout(exc)
+            except Exception as exc:
+                error = exc
+            finally:
+                await chunks.aclose()
+
+            # Depois do primeiro token não dá para repetir sem duplicar a resposta
+            delay = None if received else self._retry_delay(attempt, error)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
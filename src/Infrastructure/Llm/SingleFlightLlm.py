@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmInterface, LlmMessage, LlmResponse
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+_END_OF_STREAM = object()
+
+
+class _Flight:
+    """Uma requisição ao provedor em andamento e quem está esperando por ela."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        # Só no streaming: chunks já gerados e a fila de cada assinante
+        self.chunks: List[str] = []
+        self.subscribers: List[asyncio.Queue] = []
+        self.finished = False
+        self.error: Optional[Exception] = None
+        self.usage: Optional[dict] = None
+
+
+class SingleFlightGroup:
+    """
+    Agrupa chamadas idênticas simultâneas (mesmo provedor, config, system
+    prompt e mensagens) em uma única requisição ao provedor e repassa o
+    resultado, ou o erro, a todos que esperam.
+
+    A requisição só é cancelada quando todos os interessados desistem; o
+    cancelamento de um deles não afeta os outros. Terminada (ou abandonada)
+    a requisição, a chave é liberada e a próxima chamada gera outra.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None):
+        self._calls: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _Flight] = {}
+
+        metrics = metrics or get_metrics_registry()
+        self._requests = metrics.counter(
+            "llm_single_flight_total",
+            "Chamadas ao LLM por provedor e papel (leader faz a requisição, coalesced a aproveita)",
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    @staticmethod
+    def build_key(
+        provider: str,
+        llm: LlmInterface,
+        message: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> str:
+        payload = {
+            "provider": provider,
+            "config": llm.config.model_dump(),
+            "messages": [item.model_dump() for item in llm.build_messages(message, history)],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    async def process(
+        self,
+        key: str,
+        provider: str,
+        llm: LlmInterface,
+        message: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> Tuple[LlmResponse, bool]:
+        """Retorna a resposta e se esta chamada foi a que fez a requisição."""
+        flight = self._calls.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            flight.task = asyncio.create_task(llm.process(message, history))
+            flight.task.add_done_callback(lambda _: self._release(self._calls, key, flight))
+            self._calls[key] = flight
+        self._requests.inc(provider=provider, role="leader" if leader else "coalesced")
+
+        flight.waiters += 1
+        try:
+            # shield: quem desiste não cancela a requisição dos outros
+            return await asyncio.shield(flight.task), leader
+        except asyncio.CancelledError:
+            self._abandon(self._calls, key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def stream(
+        self,
+        key: str,
+        provider: str,
+        llm: LlmInterface,
+        message: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> Tuple[_Flight, bool, AsyncIterator[str]]:
+        """
+        Entra no streaming compartilhado. Retorna o voo (para ler ``usage``
+        ao final), se esta chamada o iniciou e o iterador de chunks.
+        """
+        flight = self._streams.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            flight.task = asyncio.create_task(self._pump(flight, llm, message, history))
+            flight.task.add_done_callback(lambda _: self._release(self._streams, key, flight))
+            self._streams[key] = flight
+        self._requests.inc(provider=provider, role="leader" if leader else "coalesced")
+
+        # Quem chega depois recebe primeiro os chunks já gerados
+        queue: asyncio.Queue = asyncio.Queue()
+        for chunk in flight.chunks:
+            queue.put_nowait(chunk)
+        if flight.finished:
+            queue.put_nowait(_END_OF_STREAM)
+        else:
+            flight.subscribers.append(queue)
+        flight.waiters += 1
+
+        return flight, leader, self._read(key, flight, queue)
+
+    async def _read(self, key: str, flight: _Flight, queue: asyncio.Queue) -> AsyncIterator[str]:
+        completed = False
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is _END_OF_STREAM:
+                    break
+                yield chunk
+            completed = True
+        finally:
+            if queue in flight.subscribers:
+                flight.subscribers.remove(queue)
+            if not completed:
+                self._abandon(self._streams, key, flight)
+            flight.waiters -= 1
+
+        if flight.error is not None:
+            raise flight.error
+
+    async def _pump(
+        self,
+        flight: _Flight,
+        llm: LlmInterface,
+        message: str,
+        history: Optional[Sequence[LlmMessage]],
+    ) -> None:
+        try:
+            async for chunk in llm.stream(message, history):
+                flight.chunks.append(chunk)
+                for queue in flight.subscribers:
+                    queue.put_nowait(chunk)
+            flight.usage = llm.last_usage
+        except Exception as exc:
+            flight.error = exc
+        finally:
+            flight.finished = True
+            for queue in flight.subscribers:
+                queue.put_nowait(_END_OF_STREAM)
+
+    def _abandon(self, calls: Dict[str, _Flight], key: str, flight: _Flight) -> None:
+        # O último interessado desistiu: libera a chave na hora (para ninguém
+        # entrar numa requisição sendo cancelada) e cancela a requisição
+        if flight.waiters > 1 or flight.task.done():
+            return
+        self._release(calls, key, flight)
+        flight.task.cancel()
+
+    @staticmethod
+    def _release(calls: Dict[str, _Flight], key: str, flight: _Flight) -> None:
+        if calls.get(key) is flight:
+            del calls[key]
+
+
+class SingleFlightLlm(LlmInterface):
+    """
+    Envolve um provedor com o ``SingleFlightGroup``. Só quem fez a
+    requisição recebe o ``usage``; os demais recebem
+    ``payload["coalesced"] = True`` sem tokens, para as métricas não
+    contarem o mesmo gasto várias vezes.
+    """
+
+    def __init__(self, llm: LlmInterface, *, group: SingleFlightGroup, provider: str):
+        super().__init__(llm.config, llm.system_prompt)
+        self.llm = llm
+        self.group = group
+        self.provider = provider
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        key = self.group.build_key(self.provider, self.llm, message, history)
+        response, leader = await self.group.process(key, self.provider, self.llm, message, history)
+        if leader:
+            self.last_usage = response.payload.get("usage")
+            return response
+        self.last_usage = None
+        return LlmResponse(message=response.message, payload={"coalesced": True})
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        key = self.group.build_key(self.provider, self.llm, message, history)
+        flight, leader, chunks = await self.group.stream(key, self.provider, self.llm, message, history)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            # Consumidor que parou antes do fim sai da lista de inscritos já
+            await chunks.aclose()
+        self.last_usage = flight.usage if leader else None
@@ -0,0 +1,45 @@
+from typing import List, Optional
+from uuid import UUID
+
+from src.Domain.Entities.Patient import Patient
+from src.Domain.Interfaces.Repositories.AsyncPatientRepository import AsyncPatientRepository
+from src.Infrastructure.Database.AsyncConnection import get_async_connection
+from src.SharedKernel.Tracing.Tracer import traced
+
+
+class AsyncPatientRepositoryPostgres(AsyncPatientRepository):
+    """Versão async de PatientRepositoryPostgres, sobre o AsyncConnectionPool."""
+
+    @traced("postgres.patients.get_patient", **{"db.system": "postgresql", "db.sql.table": "patients"})
+    async def get_patient(self, id: str) -> Patient:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    'SELECT "patient_id", disease FROM patients WHERE "patient_id" = %s',
+                    (id,),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    raise ValueError(f"Patient with id {id} not found")
+                return Patient(patient_id=row[0], disease=row[1])
+
+    @traced("postgres.patients.get_by_id", **{"db.system": "postgresql", "db.sql.table": "patients"})
+    async def get_by_id(self, patient_id: UUID) -> Optional[Patient]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    'SELECT "patient_id", disease FROM patients WHERE "patient_id" = %s',
+                    (str(patient_id),),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    return None
+                return Patient(patient_id=row[0], disease=row[1])
+
+    @traced("postgres.patients.list_all", **{"db.system": "postgresql", "db.sql.table": "patients"})
+    async def list_all(self) -> List[Patient]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute('SELECT "patient_id", disease FROM patients ORDER BY "patient_id"')
+                rows = await cur.fetchall()
+                return [Patient(patient_id=r[0], disease=r[1]) for r in rows]
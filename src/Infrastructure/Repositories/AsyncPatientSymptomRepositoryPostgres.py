@@ -0,0 +1,58 @@
+from typing import Dict, List
+from uuid import UUID
+
+from src.Domain.Entities.PatientSymptom import PatientSymptom
+from src.Domain.Entities.Symptom import Symptom
+from src.Domain.Interfaces.Repositories.AsyncPatientSymptomRepository import AsyncPatientSymptomRepository
+from src.Infrastructure.Database.AsyncConnection import get_async_connection
+from src.SharedKernel.Tracing.Tracer import traced
+
+
+class AsyncPatientSymptomRepositoryPostgres(AsyncPatientSymptomRepository):
+    """Versão async de PatientSymptomRepositoryPostgres, sobre o AsyncConnectionPool."""
+
+    @traced("postgres.patient_symptoms.get_patient_symptoms", **{"db.system": "postgresql", "db.sql.table": "patient_symptoms"})
+    async def get_patient_symptoms(self, id: str) -> list[PatientSymptom]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    'SELECT "patient_id", "symptom_id" FROM patient_symptoms WHERE "patient_id" = %s',
+                    (id,),
+                )
+                rows = await cur.fetchall()
+                return [PatientSymptom(patient_id=r[0], symptom_id=r[1]) for r in rows]
+
+    @traced("postgres.patient_symptoms.list_symptoms_for_patient", **{"db.system": "postgresql", "db.sql.table": "patient_symptoms"})
+    async def list_symptoms_for_patient(self, patient_id: UUID) -> List[Symptom]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    '''SELECT s."symptom_id", s."symptom_name"
+                       FROM symptoms s
+                       INNER JOIN patient_symptoms ps ON s."symptom_id" = ps."symptom_id"
+                       WHERE ps."patient_id" = %s''',
+                    (str(patient_id),),
+                )
+                rows = await cur.fetchall()
+                return [Symptom(symptom_id=r[0], symptom_name=r[1]) for r in rows]
+
+    @traced("postgres.patient_symptoms.list_symptom_names_by_patient", **{"db.system": "postgresql", "db.sql.table": "patient_symptoms"})
+    async def list_symptom_names_by_patient(self) -> Dict[UUID, List[str]]:
+        """
+        Retorna, em uma única consulta, os nomes dos sintomas de todos os
+        pacientes agrupados por patient_id.
+        """
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    '''SELECT ps."patient_id", s."symptom_name"
+                       FROM patient_symptoms ps
+                       INNER JOIN symptoms s ON s."symptom_id" = ps."symptom_id"
+                       ORDER BY ps."patient_id", s."symptom_name"'''
+                )
+                rows = await cur.fetchall()
+
+        symptoms_by_patient: Dict[UUID, List[str]] = {}
+        for patient_id, symptom_name in rows:
+            symptoms_by_patient.setdefault(patient_id, []).append(symptom_name)
+        return symptoms_by_patient
@@ -0,0 +1,58 @@
+from typing import List, Optional
+from uuid import UUID
+
+from src.Domain.Entities.Symptom import Symptom
+from src.Domain.Interfaces.Repositories.AsyncSymptomRepository import AsyncSymptomRepository
+from src.Infrastructure.Database.AsyncConnection import get_async_connection
+from src.SharedKernel.Tracing.Tracer import traced
+
+
+class AsyncSymptomRepositoryPostgres(AsyncSymptomRepository):
+    """Versão async de SymptomRepositoryPostgres, sobre o AsyncConnectionPool."""
+
+    @traced("postgres.symptoms.get_symptom", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
+    async def get_symptom(self, id: str) -> Symptom:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    'SELECT "symptom_id", "symptom_name" FROM symptoms WHERE "symptom_id" = %s',
+                    (id,),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    raise ValueError(f"Symptom with id {id} not found")
+                return Symptom(symptom_id=row[0], symptom_name=row[1])
+
+    @traced("postgres.symptoms.get_by_id", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
+    async def get_by_id(self, symptom_id: UUID) -> Optional[Symptom]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    'SELECT "symptom_id", "symptom_name" FROM symptoms WHERE "symptom_id" = %s',
+                    (str(symptom_id),),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    return None
+                return Symptom(symptom_id=row[0], symptom_name=row[1])
+
+    @traced("postgres.symptoms.get_by_name", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
+    async def get_by_name(self, name: str) -> Optional[Symptom]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    'SELECT "symptom_id", "symptom_name" FROM symptoms WHERE "symptom_name" ILIKE %s',
+                    (name,),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    return None
+                return Symptom(symptom_id=row[0], symptom_name=row[1])
+
+    @traced("postgres.symptoms.list_all", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
+    async def list_all(self) -> List[Symptom]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute('SELECT "symptom_id", "symptom_name" FROM symptoms ORDER BY "symptom_name"')
+                rows = await cur.fetchall()
+                return [Symptom(symptom_id=r[0], symptom_name=r[1]) for r in rows]
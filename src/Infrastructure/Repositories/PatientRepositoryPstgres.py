@@ -4,12 +4,14 @@ from uuid import UUID
 from src.Domain.Entities.Patient import Patient
 from src.Infrastructure.Database.Connection import get_connection
 from src.Domain.Interfaces.Repositories.PatientRepository import PatientRepository
+from src.SharedKernel.Tracing.Tracer import traced
 
 
 class PatientRepositoryPostgres(PatientRepository):
     def __init__(self):
         self.connection = get_connection()
     
+    @traced("postgres.patients.get_patient", **{"db.system": "postgresql", "db.sql.table": "patients"})
     def get_patient(self, id: str) -> Patient:
         with get_connection() as conn:
             with conn.cursor() as cur:
@@ -22,6 +24,7 @@ class PatientRepositoryPostgres(PatientRepository):
                     raise ValueError(f"Patient with id {id} not found")
                 return Patient(patient_id=row[0], disease=row[1])
     
+    @traced("postgres.patients.get_by_id", **{"db.system": "postgresql", "db.sql.table": "patients"})
     def get_by_id(self, patient_id: UUID) -> Optional[Patient]:
         with get_connection() as conn:
             with conn.cursor() as cur:
@@ -34,6 +37,7 @@ class PatientRepositoryPostgres(PatientRepository):
                     return None
                 return Patient(patient_id=row[0], disease=row[1])
 
+    @traced("postgres.patients.list_all", **{"db.system": "postgresql", "db.sql.table": "patients"})
     def list_all(self) -> List[Patient]:
         with get_connection() as conn:
             with conn.cursor() as cur:
@@ -6,12 +6,14 @@ from src.Domain.Entities.Symptom import Symptom
 from src.Domain.Entities.PatientSymptom import PatientSymptom
 from src.Infrastructure.Database.Connection import get_connection
 from src.Domain.Interfaces.Repositories.PatientSymptomRepository import PatientSymptomRepository
+from src.SharedKernel.Tracing.Tracer import traced
 
 
 class PatientSymptomRepositoryPostgres(PatientSymptomRepository):
     def __init__(self):
         pass
 
+    @traced("postgres.patient_symptoms.get_patient_symptoms", **{"db.system": "postgresql", "db.sql.table": "patient_symptoms"})
     def get_patient_symptoms(self, id: str) -> list[PatientSymptom]:
         with get_connection() as conn:
             with conn.cursor() as cur:
@@ -22,6 +24,7 @@ class PatientSymptomRepositoryPostgres(PatientSymptomRepository):
                 rows = cur.fetchall()
                 return [PatientSymptom(patient_id=r[0], symptom_id=r[1]) for r in rows]
 
+    @traced("postgres.patient_symptoms.list_symptoms_for_patient", **{"db.system": "postgresql", "db.sql.table": "patient_symptoms"})
     def list_symptoms_for_patient(self, patient_id: UUID) -> List[Symptom]:
         with get_connection() as conn:
             with conn.cursor() as cur:
@@ -35,6 +38,7 @@ class PatientSymptomRepositoryPostgres(PatientSymptomRepository):
                 rows = cur.fetchall()
                 return [Symptom(symptom_id=r[0], symptom_name=r[1]) for r in rows]
 
+    @traced("postgres.patient_symptoms.list_patients_for_symptom", **{"db.system": "postgresql", "db.sql.table": "patient_symptoms"})
     def list_patients_for_symptom(self, symptom_id: UUID) -> List[Patient]:
         with get_connection() as conn:
             with conn.cursor() as cur:
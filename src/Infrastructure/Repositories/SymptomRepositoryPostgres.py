@@ -4,12 +4,14 @@ from uuid import UUID
 from src.Domain.Entities.Symptom import Symptom
 from src.Infrastructure.Database.Connection import get_connection
 from src.Domain.Interfaces.Repositories.SymptomRepository import SymptomRepository
+from src.SharedKernel.Tracing.Tracer import traced
 
 
 class SymptomRepositoryPostgres(SymptomRepository):
     def __init__(self):
         self.connection = get_connection()
 
+    @traced("postgres.symptoms.get_symptom", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
     def get_symptom(self, id: str) -> Symptom:
         with self.connection as conn:
             with conn.cursor() as cur:
@@ -22,6 +24,7 @@ class SymptomRepositoryPostgres(SymptomRepository):
                     raise ValueError(f"Symptom with id {id} not found")
                 return Symptom(symptom_id=row[0], symptom_name=row[1])
 
+    @traced("postgres.symptoms.get_by_id", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
     def get_by_id(self, symptom_id: UUID) -> Optional[Symptom]:
         with self.connection as conn:
             with conn.cursor() as cur:
@@ -34,6 +37,7 @@ class SymptomRepositoryPostgres(SymptomRepository):
                     return None
                 return Symptom(symptom_id=row[0], symptom_name=row[1])
 
+    @traced("postgres.symptoms.get_by_name", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
     def get_by_name(self, name: str) -> Optional[Symptom]:
         with self.connection as conn:
             with conn.cursor() as cur:
@@ -46,6 +50,7 @@ class SymptomRepositoryPostgres(SymptomRepository):
                     return None
                 return Symptom(symptom_id=row[0], symptom_name=row[1])
 
+    @traced("postgres.symptoms.list_all", **{"db.system": "postgresql", "db.sql.table": "symptoms"})
     def list_all(self) -> List[Symptom]:
         with self.connection as conn:
             with conn.cursor() as cur:
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from src.SharedKernel.Logging.Logger import get_logger
+
+
+class RouterDecisionLog:
+    """
+    Registro em JSONL das decisões de roteamento (uma linha por turno), usado
+    para treinar o modelo local do roteador e para a avaliação offline dos
+    tiers. Desativado quando ROUTER_DECISION_LOG_PATH não está definido.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = get_logger(__name__)
+        self.path = path or os.getenv("ROUTER_DECISION_LOG_PATH")
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    async def record(
+        self,
+        *,
+        message: str,
+        conversation_history: str,
+        label: str,
+        tier: str,
+        confidence: Optional[float] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "message": message,
+            "conversation_history": conversation_history,
+            "label": label,
+            "tier": tier,
+            "confidence": confidence,
+        }
+        try:
+            await asyncio.to_thread(self._append, json.dumps(entry, ensure_ascii=False))
+        except OSError as exc:
+            self.logger.error("Erro ao registrar decisão do roteador: %s", exc)
+
+    def _append(self, line: str) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+    @staticmethod
+    def read(path: str) -> Iterator[dict]:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
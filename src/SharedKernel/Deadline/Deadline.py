@@ -0,0 +1,64 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from src.SharedKernel.Messages.Exceptions import DeadlineExceededError
+
+# Instante (time.monotonic) em que a requisição atual precisa terminar. Vive
+# num ContextVar para chegar ao handler, aos agentes e às chamadas ao LLM sem
+# ser passado por parâmetro; tasks criadas durante a requisição herdam o prazo.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def _tightened(timeout: Optional[float]) -> Optional[float]:
+    deadline = _deadline.get()
+    if timeout is None:
+        return deadline
+    candidate = time.monotonic() + timeout
+    return candidate if deadline is None else min(deadline, candidate)
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[None]:
+    """
+    Define o prazo da requisição para ``timeout`` segundos a partir de agora.
+    Um prazo já definido e mais curto prevalece; ``None`` mantém o atual.
+    """
+    token = _deadline.set(_tightened(timeout))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def start_deadline(timeout: Optional[float]) -> None:
+    """
+    Como ``deadline_scope``, mas sem restaurar o prazo anterior: para
+    geradores async (ex.: o SSE do streaming), que podem ser finalizados em
+    outro contexto. O prazo vale até o fim da task atual.
+    """
+    _deadline.set(_tightened(timeout))
+
+
+@contextmanager
+def detached_deadline() -> Iterator[None]:
+    """Remove o prazo, para tasks em segundo plano que sobrevivem à requisição."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Segundos até o prazo da requisição (pode ser negativo) ou None sem prazo."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(stage: str) -> None:
+    """Falha antes de começar ``stage`` se o prazo da requisição já acabou."""
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError(f"Prazo da requisição esgotado antes de {stage}")
@@ -1,10 +1,26 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+BASE_FORMAT = "[%(asctime)s] %(message)s"
+
+# Logger dos corpos de mensagem (alto volume), amostrado por LOG_MESSAGE_SAMPLE_RATE
+MESSAGE_LOGGER_NAME = "chat.messages"
+
+
 class CustomFormatter(logging.Formatter):
     """Formatador personalizado para logs com cores."""
-    
+
     FORMATS = {
         logging.INFO: "\033[0;32m{}\033[0m",      # Green
         logging.WARNING: "\033[0;33m{}\033[0m",   # Yellow
@@ -12,30 +28,170 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: "\033[0;41m{}\033[0m"   # Red background
     }
 
+    def __init__(self):
+        super().__init__()
+        # Um formatador por nível, criado uma vez (e não a cada registro)
+        self._formatters = {
+            level: logging.Formatter(log_fmt.format(BASE_FORMAT), DATE_FORMAT)
+            for level, log_fmt in self.FORMATS.items()
+        }
+        self._default = logging.Formatter("\033[0m{}\033[0m".format(BASE_FORMAT), DATE_FORMAT)  # Default sem cor
+
+    def format(self, record):
+        return self._formatters.get(record.levelno, self._default).format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Uma linha JSON por registro, sem cores: horário em UTC, nível, logger,
+    mensagem, ids do trace atual (quando há um span aberto) e a exceção.
+    """
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno, "\033[0m{}\033[0m")  # Default sem cor
-        formatter = logging.Formatter(
-            log_fmt.format("[%(asctime)s] %(message)s"),
-            "%Y-%m-%d %H:%M:%S"
-        )
-        return formatter.format(record)
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+            entry["span_id"] = record.span_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TraceContextFilter(logging.Filter):
+    """
+    Anota o registro com o trace/span atual. Roda na thread que gerou o
+    log, antes da fila, onde o ContextVar do span ainda é visível.
+    """
+
+    def filter(self, record):
+        # Consulta sem importar: o Tracer também usa este módulo
+        tracing = sys.modules.get("src.SharedKernel.Tracing.Tracer")
+        span = tracing.Tracer.current_span() if tracing is not None else None
+        if span is not None and span.recording:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Deixa passar só uma fração dos registros abaixo de WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que só resolve a mensagem (argumentos %) na thread que
+    loga; formatação e escrita ficam com o QueueListener. Com a fila cheia
+    o registro é descartado, em vez de bloquear o event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    if log_format == "dev":
+        return CustomFormatter()
+    raise ValueError(f"LOG_FORMAT inválido: {log_format} (use dev ou json)")
+
+
+@lru_cache(maxsize=1)
+def _get_handler() -> logging.Handler:
+    """
+    Handler compartilhado por todos os loggers da aplicação.
+
+    LOG_FORMAT escolhe o modo: "dev" (padrão, colorido) ou "json" (uma
+    linha JSON por registro, para produção). Com LOG_ASYNC (padrão "true"
+    no modo json) a escrita no stdout sai do event loop: os registros vão
+    para uma fila de até LOG_QUEUE_SIZE (padrão 10000) esvaziada por um
+    QueueListener em outra thread.
+    """
+    log_format = os.getenv("LOG_FORMAT", "dev").lower()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter(log_format))
+
+    default_async = "true" if log_format == "json" else "false"
+    if os.getenv("LOG_ASYNC", default_async).lower() not in ("1", "true", "yes"):
+        handler = stream_handler
+    else:
+        log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        handler = _NonBlockingQueueHandler(log_queue)
+        _start_listener(log_queue, stream_handler)
+
+    if log_format == "json":
+        handler.addFilter(TraceContextFilter())
+    return handler
+
+
+def _start_listener(log_queue: queue.Queue, stream_handler: logging.Handler) -> None:
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Escreve o que ainda está na fila quando o processo termina
+    atexit.register(listener.stop)
+
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
-    Retorna um logger configurado com o formatador personalizado.
-    
+    Retorna um logger configurado com o handler da aplicação (ver
+    ``_get_handler``). Prefira argumentos no estilo % (``logger.info("x %s",
+    valor)``): só são formatados se o registro for de fato emitido.
+
     Args:
         name: Nome do logger. Se None, usa o nome do módulo chamador.
-        
+
     Returns:
         logging.Logger: Logger configurado
     """
     logger = logging.getLogger(name or __name__)
-    
+
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(CustomFormatter())
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-    
-    return logger 
\ No newline at end of file
+        logger.addHandler(_get_handler())
+        logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    return logger
+
+
+def get_message_logger() -> logging.Logger:
+    """
+    Logger dos corpos de mensagem do chat (médico e paciente), o log de
+    maior volume. Com LOG_MESSAGE_SAMPLE_RATE < 1 (padrão 1) só essa
+    fração dos registros abaixo de WARNING é emitida.
+    """
+    logger = get_logger(MESSAGE_LOGGER_NAME)
+    rate = float(os.getenv("LOG_MESSAGE_SAMPLE_RATE", "1"))
+    if rate < 1 and not any(isinstance(item, SamplingFilter) for item in logger.filters):
+        logger.addFilter(SamplingFilter(rate))
+    return logger
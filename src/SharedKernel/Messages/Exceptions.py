@@ -20,4 +20,12 @@ class MessageProcessingError(POOChatException):
 
 class OpenAIError(POOChatException):
     """Exceção lançada quando há erro na comunicação com a OpenAI."""
-    pass 
\ No newline at end of file
+    pass 
+
+class ProviderUnavailableError(POOChatException):
+    """Exceção lançada quando nenhum provedor LLM pode ser chamado (circuitos abertos)."""
+    pass
+
+class DeadlineExceededError(POOChatException):
+    """Exceção lançada quando o prazo da requisição acaba antes do turno terminar."""
+    pass
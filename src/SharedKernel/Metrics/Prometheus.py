@@ -0,0 +1,65 @@
+import math
+import re
+from typing import Dict, List, Optional
+
+from src.SharedKernel.Metrics.Metrics import Counter, Histogram, MetricsRegistry, get_metrics_registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _metric_name(name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", name)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{_metric_name(key)}="{_escape(str(value))}"' for key, value in sorted(labels.items()))
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(registry: Optional[MetricsRegistry] = None) -> str:
+    """
+    Converte o registro de métricas do processo para o formato texto do
+    Prometheus (contadores e histogramas com ``_bucket``, ``_sum`` e
+    ``_count``), servido no endpoint /metrics.
+    """
+    registry = registry or get_metrics_registry()
+    lines: List[str] = []
+
+    for metric in sorted(registry.metrics(), key=lambda item: item.name):
+        name = _metric_name(metric.name)
+        if metric.description:
+            lines.append(f"# HELP {name} {_escape(metric.description)}")
+
+        if isinstance(metric, Counter):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        elif isinstance(metric, Histogram):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, series in metric.samples():
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, math.inf), series["counts"]):
+                    cumulative += count
+                    bucket_labels = {**labels, "le": _format_value(bound)}
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {series['count']}")
+
+    return "\n".join(lines) + "\n"
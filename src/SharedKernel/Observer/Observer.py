@@ -1,39 +1,261 @@
+import asyncio
+import contextvars
+import os
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import deque
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Set
 from datetime import datetime
 
+from src.SharedKernel.Logging.Logger import get_logger
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry, get_metrics_registry
+
+DROP_POLICIES = ("drop_oldest", "drop_newest")
+
+
 class Observer(ABC):
     """Interface base para observadores."""
-    
+
     @abstractmethod
     def update(self, message: Dict[str, Any]) -> None:
         """
         Método chamado quando uma nova mensagem é processada.
-        
+
         Args:
             message: Dicionário contendo informações da mensagem
         """
         pass
 
-class MessageSubject:
-    """Classe que mantém e notifica os observadores sobre novas mensagens."""
-    
+    async def update_batch(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Entrega um lote de mensagens (chamado pelo barramento assíncrono).
+        Por padrão roda ``update`` numa thread, para que um observador
+        síncrono e lento não bloqueie o event loop.
+
+        Args:
+            messages: Mensagens na ordem em que foram notificadas
+        """
+        await asyncio.to_thread(self._update_all, messages)
+
+    def _update_all(self, messages: List[Dict[str, Any]]) -> None:
+        for message in messages:
+            self.update(message)
+
+
+class AsyncObserver(Observer):
+    """Observador com I/O assíncrono (ex.: gravar transcrições, analytics)."""
+
     def __init__(self):
+        self._pending: Set[asyncio.Task] = set()
+
+    @abstractmethod
+    async def update_async(self, message: Dict[str, Any]) -> None:
+        """
+        Versão assíncrona de ``update``.
+
+        Args:
+            message: Dicionário contendo informações da mensagem
+        """
+        pass
+
+    async def update_batch(self, messages: List[Dict[str, Any]]) -> None:
+        for message in messages:
+            await self.update_async(message)
+
+    def update(self, message: Dict[str, Any]) -> None:
+        # Só usado sem o barramento assíncrono (ex.: scripts síncronos)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.update_async(message))
+            return
+        task = loop.create_task(self.update_async(message))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+class _ObserverChannel:
+    """
+    Fila limitada e worker de um observador. Cada observador tem a sua,
+    então um observador lento ou com erro não atrasa os demais.
+    """
+
+    def __init__(
+        self,
+        observer: Observer,
+        *,
+        max_size: int,
+        batch_size: int,
+        drop_policy: str,
+        metrics: MetricsRegistry,
+        logger,
+    ):
+        self.observer = observer
+        self.name = type(observer).__name__
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.drop_policy = drop_policy
+        self.logger = logger
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self._messages = metrics.counter(
+            "observer_messages_total",
+            "Mensagens por observador e desfecho (delivered, dropped, error)",
+        )
+        self._batch_duration = metrics.histogram(
+            "observer_batch_duration_seconds",
+            "Duração da entrega de cada lote, por observador",
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """Enfileira sem esperar; com a fila cheia aplica a política de descarte."""
+        self._ensure_started()
+        if len(self._buffer) >= self.max_size:
+            self._messages.inc(observer=self.name, outcome="dropped")
+            if self.drop_policy == "drop_newest":
+                return
+            self._buffer.popleft()
+        self._buffer.append(message)
+        self._wakeup.set()
+
+    def _ensure_started(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        # Contexto vazio: o worker não herda o prazo nem o span da requisição
+        # que por acaso o iniciou
+        loop = asyncio.get_running_loop()
+        self._task = contextvars.Context().run(loop.create_task, self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if not self._buffer:
+                if self._closing:
+                    return
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: List[Dict[str, Any]]) -> None:
+        started = perf_counter()
+        try:
+            await self.observer.update_batch(batch)
+        except Exception as exc:
+            self._messages.inc(len(batch), observer=self.name, outcome="error")
+            self.logger.error("Observador %s falhou ao processar %d mensagem(ns): %s", self.name, len(batch), exc)
+        else:
+            self._messages.inc(len(batch), observer=self.name, outcome="delivered")
+        finally:
+            self._batch_duration.observe(perf_counter() - started, observer=self.name)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._buffer.clear()
+
+    async def close(self, timeout: float) -> None:
+        """Entrega o que está na fila e encerra o worker (até ``timeout`` segundos)."""
+        if self._task is None or self._task.done():
+            return
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            lost = len(self._buffer)
+            self._buffer.clear()
+            self._messages.inc(lost, observer=self.name, outcome="dropped")
+            self.logger.warning("Observador %s: %d mensagem(ns) descartada(s) no shutdown", self.name, lost)
+
+
+class MessageSubject:
+    """
+    Classe que mantém e notifica os observadores sobre novas mensagens.
+
+    Dentro de um event loop, ``notify`` só enfileira a mensagem (O(1)) e
+    cada observador a recebe em lotes, no seu próprio worker, fora do
+    caminho da requisição. Com a fila de um observador cheia, a política
+    descarta a mensagem mais antiga (``drop_oldest``) ou a nova
+    (``drop_newest``). ``close`` entrega o que restou no shutdown.
+
+    Configuração via ambiente: OBSERVER_ASYNC (padrão "true"),
+    OBSERVER_QUEUE_SIZE (padrão 1000 por observador), OBSERVER_BATCH_SIZE
+    (padrão 50) e OBSERVER_DROP_POLICY (padrão "drop_oldest").
+    """
+
+    def __init__(
+        self,
+        *,
+        asynchronous: Optional[bool] = None,
+        max_queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        drop_policy: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.logger = get_logger(__name__)
         self._observers: List[Observer] = []
-        
+        self._channels: Dict[int, _ObserverChannel] = {}
+
+        if asynchronous is None:
+            asynchronous = os.getenv("OBSERVER_ASYNC", "true").lower() in ("1", "true", "yes")
+        self.asynchronous = asynchronous
+
+        if max_queue_size is None:
+            max_queue_size = int(os.getenv("OBSERVER_QUEUE_SIZE", "1000"))
+        self.max_queue_size = max(1, max_queue_size)
+
+        if batch_size is None:
+            batch_size = int(os.getenv("OBSERVER_BATCH_SIZE", "50"))
+        self.batch_size = max(1, batch_size)
+
+        drop_policy = drop_policy or os.getenv("OBSERVER_DROP_POLICY") or "drop_oldest"
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Política de descarte inválida: {drop_policy} (use {', '.join(DROP_POLICIES)})")
+        self.drop_policy = drop_policy
+
+        self._metrics = metrics or get_metrics_registry()
+
     def attach(self, observer: Observer) -> None:
         """Adiciona um novo observador."""
         if observer not in self._observers:
             self._observers.append(observer)
-            
+            self._channels[id(observer)] = _ObserverChannel(
+                observer,
+                max_size=self.max_queue_size,
+                batch_size=self.batch_size,
+                drop_policy=self.drop_policy,
+                metrics=self._metrics,
+                logger=self.logger,
+            )
+
     def detach(self, observer: Observer) -> None:
-        """Remove um observador."""
+        """Remove um observador (mensagens ainda na fila dele são descartadas)."""
         self._observers.remove(observer)
-        
+        self._channels.pop(id(observer)).cancel()
+
+    @property
+    def pending(self) -> int:
+        """Mensagens enfileiradas e ainda não entregues (todos os observadores)."""
+        return sum(channel.pending for channel in self._channels.values())
+
     def notify(self, message: str, role: str) -> None:
         """
         Notifica todos os observadores sobre uma nova mensagem.
-        
+
         Args:
             message: Conteúdo da mensagem
             role: Papel do emissor (user/assistant)
@@ -43,16 +265,41 @@ class MessageSubject:
             "role": role,
             "timestamp": datetime.now().isoformat()
         }
-        
+
+        if self.asynchronous and _in_event_loop():
+            for channel in self._channels.values():
+                channel.offer(message_info)
+            return
+
+        # Fora de um event loop (scripts) a entrega continua síncrona
         for observer in self._observers:
-            observer.update(message_info)
+            try:
+                observer.update(message_info)
+            except Exception as exc:
+                self.logger.error("Observador %s falhou: %s", type(observer).__name__, exc)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        Entrega as mensagens pendentes e encerra os workers (no shutdown).
+        O que não for entregue em ``timeout`` segundos é descartado.
+        """
+        await asyncio.gather(*(channel.close(timeout) for channel in self._channels.values()))
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
 
 class LoggingObserver(Observer):
     """Observador que registra mensagens no log."""
-    
+
     def __init__(self, logger):
         self.logger = logger
-        
+
     def update(self, message: Dict[str, Any]) -> None:
         role_emoji = "👤" if message["role"] == "user" else "🤖"
-        self.logger.info(f"{role_emoji} {message['content']}") 
\ No newline at end of file
+        self.logger.info("%s %s", role_emoji, message["content"])
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+from src.SharedKernel.Logging.Logger import get_logger
+
+AttributeValue = Any
+
+
+class Span:
+    """
+    Trecho de um trace, no modelo do OpenTelemetry: ids em hexadecimal
+    (trace de 16 bytes, span de 8), pai, horários em nanossegundos desde a
+    época, atributos e status ("unset", "ok" ou "error").
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str],
+        attributes: Optional[Dict[str, AttributeValue]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes: Dict[str, AttributeValue] = {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "unset"
+        self.status_message: Optional[str] = None
+        self._started = time.perf_counter()
+        self._duration: Optional[float] = None
+        self.set_attributes(attributes or {})
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duração em segundos (relógio monotônico), depois de encerrado."""
+        return self._duration
+
+    @property
+    def elapsed(self) -> float:
+        """Segundos desde a abertura (a duração final, se já encerrado)."""
+        if self._duration is not None:
+            return self._duration
+        return time.perf_counter() - self._started
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        if value is None:
+            return
+        if not isinstance(value, (str, bool, int, float)):
+            value = str(value)
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, AttributeValue]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "error"
+        self.status_message = str(error) or type(error).__name__
+        self.set_attribute("exception.type", type(error).__name__)
+        self.set_attribute("exception.message", str(error))
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self._duration = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self._duration * 1e9)
+        if self.status == "unset":
+            self.status = "ok"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self._duration * 1000, 3) if self._duration is not None else None,
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": dict(self.attributes),
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span no formato OTLP/JSON (o mesmo do exportador OTLP do OpenTelemetry)."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": {"unset": 0, "ok": 1, "error": 2}[self.status]},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan(Span):
+    """Span usado com o tracing desligado: não guarda nada."""
+
+    def __init__(self):
+        super().__init__("noop", "0" * 32, "0" * 16, None)
+
+    @property
+    def recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value: AttributeValue) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class SpanExporter:
+    """Recebe cada span encerrado."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """
+    Guarda os últimos ``max_spans`` spans em memória, agrupáveis por trace.
+    Funciona offline, sem coletor: é o que o endpoint /debug/traces lê.
+    """
+
+    def __init__(self, max_spans: int = 5000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Traces mais recentes primeiro, cada um com os spans em ordem de início."""
+        grouped: "OrderedDict[str, List[Span]]" = OrderedDict()
+        for span in reversed(self.spans()):
+            grouped.setdefault(span.trace_id, []).append(span)
+
+        traces = []
+        for trace_id, spans in list(grouped.items())[:limit]:
+            spans.sort(key=lambda item: item.start_ns)
+            span_ids = {span.span_id for span in spans}
+            roots = [span for span in spans if span.parent_id not in span_ids]
+            root = max(roots or spans, key=lambda item: item.duration or 0.0)
+            traces.append(
+                {
+                    "trace_id": trace_id,
+                    "root": root.name,
+                    "duration_ms": root.to_dict()["duration_ms"],
+                    "spans": [span.to_dict() for span in spans],
+                }
+            )
+        return traces
+
+
+class OtlpJsonFileExporter(SpanExporter):
+    """
+    Grava cada span como uma linha OTLP/JSON (``resourceSpans``), o formato
+    lido pelo receiver ``otlpjsonfile`` do OpenTelemetry Collector.
+
+    ``export`` só enfileira o span: serialização e escrita ficam com uma
+    thread própria (como o QueueListener dos logs), fora do event loop. Com
+    a fila cheia (``queue_size``, padrão TRACING_EXPORT_QUEUE_SIZE ou 10000)
+    o span é descartado e contado em ``dropped``.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, service_name: str, queue_size: Optional[int] = None):
+        self.logger = get_logger(__name__)
+        self.path = path
+        self._resource = {
+            "attributes": [_otlp_attribute("service.name", service_name)],
+        }
+        if queue_size is None:
+            queue_size = int(os.getenv("TRACING_EXPORT_QUEUE_SIZE", "10000"))
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._writer = threading.Thread(target=self._write_loop, name="otlp-json-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _line(self, span: Span) -> str:
+        return json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": self._resource,
+                        "scopeSpans": [{"scope": {"name": "appointment-chat"}, "spans": [span.to_otlp()]}],
+                    }
+                ]
+            },
+            ensure_ascii=False,
+        )
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            # Escreve o que já estiver na fila e dá um único flush por lote
+            batch = [item]
+            while item is not self._STOP:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            for span in batch:
+                if span is self._STOP:
+                    continue
+                try:
+                    self._file.write(self._line(span) + "\n")
+                except Exception as exc:
+                    self.logger.warning("Erro ao exportar span %s: %s", span.name, exc)
+            self._file.flush()
+            if batch[-1] is self._STOP:
+                return
+
+    def shutdown(self) -> None:
+        if not self._writer.is_alive():
+            return
+        # Bloqueia até a fila esvaziar: os spans pendentes não se perdem
+        self._queue.put(self._STOP)
+        self._writer.join()
+        self._file.close()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+_UNSET = object()
+
+
+class Tracer:
+    """
+    Tracing por spans do processo, compatível com o modelo do OpenTelemetry
+    (ids, pais, atributos, status e ``traceparent`` do W3C), sem depender do
+    SDK. O span atual vive num ContextVar, então spans abertos dentro de um
+    turno (agentes, LLM, Redis, PostgreSQL) viram filhos dele.
+
+    Os spans vão para um ``InMemorySpanExporter`` (sempre) e, se
+    TRACING_EXPORT_PATH estiver definido, para um arquivo OTLP/JSON.
+    Configuração via ambiente: TRACING_ENABLED (padrão "true"),
+    TRACING_MAX_SPANS (padrão 5000), TRACING_EXPORT_PATH,
+    TRACING_EXPORT_QUEUE_SIZE (padrão 10000), TRACING_SERVICE_NAME
+    (padrão "appointment-chat") e TRACING_DEBUG_ENDPOINT (padrão "false"),
+    que expõe os spans em memória em /debug/traces.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: Optional[bool] = None,
+        exporters: Optional[Sequence[SpanExporter]] = None,
+        max_spans: Optional[int] = None,
+        service_name: Optional[str] = None,
+        debug_endpoint: Optional[bool] = None,
+    ):
+        self.logger = get_logger(__name__)
+
+        if enabled is None:
+            enabled = os.getenv("TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+
+        if max_spans is None:
+            max_spans = int(os.getenv("TRACING_MAX_SPANS", "5000"))
+        self.service_name = service_name or os.getenv("TRACING_SERVICE_NAME") or "appointment-chat"
+
+        # Os spans trazem mensagens e dados do paciente: sem autenticação, o
+        # endpoint só existe quando ligado explicitamente
+        if debug_endpoint is None:
+            debug_endpoint = os.getenv("TRACING_DEBUG_ENDPOINT", "false").lower() in ("1", "true", "yes")
+        self.debug_endpoint = debug_endpoint
+
+        self.memory = InMemorySpanExporter(max_spans)
+        self.exporters: List[SpanExporter] = [self.memory]
+        if exporters is not None:
+            self.exporters.extend(exporters)
+        elif enabled and os.getenv("TRACING_EXPORT_PATH"):
+            self.exporters.append(OtlpJsonFileExporter(os.getenv("TRACING_EXPORT_PATH"), self.service_name))
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: Any = _UNSET,
+        attributes: Optional[Dict[str, AttributeValue]] = None,
+    ) -> Span:
+        """
+        Abre um span sem torná-lo o atual (para quem precisa encerrá-lo em
+        outro ponto, ex.: streaming). O pai padrão é o span atual.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is _UNSET:
+            parent = _current_span.get()
+        if parent is not None and parent.recording:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+        return Span(name, trace_id, secrets.token_hex(8), parent_id, attributes)
+
+    def end_span(self, span: Span) -> None:
+        if not span.recording or span.end_ns is not None:
+            return
+        span.end()
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as exc:
+                self.logger.warning("Erro ao exportar span %s: %s", span.name, exc)
+
+    def shutdown(self) -> None:
+        """Fecha os exportadores (ex.: o arquivo OTLP/JSON) no shutdown."""
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    @contextmanager
+    def span(self, name: str, **attributes: AttributeValue) -> Iterator[Span]:
+        """Abre um span filho do atual e o torna o span atual dentro do bloco."""
+        span = self.start_span(name, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            self.end_span(span)
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Gerador async finalizado em outro contexto: nada a restaurar
+                pass
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        """
+        Torna ``span`` o atual só dentro do bloco, sem encerrá-lo. Nos
+        geradores async o span é ativado a cada passo, para não vazar para
+        o código do consumidor entre um ``yield`` e outro.
+        """
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def remote_parent(self, traceparent: Optional[str]) -> Iterator[None]:
+        """
+        Continua um trace iniciado fora do processo, a partir do header
+        ``traceparent`` do W3C (``00-<trace_id>-<span_id>-<flags>``).
+        """
+        parent = _parse_traceparent(traceparent) if self.enabled else None
+        if parent is None:
+            yield
+            return
+        token = _current_span.set(parent)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+
+def _parse_traceparent(header: Optional[str]) -> Optional[Span]:
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    # Só carrega os ids: nunca é encerrado nem exportado por este processo
+    return Span("remote", parts[1], parts[2], None)
+
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+def traced(name: str, **attributes: AttributeValue) -> Callable:
+    """
+    Decorador que envolve a função (async ou não) num span ``name``. Usado
+    nas operações de Redis e nas consultas dos repositórios.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(name, **attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+@lru_cache(maxsize=1)
+def get_tracer() -> Tracer:
+    """Retorna o tracer compartilhado pelo processo (criado no primeiro uso)."""
+    return Tracer()
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmark reproduzivel da API de chat, sem custo e sem rede.
+
+Tudo roda localmente:
+- LLM: tests/fake_llm_server.py em um subprocesso (OpenAI e Gemini), com a
+  distribuicao de latencia e o streaming de tokens configuraveis;
+- Redis: fakeredis em memoria (pip install fakeredis) ou uma instancia
+  local/descartavel via --redis-url;
+- PostgreSQL: repositorios em memoria com --patients pacientes sinteticos.
+
+A API sobe no proprio processo (uvicorn numa porta local, numa thread com
+event loop proprio, separado do cliente de carga) com o mesmo AppContainer
+de producao, so trocando as dependencias externas, e os cenarios a
+exercitam por HTTP:
+- multi_turn: sessoes concorrentes com varios turnos cada;
+- burst: rajada de sessoes novas chegando ao mesmo tempo (um turno cada);
+- long_history: sessoes com historico longo ja gravado antes dos turnos;
+- stream: como multi_turn, pelo SSE, medindo o tempo ate o primeiro token.
+Outros cenarios podem ser definidos num JSON (--scenarios-file) com os
+campos de Scenario.
+
+O relatorio JSON (--output) traz, por cenario, p50/p95/p99, throughput e
+erros, alem do commit e dos parametros usados; as chaves saem ordenadas
+para o diff entre commits. --compare mostra a variacao para um relatorio
+anterior.
+
+Exemplo de uso:
+    python -m tests.benchmark_suite --output bench-base.json
+    python -m tests.benchmark_suite --latency-dist lognormal --latency-sigma 0.6 \\
+        --output bench-new.json --compare bench-base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+
+import aiohttp
+
+from tests.llm_concurrency_benchmark import FAKE_API_KEY, percentile, wait_for_server
+
+LLM_PORT = 8996
+API_PORT = 8995
+
+DISEASES = ["dengue", "asma", "gripe", "pneumonia", "enxaqueca", "gastrite"]
+SYMPTOMS = [
+    "febre",
+    "dor de cabeca",
+    "tosse",
+    "falta de ar",
+    "cansaco",
+    "nausea",
+    "dor no corpo",
+    "dor abdominal",
+    "chiado no peito",
+    "sensibilidade a luz",
+]
+MESSAGES = [
+    "Bom dia, o que traz voce aqui hoje?",
+    "Desde quando voce sente isso?",
+    "Voce teve febre nos ultimos dias?",
+    "A dor piora em algum horario?",
+    "Tem tosse ou falta de ar?",
+    "Alguem na sua casa tem os mesmos sintomas?",
+    "Voce toma algum medicamento?",
+    "Ja teve algo parecido antes?",
+]
+
+
+@dataclass
+class Scenario:
+    name: str
+    sessions: int
+    turns: int
+    concurrency: Optional[int] = None
+    stream: bool = False
+    history: int = 0
+    think_ms: float = 0.0
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "multi_turn": Scenario("multi_turn", sessions=32, turns=5),
+    "burst": Scenario("burst", sessions=200, turns=1),
+    "long_history": Scenario("long_history", sessions=16, turns=3, history=40),
+    "stream": Scenario("stream", sessions=32, turns=5, stream=True),
+}
+
+
+@dataclass
+class TurnResult:
+    latency: float
+    first_token: Optional[float]
+    ok: bool
+
+
+def build_repositories(patients: int, rng: random.Random):
+    """Repositorios em memoria no lugar do PostgreSQL."""
+    from src.Domain.Entities.Patient import Patient
+    from src.Domain.Entities.PatientSymptom import PatientSymptom
+    from src.Domain.Entities.Symptom import Symptom
+    from src.Domain.Interfaces.Repositories.AsyncPatientRepository import AsyncPatientRepository
+    from src.Domain.Interfaces.Repositories.AsyncPatientSymptomRepository import (
+        AsyncPatientSymptomRepository,
+    )
+
+    symptoms = {name: Symptom(UUID(int=rng.getrandbits(128)), name) for name in SYMPTOMS}
+    catalog = []
+    for _ in range(patients):
+        patient = Patient(UUID(int=rng.getrandbits(128)), rng.choice(DISEASES))
+        catalog.append((patient, [symptoms[name] for name in rng.sample(SYMPTOMS, rng.randint(3, 5))]))
+
+    class InMemoryPatientRepository(AsyncPatientRepository):
+        async def get_patient(self, id: str) -> Patient:
+            patient = await self.get_by_id(UUID(str(id)))
+            if patient is None:
+                raise ValueError(f"Patient with id {id} not found")
+            return patient
+
+        async def get_by_id(self, patient_id: UUID) -> Optional[Patient]:
+            return next((patient for patient, _ in catalog if patient.patient_id == patient_id), None)
+
+        async def list_all(self) -> List[Patient]:
+            return [patient for patient, _ in catalog]
+
+    class InMemoryPatientSymptomRepository(AsyncPatientSymptomRepository):
+        async def get_patient_symptoms(self, id: str) -> list[PatientSymptom]:
+            return [
+                PatientSymptom(patient.patient_id, symptom.symptom_id)
+                for patient, items in catalog
+                if str(patient.patient_id) == str(id)
+                for symptom in items
+            ]
+
+        async def list_symptoms_for_patient(self, patient_id: UUID) -> List[Symptom]:
+            return next((list(items) for patient, items in catalog if patient.patient_id == patient_id), [])
+
+        async def list_symptom_names_by_patient(self) -> Dict[UUID, List[str]]:
+            return {patient.patient_id: [s.symptom_name for s in items] for patient, items in catalog}
+
+    return InMemoryPatientRepository(), InMemoryPatientSymptomRepository()
+
+
+def build_redis(redis_url: Optional[str]):
+    if redis_url:
+        import redis.asyncio as redis
+
+        return redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+    try:
+        import fakeredis
+    except ImportError:
+        raise SystemExit("Instale o fakeredis (pip install fakeredis) ou informe --redis-url.")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def start_fake_llm(args: argparse.Namespace) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "tests.fake_llm_server",
+        "--port",
+        str(LLM_PORT),
+        "--latency-ms",
+        str(args.latency_ms),
+        "--jitter-ms",
+        str(args.jitter_ms),
+        "--latency-dist",
+        args.latency_dist,
+        "--latency-sigma",
+        str(args.latency_sigma),
+        "--token-interval-ms",
+        str(args.token_interval_ms),
+        "--error-rate",
+        str(args.error_rate),
+        "--seed",
+        str(args.seed),
+    ]
+    return subprocess.Popen(command)
+
+
+async def seed_history(store, session_id: str, entries: int, rng: random.Random) -> None:
+    """Grava um historico de ``entries`` mensagens antes dos turnos medidos."""
+    session = await store.load_session(session_id)
+    session.set_profile(symptom_list=rng.sample(SYMPTOMS, 3), disease=rng.choice(DISEASES))
+    for index in range(entries):
+        if index % 2 == 0:
+            session.add_message("user", rng.choice(MESSAGES))
+        else:
+            session.add_message("assistant", "Doutor, sinto um cansaco que nao passa ha uns dias.")
+    await store.commit(session)
+
+
+async def chat_turn(http: aiohttp.ClientSession, base_url: str, session_id: str, message: str) -> TurnResult:
+    started = perf_counter()
+    try:
+        async with http.post(f"{base_url}/chat/chat", json={"session_id": session_id, "message": message}) as resp:
+            await resp.read()
+            return TurnResult(perf_counter() - started, None, resp.status == 200)
+    except aiohttp.ClientError:
+        return TurnResult(perf_counter() - started, None, False)
+
+
+async def stream_turn(http: aiohttp.ClientSession, base_url: str, session_id: str, message: str) -> TurnResult:
+    started = perf_counter()
+    first_token: Optional[float] = None
+    ok = False
+    try:
+        async with http.post(
+            f"{base_url}/chat/chat/stream", json={"session_id": session_id, "message": message}
+        ) as resp:
+            if resp.status != 200:
+                await resp.read()
+                return TurnResult(perf_counter() - started, None, False)
+            async for raw_line in resp.content:
+                line = raw_line.decode().strip()
+                if line == "event: delta" and first_token is None:
+                    first_token = perf_counter() - started
+                elif line == "event: done":
+                    ok = True
+                elif line == "event: error":
+                    ok = False
+    except aiohttp.ClientError:
+        ok = False
+    return TurnResult(perf_counter() - started, first_token, ok)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "p50": round(percentile(values, 50) * 1000, 1),
+        "p95": round(percentile(values, 95) * 1000, 1),
+        "p99": round(percentile(values, 99) * 1000, 1),
+        "mean": round(statistics.fmean(values) * 1000, 1),
+        "max": round(max(values) * 1000, 1),
+    }
+
+
+async def run_scenario(
+    scenario: Scenario,
+    http: aiohttp.ClientSession,
+    base_url: str,
+    api: ApiServer,
+    rng: random.Random,
+) -> Dict[str, object]:
+    session_ids = [str(uuid4()) for _ in range(scenario.sessions)]
+    for session_id in session_ids if scenario.history else []:
+        await api.call(seed_history(api.store, session_id, scenario.history, rng))
+
+    turn = stream_turn if scenario.stream else chat_turn
+    # Mensagens sorteadas antes: a ordem das tarefas nao muda o roteiro
+    scripts = [[rng.choice(MESSAGES) for _ in range(scenario.turns)] for _ in session_ids]
+    limit = asyncio.Semaphore(scenario.concurrency or scenario.sessions)
+    results: List[TurnResult] = []
+
+    async def session(session_id: str, messages: List[str]) -> None:
+        async with limit:
+            for index, message in enumerate(messages):
+                if index and scenario.think_ms:
+                    await asyncio.sleep(scenario.think_ms / 1000)
+                results.append(await turn(http, base_url, session_id, message))
+
+    started = perf_counter()
+    await asyncio.gather(*(session(session_id, script) for session_id, script in zip(session_ids, scripts)))
+    wall_time = perf_counter() - started
+
+    errors = sum(1 for result in results if not result.ok)
+    report: Dict[str, object] = {
+        "config": asdict(scenario),
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(results) / wall_time, 2) if wall_time else 0.0,
+        "latency_ms": summarize([result.latency for result in results if result.ok]),
+    }
+    if scenario.stream:
+        report["ttft_ms"] = summarize([r.first_token for r in results if r.ok and r.first_token is not None])
+    return report
+
+
+def load_scenarios(args: argparse.Namespace) -> List[Scenario]:
+    available = dict(SCENARIOS)
+    if args.scenarios_file:
+        with open(args.scenarios_file, encoding="utf-8") as handle:
+            known = {item.name for item in fields(Scenario)}
+            for raw in json.load(handle):
+                scenario = Scenario(**{key: value for key, value in raw.items() if key in known})
+                available[scenario.name] = scenario
+
+    names = args.scenarios or list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise SystemExit(f"Cenarios desconhecidos: {', '.join(unknown)} (disponiveis: {', '.join(available)})")
+
+    scenarios = []
+    for name in names:
+        scenario = Scenario(**asdict(available[name]))
+        scenario.sessions = max(1, round(scenario.sessions * args.scale))
+        scenarios.append(scenario)
+    return scenarios
+
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return f"{commit}-dirty" if dirty.stdout.strip() else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ApiServer:
+    """
+    API (uvicorn + AppContainer com os fakes) numa thread propria, com o seu
+    event loop. O cliente de carga fica no loop principal: se os dois
+    dividissem o mesmo loop, o custo do aiohttp entraria nas latencias
+    medidas e cada lado atrasaria o outro.
+
+    Redis e clientes LLM ficam presos ao loop da API, entao o que usa o
+    store (seed_history) roda la via ``call``.
+    """
+
+    def __init__(self, args: argparse.Namespace, patient_repository, patient_symptom_repository):
+        self.args = args
+        self.patient_repository = patient_repository
+        self.patient_symptom_repository = patient_symptom_repository
+        self.store = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="benchmark-api", daemon=True)
+
+    async def start(self) -> None:
+        self._thread.start()
+        await asyncio.to_thread(self._ready.wait)
+        if self._error is not None:
+            raise RuntimeError("A API do benchmark nao subiu") from self._error
+
+    async def call(self, coroutine):
+        """Executa ``coroutine`` no loop da API e espera o resultado."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._loop))
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        await asyncio.to_thread(self._thread.join)
+        if self._error is not None:
+            raise RuntimeError("A API do benchmark falhou") from self._error
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            self._ready.set()
+
+    async def _serve(self) -> None:
+        import uvicorn
+
+        import app as app_module
+        from src.Api.Dependencies import AppContainer
+        from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+        from src.Infrastructure.Cache.LlmResponseCache import LlmResponseCache
+
+        self._loop = asyncio.get_running_loop()
+        redis_client = build_redis(self.args.redis_url)
+        self.store = ChatMemoryStore(redis_client=redis_client)
+        container = AppContainer(
+            patient_repository=self.patient_repository,
+            patient_symptom_repository=self.patient_symptom_repository,
+            chat_memory_store=self.store,
+            response_cache=LlmResponseCache(redis_client=redis_client),
+        )
+        await container.startup()
+        try:
+            app_module.app.state.container = container
+            # O lifespan fica desligado: o container acima ja foi montado com os fakes.
+            # Fora da thread principal o uvicorn nao instala handlers de sinal.
+            self._server = uvicorn.Server(
+                uvicorn.Config(
+                    app_module.app, host="127.0.0.1", port=API_PORT, lifespan="off", log_level="warning"
+                )
+            )
+            server_task = asyncio.create_task(self._server.serve())
+            while not self._server.started:
+                if server_task.done():
+                    server_task.result()
+                    raise RuntimeError("uvicorn encerrou antes de subir")
+                await asyncio.sleep(0.05)
+            self._ready.set()
+            await server_task
+        finally:
+            await container.shutdown()
+            if self.args.redis_url:
+                await redis_client.aclose()
+
+
+async def run_suite(args: argparse.Namespace, scenarios: List[Scenario]) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    patient_repository, patient_symptom_repository = build_repositories(args.patients, rng)
+
+    api = ApiServer(args, patient_repository, patient_symptom_repository)
+    await api.start()
+    try:
+        base_url = f"http://127.0.0.1:{API_PORT}"
+        timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0), timeout=timeout) as http:
+            # Aquecimento: clientes, pools e catalogo antes de medir
+            await chat_turn(http, base_url, str(uuid4()), MESSAGES[0])
+            results = {}
+            for scenario in scenarios:
+                print(f"Executando {scenario.name} ({scenario.sessions} sessoes x {scenario.turns} turnos)...")
+                results[scenario.name] = await run_scenario(scenario, http, base_url, api, rng)
+    finally:
+        await api.stop()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "seed": args.seed,
+            "patients": args.patients,
+            "redis": "redis-url" if args.redis_url else "fakeredis",
+            "llm": {
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "latency_dist": args.latency_dist,
+                "latency_sigma": args.latency_sigma,
+                "token_interval_ms": args.token_interval_ms,
+                "error_rate": args.error_rate,
+            },
+        },
+        "scenarios": results,
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    print(f"\n{'cenario':<14} {'req':>6} {'erros':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ttft p95':>9}")
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"] or {}
+        ttft = (result.get("ttft_ms") or {}).get("p95")
+        print(
+            f"{name:<14} {result['requests']:>6} {result['errors']:>6} {result['throughput_rps']:>8.1f} "
+            f"{latency.get('p50', 0):>9.1f} {latency.get('p95', 0):>9.1f} {latency.get('p99', 0):>9.1f} "
+            f"{ttft if ttft is not None else '-':>9}"
+        )
+
+
+def print_comparison(report: Dict[str, object], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+
+    print(f"\nComparacao com {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"{'cenario':<14} {'metrica':<16} {'antes':>10} {'agora':>10} {'variacao':>9}")
+    for name, result in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        pairs = [("throughput_rps", before["throughput_rps"], result["throughput_rps"]),
+                 ("errors", before["errors"], result["errors"])]
+        for group in ("latency_ms", "ttft_ms"):
+            for key in ("p50", "p95", "p99"):
+                if key in (before.get(group) or {}) and key in (result.get(group) or {}):
+                    pairs.append((f"{group[:-3]} {key}", before[group][key], result[group][key]))
+        for metric, old, new in pairs:
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+            print(f"{name:<14} {metric:<16} {old:>10} {new:>10} {change:>9}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Suite de benchmark reproduzivel (LLM, Redis e PostgreSQL locais/falsos)."
+    )
+    parser.add_argument("--scenarios", nargs="+", default=None, help="Cenarios a executar (padrao: todos).")
+    parser.add_argument("--scenarios-file", default=None, help="JSON com uma lista de cenarios extras.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplica o numero de sessoes dos cenarios.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--patients", type=int, default=50, help="Pacientes sinteticos no catalogo.")
+    parser.add_argument("--redis-url", default=None, help="Redis real (padrao: fakeredis em memoria).")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--latency-dist", choices=["uniform", "lognormal", "exponential"], default="uniform")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--token-interval-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--output", default=None, help="Grava o relatorio JSON neste arquivo.")
+    parser.add_argument("--compare", default=None, help="Relatorio JSON anterior para comparar.")
+    return parser.parse_args()
+
+
+async def async_main() -> None:
+    args = parse_args()
+    scenarios = load_scenarios(args)
+    random.seed(args.seed)
+
+    os.environ.setdefault("OPENAI_API_KEY", FAKE_API_KEY)
+    os.environ.setdefault("GEMINI_API_KEY", FAKE_API_KEY)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{LLM_PORT}/v1"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{LLM_PORT}"
+    # Log por mensagem distorce a medicao; LOG_LEVEL=INFO para ver tudo
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    llm_server = start_fake_llm(args)
+    try:
+        await wait_for_server(f"http://127.0.0.1:{LLM_PORT}")
+        report = await run_suite(args, scenarios)
+    finally:
+        llm_server.terminate()
+        llm_server.wait()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"\nRelatorio gravado em {args.output}")
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+def main() -> None:
+    try:
+        asyncio.run(async_main())
+    except KeyboardInterrupt:
+        print("\nExecucao interrompida pelo usuario.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita as APIs da OpenAI (chat completions) e do Gemini
+(generateContent) com latencia configuravel, para benchmarks sem custo e
+sem depender de rede. Tambem suporta streaming (stream=True na OpenAI e
+streamGenerateContent no Gemini): a latencia configurada vira o tempo ate o
+primeiro token e os demais tokens saem a cada --token-interval-ms.
+
+A latencia segue a distribuicao escolhida em --latency-dist: uniform
+(--latency-ms +/- --jitter-ms), lognormal (mediana --latency-ms e desvio
+--latency-sigma no log, com cauda longa como a de um provedor real) ou
+exponential (--latency-ms fixo mais uma cauda exponencial de media
+--jitter-ms). Com --seed os sorteios sao reproduziveis.
+
+Para testar failover e hedge, injeta falhas e cauda de latencia: uma fracao
+das chamadas (--error-rate) responde com erro HTTP e outra (--slow-rate)
+demora --slow-latency-ms em vez da latencia normal.
+
+Simula ainda o cache de prefixo dos provedores: o uso de tokens informa
+quantos tokens do prompt coincidem com o inicio de um prompt recente
+(em blocos de 128, a partir de 1024 tokens, como na OpenAI).
+
+Exemplo de uso:
+    python -m tests.fake_llm_server --port 8999 --latency-ms 800 --jitter-ms 200
+    python -m tests.fake_llm_server --port 9000 --error-rate 0.1 --slow-rate 0.05 --slow-latency-ms 5000
+    python -m tests.fake_llm_server --latency-dist lognormal --latency-ms 600 --latency-sigma 0.6 --seed 42
+
+Aponte os provedores para ele com:
+    OPENAI_BASE_URL=http://127.0.0.1:8999/v1
+    GEMINI_BASE_URL=http://127.0.0.1:8999
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+from aiohttp import web
+
+ROUTER_LABELS = ["sintomas", "conversation", "final", "fallback"]
+DEFAULT_REPLY = (
+    "Doutor, estou com uma dor aqui no peito faz uns tres dias e "
+    "tambem sinto um cansaco que nao passa."
+)
+
+
+LATENCY_DISTRIBUTIONS = ("uniform", "lognormal", "exponential")
+
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+
+class PromptPrefixCache:
+    """Imita o cache de prefixo: lembra os ultimos prompts recebidos."""
+
+    def __init__(self, max_entries: int = 256):
+        self._recent: deque = deque(maxlen=max_entries)
+
+    def cached_tokens(self, prompt_text: str) -> int:
+        longest = max(
+            (len(os.path.commonprefix([prompt_text, previous])) for previous in self._recent),
+            default=0,
+        )
+        self._recent.append(prompt_text)
+        tokens = longest // 4
+        if tokens < CACHE_MIN_TOKENS:
+            return 0
+        return tokens // CACHE_BLOCK_TOKENS * CACHE_BLOCK_TOKENS
+
+
+@dataclass
+class FakeServerConfig:
+    latency_ms: float = 800.0
+    jitter_ms: float = 0.0
+    latency_dist: str = "uniform"
+    latency_sigma: float = 0.5
+    token_interval_ms: float = 20.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    slow_rate: float = 0.0
+    slow_latency_ms: float = 5000.0
+    prompt_cache: PromptPrefixCache = field(default_factory=PromptPrefixCache)
+
+
+def _is_router_prompt(system_prompt: str) -> bool:
+    return "classificador" in (system_prompt or "")
+
+
+def build_reply(system_prompt: str) -> str:
+    if _is_router_prompt(system_prompt):
+        return random.choice(ROUTER_LABELS)
+    return DEFAULT_REPLY
+
+
+async def simulate_latency(config: FakeServerConfig) -> None:
+    if config.slow_rate and random.random() < config.slow_rate:
+        await asyncio.sleep(config.slow_latency_ms / 1000)
+        return
+    await asyncio.sleep(max(sample_latency_ms(config), 0.0) / 1000)
+
+
+def sample_latency_ms(config: FakeServerConfig) -> float:
+    if config.latency_dist == "lognormal":
+        return random.lognormvariate(math.log(max(config.latency_ms, 1e-3)), config.latency_sigma)
+    if config.latency_dist == "exponential":
+        tail = random.expovariate(1 / config.jitter_ms) if config.jitter_ms else 0.0
+        return config.latency_ms + tail
+    delay_ms = config.latency_ms
+    if config.jitter_ms:
+        delay_ms += random.uniform(-config.jitter_ms, config.jitter_ms)
+    return delay_ms
+
+
+def simulate_error(config: FakeServerConfig) -> web.Response | None:
+    if not config.error_rate or random.random() >= config.error_rate:
+        return None
+    return web.json_response(
+        {"error": {"code": config.error_status, "message": "Falha simulada", "status": "UNAVAILABLE"}},
+        status=config.error_status,
+    )
+
+
+def split_tokens(reply: str) -> list[str]:
+    words = reply.split(" ")
+    return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+
+async def stream_sse(
+    request: web.Request,
+    config: FakeServerConfig,
+    events: list[dict],
+    done_marker: bool,
+) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+
+    for index, event in enumerate(events):
+        if index and config.token_interval_ms:
+            await asyncio.sleep(config.token_interval_ms / 1000)
+        await response.write(f"data: {json.dumps(event)}\n\n".encode())
+
+    if done_marker:
+        await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+async def openai_chat_completions(request: web.Request) -> web.StreamResponse:
+    config: FakeServerConfig = request.app["config"]
+    body = await request.json()
+    messages = body.get("messages") or []
+    system_prompt = next(
+        (m.get("content") or "" for m in messages if m.get("role") == "system"), ""
+    )
+
+    await simulate_latency(config)
+    error = simulate_error(config)
+    if error is not None:
+        return error
+    reply = build_reply(system_prompt)
+    prompt_text = "".join(m.get("content") or "" for m in messages)
+    usage = {
+        "prompt_tokens": len(prompt_text) // 4,
+        "completion_tokens": len(reply) // 4,
+        "total_tokens": (len(prompt_text) + len(reply)) // 4,
+        "prompt_tokens_details": {"cached_tokens": config.prompt_cache.cached_tokens(prompt_text)},
+    }
+
+    if body.get("stream"):
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        events = [
+            {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model") or "fake-model",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            for token in split_tokens(reply)
+        ]
+        if (body.get("stream_options") or {}).get("include_usage"):
+            events.append(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model") or "fake-model",
+                    "choices": [],
+                    "usage": usage,
+                }
+            )
+        return await stream_sse(request, config, events, done_marker=True)
+
+    return web.json_response(
+        {
+            "id": f"chatcmpl-{uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "fake-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": usage,
+        }
+    )
+
+
+def _gemini_payload(text: str, prompt_text: str, cached_tokens: int) -> dict:
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }
+        ],
+        "usageMetadata": {
+            "promptTokenCount": len(prompt_text) // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "cachedContentTokenCount": cached_tokens,
+        },
+    }
+
+
+def gemini_prompt_text(body: dict) -> str:
+    # system_instruction primeiro, como o prefixo que o provedor cacheia
+    system_instruction = body.get("systemInstruction") or {}
+    contents = [system_instruction, *(body.get("contents") or [])]
+    return " ".join(
+        part.get("text") or ""
+        for content in contents
+        for part in content.get("parts") or []
+    )
+
+
+async def gemini_stream_generate_content(request: web.Request) -> web.StreamResponse:
+    config: FakeServerConfig = request.app["config"]
+    body = await request.json()
+    prompt_text = gemini_prompt_text(body)
+
+    await simulate_latency(config)
+    error = simulate_error(config)
+    if error is not None:
+        return error
+    reply = build_reply(prompt_text)
+    cached_tokens = config.prompt_cache.cached_tokens(prompt_text)
+    events = [_gemini_payload(token, prompt_text, cached_tokens) for token in split_tokens(reply)]
+    return await stream_sse(request, config, events, done_marker=False)
+
+
+async def gemini_generate_content(request: web.Request) -> web.Response:
+    config: FakeServerConfig = request.app["config"]
+    body = await request.json()
+    prompt_text = gemini_prompt_text(body)
+
+    await simulate_latency(config)
+    error = simulate_error(config)
+    if error is not None:
+        return error
+    reply = build_reply(prompt_text)
+
+    cached_tokens = config.prompt_cache.cached_tokens(prompt_text)
+    return web.json_response(_gemini_payload(reply, prompt_text, cached_tokens))
+
+
+def build_app(config: FakeServerConfig) -> web.Application:
+    app = web.Application()
+    app["config"] = config
+    app.router.add_post("/v1/chat/completions", openai_chat_completions)
+    app.router.add_post("/{version}/models/{model}:generateContent", gemini_generate_content)
+    app.router.add_post(
+        "/{version}/models/{model}:streamGenerateContent", gemini_stream_generate_content
+    )
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor LLM falso para benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=800.0,
+        help="Latencia media simulada por chamada.",
+    )
+    parser.add_argument(
+        "--jitter-ms",
+        type=float,
+        default=0.0,
+        help="Variacao uniforme (+/-) aplicada a latencia; na exponential, media da cauda.",
+    )
+    parser.add_argument(
+        "--latency-dist",
+        choices=LATENCY_DISTRIBUTIONS,
+        default="uniform",
+        help="Distribuicao da latencia simulada.",
+    )
+    parser.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=0.5,
+        help="Desvio padrao do log da latencia na distribuicao lognormal.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Semente dos sorteios (reproduzivel).")
+    parser.add_argument(
+        "--token-interval-ms",
+        type=float,
+        default=20.0,
+        help="Intervalo entre tokens nas respostas em streaming.",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fracao das chamadas que respondem com erro HTTP (0 a 1).",
+    )
+    parser.add_argument(
+        "--error-status",
+        type=int,
+        default=503,
+        help="Status HTTP das falhas simuladas.",
+    )
+    parser.add_argument(
+        "--slow-rate",
+        type=float,
+        default=0.0,
+        help="Fracao das chamadas que demoram --slow-latency-ms (cauda de latencia).",
+    )
+    parser.add_argument("--slow-latency-ms", type=float, default=5000.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    config = FakeServerConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        token_interval_ms=args.token_interval_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        slow_rate=args.slow_rate,
+        slow_latency_ms=args.slow_latency_ms,
+    )
+    web.run_app(build_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
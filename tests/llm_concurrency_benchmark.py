@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Compara quantas sessoes concorrentes um unico worker sustenta chamando o LLM
+de duas formas:
+
+- to_thread: cliente sincrono da OpenAI dentro de asyncio.to_thread
+  (implementacao anterior, limitada pelo pool de threads padrao);
+- async: OpenAILlm atual, com AsyncOpenAI e o limitador por provedor.
+
+Por padrao sobe o tests/fake_llm_server.py em um subprocesso, entao nenhuma
+chamada real e feita.
+
+Exemplo de uso:
+    python -m tests.llm_concurrency_benchmark --levels 8 16 32 64 128 --latency-ms 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Awaitable, Callable, List
+
+import aiohttp
+
+FAKE_API_KEY = "sk-fake-benchmark"
+
+
+@dataclass
+class LevelResult:
+    mode: str
+    concurrency: int
+    calls: int
+    errors: int
+    wall_time: float
+    p50: float
+    p95: float
+
+    @property
+    def throughput(self) -> float:
+        return self.calls / self.wall_time if self.wall_time else 0.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def wait_for_server(url: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.post(f"{url}/v1/chat/completions", json={"messages": []}):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Servidor falso nao respondeu em {url}")
+
+
+def start_fake_server(port: int, latency_ms: float, jitter_ms: float) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "tests.fake_llm_server",
+            "--port",
+            str(port),
+            "--latency-ms",
+            str(latency_ms),
+            "--jitter-ms",
+            str(jitter_ms),
+        ]
+    )
+
+
+def build_to_thread_call(base_url: str, pool_size: int) -> Callable[[str], Awaitable[str]]:
+    import httpx
+    from openai import OpenAI
+
+    client = OpenAI(
+        api_key=FAKE_API_KEY,
+        base_url=f"{base_url}/v1",
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        ),
+    )
+
+    async def call(message: str) -> str:
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model="fake-model",
+            max_completion_tokens=256,
+            messages=[
+                {"role": "system", "content": "Voce e um paciente."},
+                {"role": "user", "content": message},
+            ],
+        )
+        return response.choices[0].message.content
+
+    return call
+
+
+def build_async_call() -> Callable[[str], Awaitable[str]]:
+    from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig
+    from src.Infrastructure.Llm.OpenAiLlm import OpenAILlm
+
+    llm = OpenAILlm(
+        LlmConfig(model="fake-model", max_completion_tokens=256),
+        "Voce e um paciente.",
+    )
+
+    async def call(message: str) -> str:
+        response = await llm.process(message)
+        return response.message or ""
+
+    return call
+
+
+async def run_level(
+    mode: str,
+    call: Callable[[str], Awaitable[str]],
+    concurrency: int,
+    turns: int,
+) -> LevelResult:
+    latencies: List[float] = []
+    errors = 0
+
+    async def session(session_index: int) -> None:
+        nonlocal errors
+        for turn in range(turns):
+            started = perf_counter()
+            try:
+                await call(f"Sessao {session_index}, pergunta {turn}: o que sente?")
+                latencies.append(perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = perf_counter()
+    await asyncio.gather(*(session(i) for i in range(concurrency)))
+    wall_time = perf_counter() - started
+
+    return LevelResult(
+        mode=mode,
+        concurrency=concurrency,
+        calls=len(latencies),
+        errors=errors,
+        wall_time=wall_time,
+        p50=statistics.median(latencies) if latencies else 0.0,
+        p95=percentile(latencies, 95),
+    )
+
+
+def sustained_sessions(results: List[LevelResult], latency_s: float, slo_factor: float) -> int:
+    sustained = 0
+    for result in results:
+        if result.errors == 0 and result.p95 <= latency_s * slo_factor:
+            sustained = max(sustained, result.concurrency)
+    return sustained
+
+
+def print_results(results: List[LevelResult]) -> None:
+    print(f"{'modo':<10} {'sessoes':>8} {'chamadas':>9} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>8}")
+    for r in results:
+        print(
+            f"{r.mode:<10} {r.concurrency:>8} {r.calls:>9} {r.errors:>6} "
+            f"{r.p50 * 1000:>9.1f} {r.p95 * 1000:>9.1f} {r.throughput:>8.1f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark de concorrencia: to_thread vs provedores async."
+    )
+    parser.add_argument(
+        "--server-url",
+        default=None,
+        help="URL de um servidor falso ja em execucao (default: sobe um local).",
+    )
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--levels",
+        type=int,
+        nargs="+",
+        default=[8, 16, 32, 64, 128, 256],
+        help="Numeros de sessoes concorrentes a testar.",
+    )
+    parser.add_argument("--turns", type=int, default=3, help="Chamadas por sessao.")
+    parser.add_argument(
+        "--slo-factor",
+        type=float,
+        default=1.5,
+        help="Sessoes sao 'sustentadas' enquanto p95 <= latencia * fator.",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["to_thread", "async"],
+        default=["to_thread", "async"],
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> None:
+    args = parse_args()
+    max_level = max(args.levels)
+
+    # Os limites do processo nao podem ser o gargalo do benchmark
+    os.environ.setdefault("OPENAI_API_KEY", FAKE_API_KEY)
+    os.environ.setdefault("LLM_HTTP_POOL_SIZE", str(max_level))
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", str(max_level))
+
+    server = None
+    base_url = args.server_url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = start_fake_server(args.port, args.latency_ms, args.jitter_ms)
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+
+    try:
+        await wait_for_server(base_url)
+
+        results: List[LevelResult] = []
+        for mode in args.modes:
+            if mode == "to_thread":
+                call = build_to_thread_call(base_url, max_level)
+            else:
+                call = build_async_call()
+
+            for level in args.levels:
+                results.append(await run_level(mode, call, level, args.turns))
+
+        print_results(results)
+
+        latency_s = args.latency_ms / 1000
+        print("\n=== Sessoes concorrentes sustentadas por worker ===")
+        for mode in args.modes:
+            mode_results = [r for r in results if r.mode == mode]
+            print(f"{mode}: {sustained_sessions(mode_results, latency_s, args.slo_factor)}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    try:
+        asyncio.run(async_main())
+    except KeyboardInterrupt:
+        print("\nExecucao interrompida pelo usuario.")
+
+
+if __name__ == "__main__":
+    main()
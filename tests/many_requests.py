@@ -1,28 +1,47 @@
 #!/usr/bin/env python3
 """
-Script utilitario para enviar muitas mensagens ao endpoint do chat e levantar metricas
-com mensagens do ponto de vista do medico (o LLM atua como paciente).
+Gerador de carga do endpoint do chat, com mensagens do ponto de vista do
+medico (o LLM atua como paciente).
+
+Simula --students alunos, cada um numa consulta de --turns turnos com um
+tempo de reflexao (--think-ms, exponencial) entre a resposta e a proxima
+mensagem. As chegadas sao em malha aberta: seguem um processo de Poisson a
+--rate alunos por segundo, independente de o servidor estar respondendo, e
+assim a concorrencia surge da latencia, como com alunos reais.
+
+A latencia "corrigida" conta a partir do envio planejado e nao do real
+(correcao de coordinated omission): a primeira mensagem parte do instante
+sorteado para a chegada do aluno, e a resposta que passar de --slo-ms
+atrasa as mensagens seguintes do aluno, atraso que entra na latencia
+delas. O relatorio traz p50/p95/p99 bruto e corrigido, a latencia por
+indice de turno (efeito do historico crescendo) e, com --stream, o tempo
+ate o primeiro token.
 
 Exemplo de uso:
-    python tests/many_requests.py --total 30 --pause 0.2
+    python -m tests.many_requests --students 20 --rate 0.5 --turns 6
+    python -m tests.many_requests --students 50 --rate 2 --stream --output carga.json
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import itertools
+import json
 import os
 import random
 import statistics
 import textwrap
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from time import perf_counter
-from typing import List
+from typing import Dict, List
 from uuid import uuid4
 
 import aiohttp
 
+from tests.benchmark_suite import summarize as summarize_latencies
+
 DEFAULT_URL = os.environ.get("CHAT_API_URL", "http://localhost:8000/chat/chat")
 
 DOCTOR_GREETINGS = [
@@ -82,6 +101,18 @@ class RequestResult:
     elapsed: float | None = None
     error: str | None = None
     response_excerpt: str | None = None
+    ttft: float | None = None
+    turn: int = 0
+    # Medidos a partir do envio planejado (correcao de coordinated omission)
+    corrected: float | None = None
+    corrected_ttft: float | None = None
+
+
+@dataclass
+class LoadTestResult:
+    results: List[RequestResult] = field(default_factory=list)
+    wall_time: float = 0.0
+    peak_students: int = 0
 
 
 def build_message(idx: int) -> str:
@@ -118,8 +149,8 @@ async def send_request(
 
     try:
         async with session.post(url, json=payload) as response:
-            elapsed = perf_counter() - started
             body_text = await _extract_body(response)
+            elapsed = perf_counter() - started
             success = 200 <= response.status < 300
 
             return RequestResult(
@@ -158,6 +189,98 @@ async def send_request(
         )
 
 
+def build_stream_url(url: str) -> str:
+    return f"{url.rstrip('/')}/stream"
+
+
+async def send_stream_request(
+    session: aiohttp.ClientSession,
+    url: str,
+    session_id: str,
+    message: str,
+    index: int,
+) -> RequestResult:
+    """
+    Envia a mensagem para o endpoint SSE e mede o tempo ate o primeiro token
+    (primeiro evento `delta`) alem do tempo total.
+    """
+    payload = {"session_id": session_id, "message": message}
+    started = perf_counter()
+    ttft: float | None = None
+    parts: List[str] = []
+    stream_error: str | None = None
+
+    try:
+        async with session.post(build_stream_url(url), json=payload) as response:
+            if not 200 <= response.status < 300:
+                return RequestResult(
+                    index=index,
+                    session_id=session_id,
+                    message=message,
+                    success=False,
+                    status=response.status,
+                    elapsed=perf_counter() - started,
+                    error=await response.text(),
+                )
+
+            event = None
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):].strip())
+                    if event == "delta":
+                        if ttft is None:
+                            ttft = perf_counter() - started
+                        parts.append(data.get("delta") or "")
+                    elif event == "error":
+                        stream_error = str(data.get("detail") or data)
+
+            elapsed = perf_counter() - started
+            body_text = "".join(parts).strip()
+            success = stream_error is None
+
+            return RequestResult(
+                index=index,
+                session_id=session_id,
+                message=message,
+                success=success,
+                status=response.status,
+                elapsed=elapsed,
+                error=stream_error,
+                response_excerpt=body_text if success else None,
+                ttft=ttft,
+            )
+    except asyncio.TimeoutError:
+        return RequestResult(
+            index=index,
+            session_id=session_id,
+            message=message,
+            success=False,
+            error="timeout",
+            ttft=ttft,
+        )
+    except aiohttp.ClientError as exc:
+        return RequestResult(
+            index=index,
+            session_id=session_id,
+            message=message,
+            success=False,
+            error=f"client-error: {exc}",
+            ttft=ttft,
+        )
+    except Exception as exc:  # pragma: no cover - fallback
+        return RequestResult(
+            index=index,
+            session_id=session_id,
+            message=message,
+            success=False,
+            error=f"unexpected: {exc}",
+            ttft=ttft,
+        )
+
+
 async def _extract_body(response: aiohttp.ClientResponse) -> str:
     try:
         data = await response.json()
@@ -169,36 +292,82 @@ async def _extract_body(response: aiohttp.ClientResponse) -> str:
         return await response.text()
 
 
-async def run_stress_test(
-    total_requests: int,
+async def sleep_until(instant: float) -> None:
+    delay = instant - perf_counter()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+async def run_load_test(
+    students: int,
+    rate: float,
+    turns: int,
+    think_time: float,
+    slo: float,
     url: str,
-    change_session_every: int,
-    pause: float,
     timeout: float,
-) -> List[RequestResult]:
+    stream: bool = False,
+    connections: int = 100,
+) -> LoadTestResult:
+    """
+    Dispara as consultas em malha aberta: o aluno i chega no instante
+    sorteado pelo processo de Poisson mesmo que os anteriores ainda estejam
+    esperando resposta.
+    """
     timeout_cfg = aiohttp.ClientTimeout(total=timeout)
-    results: List[RequestResult] = []
-    current_session = str(uuid4())
-
-    async with aiohttp.ClientSession(timeout=timeout_cfg) as session:
-        for idx in range(total_requests):
-            if idx % change_session_every == 0:
-                current_session = str(uuid4())
-
-            message = build_message(idx)
-            result = await send_request(
-                session=session,
-                url=url,
-                session_id=current_session,
-                message=message,
-                index=idx,
-            )
-            results.append(result)
-
-            if pause > 0:
-                await asyncio.sleep(pause)
-
-    return results
+    sender = send_stream_request if stream else send_request
+    load = LoadTestResult()
+    sequence = itertools.count()
+    active = 0
+
+    async def consultation(session: aiohttp.ClientSession, arrival: float) -> None:
+        nonlocal active
+        active += 1
+        load.peak_students = max(load.peak_students, active)
+        session_id = str(uuid4())
+        planned = arrival
+        try:
+            for turn in range(turns):
+                await sleep_until(planned)
+                message = random.choice(DOCTOR_GREETINGS) if turn == 0 else build_message(turn)
+                sent = perf_counter()
+                result = await sender(
+                    session=session,
+                    url=url,
+                    session_id=session_id,
+                    message=message,
+                    index=next(sequence),
+                )
+                finished = perf_counter()
+
+                result.turn = turn
+                result.corrected = finished - planned
+                if result.ttft is not None:
+                    result.corrected_ttft = sent - planned + result.ttft
+                load.results.append(result)
+
+                # O aluno le a resposta e pensa antes de responder. Se o
+                # servidor tivesse respondido dentro do SLO, a proxima mensagem
+                # sairia antes: o excedente fica na latencia dos turnos seguintes
+                think = random.expovariate(1 / think_time) if think_time > 0 else 0.0
+                planned += min(result.corrected, slo) + think
+        finally:
+            active -= 1
+
+    connector = aiohttp.TCPConnector(limit=connections)
+    async with aiohttp.ClientSession(timeout=timeout_cfg, connector=connector) as session:
+        started = perf_counter()
+        arrival = started
+        tasks = []
+        for _ in range(students):
+            await sleep_until(arrival)
+            tasks.append(asyncio.create_task(consultation(session, arrival)))
+            arrival += random.expovariate(rate)
+        await asyncio.gather(*tasks)
+        load.wall_time = perf_counter() - started
+
+    load.results.sort(key=lambda result: result.index)
+    return load
 
 
 def print_request_log(result: RequestResult) -> None:
@@ -208,6 +377,12 @@ def print_request_log(result: RequestResult) -> None:
         if result.elapsed is not None
         else "--"
     )
+    if result.ttft is not None:
+        duration += f" (ttft={result.ttft * 1000:.1f} ms)"
+    if result.corrected is not None:
+        duration += f" corrigido={result.corrected * 1000:.1f} ms"
+    # Turno so faz sentido nas consultas do gerador de carga
+    turn = f"turno={result.turn + 1} " if result.corrected is not None else ""
     preview = textwrap.shorten(result.message, width=70, placeholder="...")
     extra = (
         textwrap.shorten(result.response_excerpt or "", width=60, placeholder="...")
@@ -218,6 +393,7 @@ def print_request_log(result: RequestResult) -> None:
     print(
         f"{status_icon} #{result.index + 1:03d} "
         f"session={result.session_id[:8]} "
+        f"{turn}"
         f"tempo={duration} "
         f"status={result.status or 'n/a'} "
         f"msg='{preview}' "
@@ -243,15 +419,95 @@ def summarize(results: List[RequestResult]) -> None:
     print(f"Falhas: {failure_count}")
     if success_latencies:
         print(f"Tempo medio de resposta: {avg_latency * 1000:.2f} ms")
+    ttfts = [r.ttft for r in results if r.success and r.ttft is not None]
+    if ttfts:
+        print(f"Tempo medio ate o primeiro token: {statistics.mean(ttfts) * 1000:.2f} ms")
+        print(f"Maior tempo ate o primeiro token: {max(ttfts) * 1000:.2f} ms")
     if error_counter:
         print("Principais erros:")
         for error, count in error_counter.most_common(3):
             print(f" - {count}x {error}")
 
 
+def build_report(load: LoadTestResult, args: argparse.Namespace) -> Dict[str, object]:
+    ok = [r for r in load.results if r.success]
+    by_turn = []
+    for turn in range(args.turns):
+        results = [r for r in load.results if r.turn == turn]
+        turn_ok = [r for r in results if r.success]
+        by_turn.append({
+            "turn": turn + 1,
+            "requests": len(results),
+            "errors": len(results) - len(turn_ok),
+            "latency_ms": summarize_latencies([r.elapsed for r in turn_ok]),
+            "corrected_latency_ms": summarize_latencies([r.corrected for r in turn_ok]),
+            "ttft_ms": summarize_latencies([r.ttft for r in turn_ok if r.ttft is not None]),
+        })
+
+    return {
+        "params": {
+            "students": args.students,
+            "rate": args.rate,
+            "turns": args.turns,
+            "think_ms": args.think_ms,
+            "slo_ms": args.slo_ms,
+            "stream": args.stream,
+            "seed": args.seed,
+        },
+        "requests": len(load.results),
+        "errors": len(load.results) - len(ok),
+        "wall_time_s": round(load.wall_time, 2),
+        "throughput_rps": round(len(load.results) / load.wall_time, 2) if load.wall_time else 0.0,
+        "peak_students": load.peak_students,
+        "latency_ms": summarize_latencies([r.elapsed for r in ok]),
+        "corrected_latency_ms": summarize_latencies([r.corrected for r in ok]),
+        "ttft_ms": summarize_latencies([r.ttft for r in ok if r.ttft is not None]),
+        "corrected_ttft_ms": summarize_latencies([r.corrected_ttft for r in ok if r.corrected_ttft is not None]),
+        "by_turn": by_turn,
+        "top_errors": Counter(r.error for r in load.results if r.error).most_common(3),
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    params = report["params"]
+    print("\n=== Resumo ===")
+    print(
+        f"Alunos: {params['students']} (chegada {params['rate']}/s, pico de "
+        f"{report['peak_students']} simultaneos), {params['turns']} turnos cada"
+    )
+    print(
+        f"Requisicoes: {report['requests']} em {report['wall_time_s']:.1f} s "
+        f"({report['throughput_rps']:.2f} req/s), falhas: {report['errors']}"
+    )
+
+    print(f"\n{'latencia (ms)':<18} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    rows = [("bruta", "latency_ms"), ("corrigida", "corrected_latency_ms"),
+            ("ttft bruto", "ttft_ms"), ("ttft corrigido", "corrected_ttft_ms")]
+    for label, key in rows:
+        stats = report[key]
+        if stats:
+            print(f"{label:<18} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f}")
+
+    print(f"\n{'turno':<6} {'req':>5} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p95 corr':>9} {'ttft p95':>9}")
+    for turn in report["by_turn"]:
+        latency = turn["latency_ms"] or {}
+        corrected = turn["corrected_latency_ms"] or {}
+        ttft = turn["ttft_ms"].get("p95") if turn["ttft_ms"] else None
+        print(
+            f"{turn['turn']:<6} {turn['requests']:>5} {turn['errors']:>6} "
+            f"{latency.get('p50', 0):>9.1f} {latency.get('p95', 0):>9.1f} "
+            f"{corrected.get('p95', 0):>9.1f} {ttft if ttft is not None else '-':>9}"
+        )
+
+    if report["top_errors"]:
+        print("\nPrincipais erros:")
+        for error, count in report["top_errors"]:
+            print(f" - {count}x {error}")
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Envia muitas mensagens para o endpoint de chat."
+        description="Gerador de carga em malha aberta: alunos em consultas de varios turnos."
     )
     parser.add_argument(
         "--base-url",
@@ -259,33 +515,67 @@ def parse_args() -> argparse.Namespace:
         help=f"URL do endpoint (default: {DEFAULT_URL})",
     )
     parser.add_argument(
-        "--total",
+        "--students",
         type=int,
-        default=15,
-        help="Quantidade total de mensagens a serem enviadas.",
+        default=20,
+        help="Quantidade de alunos (uma sessao cada).",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0,
+        help="Taxa media de chegada de alunos por segundo (processo de Poisson).",
     )
     parser.add_argument(
-        "--switch-every",
+        "--turns",
         type=int,
-        default=3,
-        help="Numero de mensagens antes de gerar um novo UUID.",
+        default=5,
+        help="Mensagens enviadas por cada aluno na consulta.",
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=float,
+        default=3000.0,
+        help="Tempo medio (exponencial) entre receber a resposta e enviar a proxima mensagem.",
     )
     parser.add_argument(
-        "--pause",
+        "--slo-ms",
         type=float,
-        default=0.0,
-        help="Intervalo (em segundos) entre cada requisicao.",
+        default=5000.0,
+        help="Tempo de resposta esperado; o excedente atrasa o plano dos turnos seguintes.",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=100,
+        help="Limite de conexoes HTTP simultaneas do cliente (0 = sem limite).",
     )
     parser.add_argument(
         "--timeout",
         type=float,
-        default=30.0,
+        default=60.0,
         help="Tempo limite individual por requisicao em segundos.",
     )
     parser.add_argument(
-        "--quiet",
+        "--stream",
         action="store_true",
-        help="Nao exibe o log detalhado de cada requisicao.",
+        help="Usa o endpoint SSE (/stream) e mede o tempo ate o primeiro token.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Semente das chegadas, tempos de reflexao e mensagens.",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Grava o relatorio JSON neste arquivo.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Exibe o log detalhado de cada requisicao.",
     )
     return parser.parse_args()
 
@@ -293,24 +583,38 @@ def parse_args() -> argparse.Namespace:
 async def async_main() -> None:
     args = parse_args()
 
-    if args.total <= 0:
-        raise ValueError("--total deve ser maior que zero")
-    if args.switch_every <= 0:
-        raise ValueError("--switch-every deve ser maior que zero")
-
-    results = await run_stress_test(
-        total_requests=args.total,
+    if args.students <= 0:
+        raise ValueError("--students deve ser maior que zero")
+    if args.rate <= 0:
+        raise ValueError("--rate deve ser maior que zero")
+    if args.turns <= 0:
+        raise ValueError("--turns deve ser maior que zero")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    load = await run_load_test(
+        students=args.students,
+        rate=args.rate,
+        turns=args.turns,
+        think_time=args.think_ms / 1000,
+        slo=args.slo_ms / 1000,
         url=args.base_url,
-        change_session_every=args.switch_every,
-        pause=args.pause,
         timeout=args.timeout,
+        stream=args.stream,
+        connections=args.connections,
     )
 
-    if not args.quiet:
-        for result in results:
+    if args.verbose:
+        for result in load.results:
             print_request_log(result)
 
-    summarize(results)
+    report = build_report(load, args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"\nRelatorio gravado em {args.output}")
 
 
 def main() -> None:
@@ -322,4 +626,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-
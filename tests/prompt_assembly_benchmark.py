@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da montagem de prompts por turno (roteador + agente de
+sintomas), com historicos de tamanhos realistas, comparando:
+
+- legacy: cada hop renderiza o historico em texto e monta o prompt inteiro
+  de novo (prefixo estatico + dados do paciente + historico), sem cache;
+- cached: prompt de sistema compilado por perfil de paciente (LRU) e
+  historico enviado como mensagens, recortado da lista mantida pela sessao.
+
+Nao chama nenhum LLM nem o Redis; mede apenas o trabalho de CPU do turno.
+
+Exemplo de uso:
+    python -m tests.prompt_assembly_benchmark --turns 5000 --history 10 40 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+from time import perf_counter
+from typing import Callable, List
+
+from src.Domain.Chatbot.Agents.RouterAgent.RouterAgentConfig import GET_ROUTER_PROMPT
+from src.Domain.Chatbot.Agents.SintomasAgent.SintomasAgentConfig import (
+    GET_SINTOMAS_PROMPT,
+    _compile_patient_prompt,
+)
+from src.Infrastructure.Cache.ChatSession import ChatSession
+
+SYMPTOMS = [
+    "febre alta ha tres dias",
+    "dor atras dos olhos",
+    "manchas vermelhas na pele",
+    "dor nas articulacoes",
+    "cansaco intenso",
+    "nausea",
+]
+DISEASE = "dengue"
+
+
+def build_session(size: int, message: str) -> ChatSession:
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "message": f"{message} {i}"}
+        for i in range(size)
+    ]
+    session = ChatSession("bench", symptom_list=list(SYMPTOMS), disease=DISEASE, history=history)
+    session.add_message("user", "Doutor, o que eu tenho?")
+    return session
+
+
+# Secao de historico que os prompts antigos anexavam ao system prompt
+LEGACY_HISTORY_SECTION = """
+HISTORICO RECENTE DA CONSULTA (mais antigo no topo):
+{history}
+---
+"""
+
+
+def legacy_turn(session: ChatSession, window: int) -> List[str]:
+    # Reproduz o fluxo antigo: o historico vira texto e cada agente renderiza
+    # o prompt inteiro, sem nenhum cache
+    recent = session.history[-window:]
+    conversation_history = "\n".join(
+        f"{entry['role'].upper()}: {entry['message']}" for entry in recent
+    )
+    history_section = LEGACY_HISTORY_SECTION.format(history=conversation_history)
+    _compile_patient_prompt.cache_clear()
+    prompts = (
+        GET_ROUTER_PROMPT(),
+        GET_SINTOMAS_PROMPT(symptom_list=session.symptom_list, disease=session.disease),
+    )
+    return [f"{prompt}{history_section}" for prompt in prompts]
+
+
+def cached_turn(session: ChatSession, window: int) -> None:
+    session.context_messages(window)
+    GET_ROUTER_PROMPT()
+    GET_SINTOMAS_PROMPT(symptom_list=session.symptom_list, disease=session.disease)
+
+
+def measure(turn: Callable[[ChatSession, int], object], session: ChatSession, window: int, turns: int) -> List[float]:
+    latencies: List[float] = []
+    for _ in range(turns):
+        started = perf_counter()
+        turn(session, window)
+        latencies.append((perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+def describe(name: str, latencies: List[float]) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(
+        f"{name:<8} media={statistics.mean(latencies):8.2f} us  "
+        f"p50={statistics.median(latencies):8.2f} us  p99={p99:8.2f} us"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da montagem de prompts por turno.")
+    parser.add_argument("--turns", type=int, default=5000, help="Turnos medidos por cenario.")
+    parser.add_argument(
+        "--history",
+        type=int,
+        nargs="+",
+        default=[10, 40, 100],
+        help="Tamanhos de historico (mensagens) avaliados.",
+    )
+    parser.add_argument("--window", type=int, default=40, help="Janela de historico enviada ao LLM.")
+    parser.add_argument("--message-size", type=int, default=120, help="Tamanho de cada mensagem.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    message = ("x" * args.message_size)[: args.message_size]
+
+    for size in args.history:
+        session = build_session(size, message)
+        print(f"\n=== {args.turns} turnos, historico={size}, janela={args.window} ===")
+        legacy = measure(legacy_turn, session, args.window, args.turns)
+        cached = measure(cached_turn, session, args.window, args.turns)
+        describe("legacy", legacy)
+        describe("cached", cached)
+        print(f"ganho: {statistics.mean(legacy) / statistics.mean(cached):.1f}x")
+
+    print(f"\nCache de perfis: {_compile_patient_prompt.cache_info()}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nExecucao interrompida pelo usuario.")
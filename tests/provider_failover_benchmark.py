@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Mede o efeito do provedor composto (HedgedLlm) quando o provedor primario
+tem cauda de latencia ou falhas, comparando:
+
+- single: so o primario (OpenAI), como antes;
+- hedged: primario + Gemini de secundario, com hedge no percentil de
+  latencia, failover em erros e circuit breaker por provedor.
+
+Sobe dois tests/fake_llm_server.py: o primario com as falhas e a cauda
+injetadas (--primary-error-rate, --primary-slow-rate) e o secundario
+saudavel. Nenhuma chamada real e feita.
+
+Exemplo de uso:
+    python -m tests.provider_failover_benchmark --sessions 32 --turns 10 \\
+        --primary-slow-rate 0.05 --primary-error-rate 0.02
+    # Queda total do primario: o circuito abre e tudo vai para o secundario
+    python -m tests.provider_failover_benchmark --primary-error-rate 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from time import perf_counter
+from typing import List
+
+from tests.llm_concurrency_benchmark import FAKE_API_KEY, percentile, wait_for_server
+
+PRIMARY_PORT = 8997
+SECONDARY_PORT = 8998
+
+
+@dataclass
+class ModeResult:
+    mode: str
+    calls: int
+    errors: int
+    wall_time: float
+    p50: float
+    p95: float
+    p99: float
+
+
+def start_fake_server(port: int, args: argparse.Namespace, primary: bool) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "tests.fake_llm_server",
+        "--port",
+        str(port),
+        "--latency-ms",
+        str(args.latency_ms),
+        "--jitter-ms",
+        str(args.jitter_ms),
+    ]
+    if primary:
+        command += [
+            "--error-rate",
+            str(args.primary_error_rate),
+            "--slow-rate",
+            str(args.primary_slow_rate),
+            "--slow-latency-ms",
+            str(args.primary_slow_latency_ms),
+        ]
+    return subprocess.Popen(command)
+
+
+def build_resolver(hedged: bool):
+    from src.Infrastructure.Llm.DefaultLlmProviderResolver import DefaultLlmProviderResolver
+
+    if not hedged:
+        return DefaultLlmProviderResolver(hedge_provider="")
+    return DefaultLlmProviderResolver(hedge_provider="gemini", hedge_model="fake-model")
+
+
+async def run_mode(mode: str, sessions: int, turns: int) -> ModeResult:
+    from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig
+
+    resolver = build_resolver(hedged=mode == "hedged")
+    config = LlmConfig(model="fake-model", max_completion_tokens=256)
+    latencies: List[float] = []
+    errors = 0
+
+    async def session(session_index: int) -> None:
+        nonlocal errors
+        for turn in range(turns):
+            llm = resolver.resolve("gpt", config, "Voce e um paciente.")
+            started = perf_counter()
+            try:
+                await llm.process(f"Sessao {session_index}, pergunta {turn}: o que sente?")
+                latencies.append(perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    wall_time = perf_counter() - started
+
+    return ModeResult(
+        mode=mode,
+        calls=len(latencies),
+        errors=errors,
+        wall_time=wall_time,
+        p50=statistics.median(latencies) if latencies else 0.0,
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+    )
+
+
+def print_results(results: List[ModeResult]) -> None:
+    print(f"{'modo':<8} {'chamadas':>9} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'tempo s':>8}")
+    for r in results:
+        print(
+            f"{r.mode:<8} {r.calls:>9} {r.errors:>6} {r.p50 * 1000:>9.1f} "
+            f"{r.p95 * 1000:>9.1f} {r.p99 * 1000:>9.1f} {r.wall_time:>8.1f}"
+        )
+
+
+def print_hedge_metrics() -> None:
+    from src.SharedKernel.Metrics.Metrics import get_metrics_registry
+
+    registry = get_metrics_registry()
+    for name in ("llm_hedge_total", "llm_circuit_transitions_total"):
+        print(f"\n=== {name} ===")
+        for labels, value in sorted(registry.counter(name).samples(), key=lambda s: sorted(s[0].items())):
+            described = ", ".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            print(f"{described}: {int(value)}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark de hedge/failover entre provedores LLM (servidores falsos)."
+    )
+    parser.add_argument("--sessions", type=int, default=16, help="Sessoes concorrentes.")
+    parser.add_argument("--turns", type=int, default=10, help="Chamadas por sessao.")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--primary-error-rate", type=float, default=0.02)
+    parser.add_argument("--primary-slow-rate", type=float, default=0.05)
+    parser.add_argument("--primary-slow-latency-ms", type=float, default=3000.0)
+    parser.add_argument(
+        "--hedge-delay-ms",
+        type=float,
+        default=None,
+        help="Atraso do hedge enquanto nao ha amostras (LLM_HEDGE_DEFAULT_DELAY_MS).",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["single", "hedged"],
+        default=["single", "hedged"],
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> None:
+    args = parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", FAKE_API_KEY)
+    os.environ.setdefault("GEMINI_API_KEY", FAKE_API_KEY)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PRIMARY_PORT}/v1"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{SECONDARY_PORT}"
+    if args.hedge_delay_ms is not None:
+        os.environ["LLM_HEDGE_DEFAULT_DELAY_MS"] = str(args.hedge_delay_ms)
+
+    servers: List[subprocess.Popen] = [
+        start_fake_server(PRIMARY_PORT, args, primary=True),
+        start_fake_server(SECONDARY_PORT, args, primary=False),
+    ]
+    try:
+        await wait_for_server(f"http://127.0.0.1:{PRIMARY_PORT}")
+        await wait_for_server(f"http://127.0.0.1:{SECONDARY_PORT}")
+
+        results = [await run_mode(mode, args.sessions, args.turns) for mode in args.modes]
+        print_results(results)
+        if "hedged" in args.modes:
+            print_hedge_metrics()
+    finally:
+        from src.Infrastructure.Llm.LlmClientRegistry import close_llm_client_registry
+
+        await close_llm_client_registry()
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    try:
+        asyncio.run(async_main())
+    except KeyboardInterrupt:
+        print("\nExecucao interrompida pelo usuario.")
+
+
+if __name__ == "__main__":
+    main()
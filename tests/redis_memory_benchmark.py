@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da memoria do chat contra um Redis local, comparando:
+
+- legacy: formato antigo, com GET + json.loads + append + json.dumps + SET do
+  JSON inteiro da sessao a cada mensagem (O(historico) e sujeito a perda de
+  mensagens com escritas concorrentes);
+- list: ChatMemoryStore atual (RPUSH + LTRIM + EXPIRE em uma transacao).
+
+Tambem dispara appends concorrentes na mesma sessao e conta quantas mensagens
+foram perdidas em cada formato.
+
+Exemplo de uso:
+    REDIS_URL=redis://localhost:6379/15 python -m tests.redis_memory_benchmark --ops 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Awaitable, Callable, List
+from uuid import uuid4
+
+from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+from src.Infrastructure.Cache.RedisClient import close_redis_client, get_redis_client
+
+KEY_PREFIX = "bench:chat:session:"
+
+
+class LegacyJsonMemory:
+    """Reproduz o append_history antigo (read-modify-write do JSON)."""
+
+    def __init__(self, redis_client, max_history_entries: int):
+        self._redis = redis_client
+        self._max_history_entries = max_history_entries
+
+    def _key(self, session_id: str) -> str:
+        return f"{KEY_PREFIX}legacy:{session_id}"
+
+    async def seed(self, session_id: str, history: List[dict]) -> None:
+        data = {"symptom_list": ["febre"], "disease": "dengue", "history": history}
+        await self._redis.set(self._key(session_id), json.dumps(data))
+
+    async def append_history(self, session_id: str, role: str, message: str) -> None:
+        key = self._key(session_id)
+        raw_data = await self._redis.get(key)
+        data = json.loads(raw_data) if raw_data else {"history": []}
+        history = data.get("history") or []
+        history.append(
+            {
+                "role": role,
+                "message": message,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        data["history"] = history[-self._max_history_entries :]
+        await self._redis.set(key, json.dumps(data))
+
+    async def history_length(self, session_id: str) -> int:
+        raw_data = await self._redis.get(self._key(session_id))
+        return len(json.loads(raw_data)["history"]) if raw_data else 0
+
+
+def build_history(size: int, message: str) -> List[dict]:
+    timestamp = datetime.now(timezone.utc).isoformat()
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "message": message, "timestamp": timestamp}
+        for i in range(size)
+    ]
+
+
+async def measure(
+    append: Callable[[str, str, str], Awaitable[object]],
+    session_id: str,
+    ops: int,
+    message: str,
+) -> List[float]:
+    latencies: List[float] = []
+    for i in range(ops):
+        started = perf_counter()
+        await append(session_id, "user" if i % 2 == 0 else "assistant", message)
+        latencies.append(perf_counter() - started)
+    return latencies
+
+
+async def lost_messages(
+    append: Callable[[str, str, str], Awaitable[object]],
+    length: Callable[[str], Awaitable[int]],
+    concurrent: int,
+) -> int:
+    session_id = str(uuid4())
+    await asyncio.gather(
+        *(append(session_id, "user", f"mensagem {i}") for i in range(concurrent))
+    )
+    return concurrent - await length(session_id)
+
+
+def describe(name: str, latencies: List[float]) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{name:<8} media={statistics.mean(latencies) * 1e6:8.1f} us "
+        f"p50={statistics.median(latencies) * 1e6:8.1f} us "
+        f"p99={p99 * 1e6:8.1f} us"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compara o append de historico antigo (JSON) com o baseado em listas."
+    )
+    parser.add_argument("--ops", type=int, default=1000, help="Appends medidos por formato.")
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=50,
+        help="Entradas previamente gravadas na sessao (e limite do historico).",
+    )
+    parser.add_argument(
+        "--message-size",
+        type=int,
+        default=400,
+        help="Tamanho de cada mensagem em caracteres.",
+    )
+    parser.add_argument(
+        "--concurrent",
+        type=int,
+        default=50,
+        help="Appends simultaneos na mesma sessao para o teste de perda.",
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> None:
+    args = parse_args()
+    redis_client = get_redis_client()
+    message = "x" * args.message_size
+
+    legacy = LegacyJsonMemory(redis_client, max_history_entries=args.history)
+    store = ChatMemoryStore(key_prefix=KEY_PREFIX, max_history_entries=args.history)
+
+    try:
+        legacy_session = str(uuid4())
+        await legacy.seed(legacy_session, build_history(args.history, message))
+        store_session = str(uuid4())
+        await store.save_memory(
+            store_session,
+            symptom_list=["febre"],
+            disease="dengue",
+            history=build_history(args.history, message),
+        )
+
+        print(f"=== {args.ops} appends, historico={args.history}, mensagem={args.message_size} chars ===")
+        describe("legacy", await measure(legacy.append_history, legacy_session, args.ops, message))
+        describe("list", await measure(store.append_history, store_session, args.ops, message))
+
+        unbounded = ChatMemoryStore(key_prefix=KEY_PREFIX, max_history_entries=0)
+        legacy_unbounded = LegacyJsonMemory(redis_client, max_history_entries=args.concurrent)
+        print(f"\n=== {args.concurrent} appends concorrentes na mesma sessao ===")
+        print(
+            "legacy   mensagens perdidas:",
+            await lost_messages(
+                legacy_unbounded.append_history, legacy_unbounded.history_length, args.concurrent
+            ),
+        )
+        print(
+            "list     mensagens perdidas:",
+            await lost_messages(
+                unbounded.append_history,
+                lambda session_id: redis_client.llen(unbounded._history_key(session_id)),
+                args.concurrent,
+            ),
+        )
+    finally:
+        async for key in redis_client.scan_iter(match=f"{KEY_PREFIX}*"):
+            await redis_client.delete(key)
+        await close_redis_client()
+
+
+def main() -> None:
+    try:
+        asyncio.run(async_main())
+    except KeyboardInterrupt:
+        print("\nExecucao interrompida pelo usuario.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Avaliacao offline do roteador em camadas: repete mensagens ja roteadas e
+compara cada tier local (regras e modelo Naive Bayes) com a decisao do
+roteador LLM, reportando cobertura (quanto cada tier decide acima do limiar)
+e concordancia com o LLM.
+
+Fontes de mensagens:
+- --log: JSONL gravado pela API com ROUTER_DECISION_LOG_PATH (as decisoes
+  com tier "llm" sao o gabarito);
+- --redis: conversas guardadas no Redis; cada mensagem do medico e
+  reclassificada pelo RouterAgent real (--llm-type) para gerar o gabarito.
+
+Com --train-model, treina o modelo local com parte das amostras e avalia no
+restante (--holdout).
+
+Exemplos de uso:
+    python -m tests.router_tier_evaluation --log router_decisions.jsonl
+    python -m tests.router_tier_evaluation --log router_decisions.jsonl \
+        --train-model router_model.json --holdout 0.2
+    REDIS_URL=redis://localhost:6379/0 python -m tests.router_tier_evaluation \
+        --redis --max-sessions 50 --llm-type gpt
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.Domain.Chatbot.Routing.IntentClassifier import ROUTER_LABELS, IntentClassifier
+from src.Domain.Chatbot.Routing.KeywordIntentClassifier import KeywordIntentClassifier
+from src.Domain.Chatbot.Routing.NaiveBayesIntentClassifier import NaiveBayesIntentClassifier
+from src.Domain.Chatbot.Routing.TieredIntentRouter import TieredIntentRouter
+from src.Domain.Interfaces.Llm.LlmInterface import LlmMessage
+from src.Infrastructure.Routing.RouterDecisionLog import RouterDecisionLog
+
+
+@dataclass
+class Sample:
+    message: str
+    conversation_history: str
+    label: str
+
+    @property
+    def is_first_turn(self) -> bool:
+        # O historico gravado ja inclui a propria mensagem do medico
+        return len(self.conversation_history.splitlines()) <= 1
+
+
+@dataclass
+class TierReport:
+    name: str
+    total: int
+    decided: int
+    agreed: int
+    confusion: Counter
+
+    @property
+    def coverage(self) -> float:
+        return self.decided / self.total if self.total else 0.0
+
+    @property
+    def agreement(self) -> float:
+        return self.agreed / self.decided if self.decided else 0.0
+
+
+def load_from_log(path: str) -> List[Sample]:
+    return [
+        Sample(
+            message=entry.get("message") or "",
+            conversation_history=entry.get("conversation_history") or "",
+            label=entry.get("label") or "",
+        )
+        for entry in RouterDecisionLog.read(path)
+        if entry.get("tier") == "llm" and entry.get("label") in ROUTER_LABELS
+    ]
+
+
+async def load_from_redis(max_sessions: int, llm_type: str, concurrency: int) -> List[Sample]:
+    from src.Domain.Factories.AgentFactory import AgentFactory
+    from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+    from src.Infrastructure.Cache.RedisClient import close_redis_client, get_redis_client
+    from src.Infrastructure.Llm.DefaultLlmProviderResolver import DefaultLlmProviderResolver
+    from src.Infrastructure.Llm.LlmClientRegistry import close_llm_client_registry
+
+    store = ChatMemoryStore()
+    factory = AgentFactory(llm_provider_resolver=DefaultLlmProviderResolver())
+    redis_client = get_redis_client()
+    prefix = store._key_prefix
+    history_suffix = ChatMemoryStore.HISTORY_SUFFIX
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def label_with_llm(
+        message: str,
+        history: List[LlmMessage],
+        conversation_history: str,
+    ) -> Optional[Sample]:
+        async with semaphore:
+            agent = factory.create_agent(agent_type="router", llm_type=llm_type)
+            response = await agent.generate_response(message, history)
+        label = (response.next_agent or "").strip().lower()
+        if label not in ROUTER_LABELS:
+            return None
+        return Sample(message=message, conversation_history=conversation_history, label=label)
+
+    try:
+        session_ids: List[str] = []
+        async for key in redis_client.scan_iter(match=f"{prefix}*{history_suffix}"):
+            session_ids.append(key[len(prefix) : -len(history_suffix)])
+            if len(session_ids) >= max_sessions:
+                break
+
+        pending = []
+        for session_id in session_ids:
+            history = await store.get_history(session_id)
+            lines: List[str] = []
+            messages: List[LlmMessage] = []
+            for entry in history:
+                role = entry.get("role") or "user"
+                content = entry.get("message") or ""
+                lines.append(f"{role.upper()}: {content}")
+                if role == "user":
+                    pending.append(label_with_llm(content, list(messages), "\n".join(lines)))
+                messages.append(LlmMessage(role=role, content=content))
+
+        print(f"Reclassificando {len(pending)} mensagens de {len(session_ids)} sessoes com o LLM...")
+        results = await asyncio.gather(*pending)
+        return [sample for sample in results if sample is not None]
+    finally:
+        await close_redis_client()
+        await close_llm_client_registry()
+
+
+def evaluate(name: str, classifier, samples: List[Sample], threshold: float) -> TierReport:
+    decided = agreed = 0
+    confusion: Counter = Counter()
+    for sample in samples:
+        prediction = classifier.classify(sample.message, is_first_turn=sample.is_first_turn)
+        if prediction is None or prediction.confidence < threshold:
+            continue
+        decided += 1
+        agreed += prediction.label == sample.label
+        confusion[(sample.label, prediction.label)] += 1
+    return TierReport(name=name, total=len(samples), decided=decided, agreed=agreed, confusion=confusion)
+
+
+def print_report(reports: List[TierReport], samples: List[Sample]) -> None:
+    distribution = Counter(sample.label for sample in samples)
+    print(f"\n=== {len(samples)} amostras | gabarito do LLM: {dict(distribution)} ===")
+    print(f"{'tier':<10} {'decide':>8} {'cobertura':>10} {'concorda':>10}")
+    for report in reports:
+        print(
+            f"{report.name:<10} {report.decided:>8} {report.coverage * 100:>9.1f}% "
+            f"{report.agreement * 100:>9.1f}%"
+        )
+
+    for report in reports:
+        disagreements = {
+            f"{expected}->{predicted}": count
+            for (expected, predicted), count in report.confusion.most_common()
+            if expected != predicted
+        }
+        if disagreements:
+            print(f"\nDivergencias do tier {report.name} (llm->local): {disagreements}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compara os tiers locais do roteador com as decisoes do roteador LLM."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--log", help="JSONL de decisoes gravado pela API.")
+    source.add_argument(
+        "--redis",
+        action="store_true",
+        help="Repete conversas do Redis, rotulando com o RouterAgent real.",
+    )
+    parser.add_argument("--max-sessions", type=int, default=100, help="Sessoes lidas do Redis.")
+    parser.add_argument("--llm-type", default="gpt", help="Provedor do RouterAgent (gpt/gemini).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Chamadas simultaneas ao LLM.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="Limiar de confianca (padrao: ROUTER_CONFIDENCE_THRESHOLD ou 0.85).",
+    )
+    parser.add_argument("--model", help="Modelo Naive Bayes existente para avaliar.")
+    parser.add_argument("--train-model", help="Treina e grava um modelo Naive Bayes neste caminho.")
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=0.2,
+        help="Fracao das amostras reservada para avaliar o modelo treinado.",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+async def async_main() -> None:
+    args = parse_args()
+
+    if args.log:
+        samples = load_from_log(args.log)
+    else:
+        samples = await load_from_redis(args.max_sessions, args.llm_type, args.concurrency)
+
+    if not samples:
+        print("Nenhuma decisao do roteador LLM encontrada.")
+        return
+
+    classifiers: Dict[str, IntentClassifier] = {"keyword": KeywordIntentClassifier()}
+    evaluation_samples = samples
+
+    if args.train_model:
+        shuffled = list(samples)
+        random.Random(args.seed).shuffle(shuffled)
+        split = int(len(shuffled) * (1 - args.holdout))
+        training, evaluation_samples = shuffled[:split], shuffled[split:] or shuffled
+        model = NaiveBayesIntentClassifier.train((s.message, s.label) for s in training)
+        model.save(args.train_model)
+        print(f"Modelo treinado com {len(training)} amostras e gravado em {args.train_model}")
+        classifiers["model"] = model
+    elif args.model:
+        classifiers["model"] = NaiveBayesIntentClassifier.load(args.model)
+
+    router = TieredIntentRouter(
+        list(classifiers.values()),
+        confidence_threshold=args.threshold,
+        enabled=True,
+    )
+    reports = [
+        evaluate(name, classifier, evaluation_samples, router.confidence_threshold)
+        for name, classifier in classifiers.items()
+    ]
+    reports.append(evaluate("tiered", router, evaluation_samples, router.confidence_threshold))
+    print_report(reports, evaluation_samples)
+
+
+def main() -> None:
+    try:
+        asyncio.run(async_main())
+    except KeyboardInterrupt:
+        print("\nExecucao interrompida pelo usuario.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import pytest
+
+from src.SharedKernel.Metrics.Metrics import MetricsRegistry
+from tests.unit.stubs import FakeClock
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def metrics() -> MetricsRegistry:
+    """Registro novo por teste, para os contadores nao vazarem entre testes."""
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,87 @@
+import asyncio
+from typing import AsyncIterator, List, Optional, Sequence
+
+from src.Domain.Interfaces.Llm.LlmInterface import LlmConfig, LlmInterface, LlmMessage, LlmResponse
+
+
+class StubLlm(LlmInterface):
+    """
+    LLM falso para os testes. Responde ``reply`` (ou os ``chunks`` no
+    streaming) depois de ``gate`` ser liberado, se houver, ou de ``delay``
+    segundos; com ``error`` a chamada falha.
+
+    Conta as chamadas (``calls``), as canceladas no meio (``cancelled``) e
+    os streams abandonados antes do fim (``closed``).
+    """
+
+    def __init__(
+        self,
+        reply: str = "ok",
+        *,
+        model: str = "stub-model",
+        delay: float = 0.0,
+        error: Optional[Exception] = None,
+        chunks: Optional[List[str]] = None,
+    ):
+        super().__init__(LlmConfig(model=model, max_completion_tokens=64), "system prompt")
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.chunks = chunks or [reply]
+        self.gate: Optional[asyncio.Event] = None
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    async def _wait(self) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+        elif self.delay:
+            await asyncio.sleep(self.delay)
+
+    async def process(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> LlmResponse:
+        self.calls += 1
+        try:
+            await self._wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        self.last_usage = {"prompt_tokens": 10, "completion_tokens": 5}
+        return LlmResponse(message=self.reply, payload={"usage": self.last_usage})
+
+    async def stream(
+        self,
+        message: str,
+        history: Optional[Sequence[LlmMessage]] = None,
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        try:
+            await self._wait()
+            if self.error is not None:
+                raise self.error
+            for chunk in self.chunks:
+                yield chunk
+                await asyncio.sleep(0)
+            self.last_usage = {"prompt_tokens": 10, "completion_tokens": len(self.chunks)}
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except GeneratorExit:
+            self.closed += 1
+            raise
+
+
+class FakeClock:
+    """Relogio controlado pelo teste (``now`` em segundos)."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
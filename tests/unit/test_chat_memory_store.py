@@ -0,0 +1,118 @@
+import fakeredis
+import pytest
+
+from src.Infrastructure.Cache.ChatMemoryStore import ChatMemoryStore
+
+pytestmark = pytest.mark.anyio
+
+SESSION_ID = "sessao-1"
+
+
+@pytest.fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+def build_store(server: fakeredis.FakeServer) -> ChatMemoryStore:
+    return ChatMemoryStore(redis_client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+
+@pytest.fixture
+def store(server) -> ChatMemoryStore:
+    return build_store(server)
+
+
+async def seed(store: ChatMemoryStore, count: int) -> None:
+    for index in range(count):
+        await store.append_history(SESSION_ID, "user" if index % 2 == 0 else "assistant", f"mensagem {index}")
+
+
+def append_during_summary(store: ChatMemoryStore, other: ChatMemoryStore, times: int) -> None:
+    """
+    Faz um turno concorrente (append por outra conexao) logo depois de cada
+    leitura vigiada do save_summary, ``times`` vezes.
+    """
+    client = store._redis
+    create_pipeline = client.pipeline
+    remaining = [times]
+
+    def pipeline(*args, **kwargs):
+        pipe = create_pipeline(*args, **kwargs)
+        read_head = pipe.lrange
+
+        async def racing_lrange(*lrange_args):
+            head = await read_head(*lrange_args)
+            if remaining[0]:
+                remaining[0] -= 1
+                await other.append_history(SESSION_ID, "user", f"concorrente {remaining[0]}")
+            return head
+
+        def lrange(*lrange_args):
+            # Fora do WATCH o comando so entra no buffer da pipeline
+            if not pipe.watching:
+                return read_head(*lrange_args)
+            return racing_lrange(*lrange_args)
+
+        pipe.lrange = lrange
+        return pipe
+
+    client.pipeline = pipeline
+
+
+async def test_save_summary_trims_the_summarized_entries(store):
+    await seed(store, 6)
+    _, summarized = await store.load_summary_source(SESSION_ID, 4)
+
+    assert await store.save_summary(SESSION_ID, "resumo", summarized)
+
+    summary, _ = await store.load_summary_source(SESSION_ID, 1)
+    history = await store.get_history(SESSION_ID)
+    assert summary == "resumo"
+    assert [entry["message"] for entry in history] == ["mensagem 4", "mensagem 5"]
+
+
+async def test_concurrent_append_makes_save_summary_retry(server, store):
+    await seed(store, 6)
+    _, summarized = await store.load_summary_source(SESSION_ID, 4)
+    append_during_summary(store, build_store(server), times=1)
+
+    assert await store.save_summary(SESSION_ID, "resumo", summarized)
+
+    # A primeira tentativa caiu no WatchError; a segunda ja ve o append
+    history = await store.get_history(SESSION_ID)
+    assert [entry["message"] for entry in history] == ["mensagem 4", "mensagem 5", "concorrente 0"]
+
+
+async def test_save_summary_backs_off_while_the_history_keeps_changing(server, store):
+    await seed(store, 6)
+    _, summarized = await store.load_summary_source(SESSION_ID, 4)
+    append_during_summary(store, build_store(server), times=ChatMemoryStore.SUMMARY_WRITE_ATTEMPTS)
+
+    assert not await store.save_summary(SESSION_ID, "resumo", summarized)
+
+    summary, _ = await store.load_summary_source(SESSION_ID, 1)
+    history = await store.get_history(SESSION_ID)
+    assert summary is None
+    assert len(history) == 6 + ChatMemoryStore.SUMMARY_WRITE_ATTEMPTS
+    assert history[0]["message"] == "mensagem 0"
+
+
+async def test_save_summary_only_trims_what_is_still_at_the_head(server, store):
+    await seed(store, 6)
+    _, summarized = await store.load_summary_source(SESSION_ID, 4)
+    # Enquanto o LLM resumia, o LTRIM de outro turno tirou as duas primeiras
+    await store._redis.ltrim(store._history_key(SESSION_ID), 2, -1)
+
+    assert await store.save_summary(SESSION_ID, "resumo", summarized)
+
+    history = await store.get_history(SESSION_ID)
+    assert [entry["message"] for entry in history] == ["mensagem 4", "mensagem 5"]
+
+
+async def test_save_summary_is_dropped_when_the_head_no_longer_matches(store):
+    await seed(store, 6)
+    _, summarized = await store.load_summary_source(SESSION_ID, 4)
+    await store._redis.lset(store._history_key(SESSION_ID), 0, '{"role": "user", "message": "outra"}')
+
+    assert not await store.save_summary(SESSION_ID, "resumo", summarized)
+    assert len(await store.get_history(SESSION_ID)) == 6
@@ -0,0 +1,63 @@
+from src.Infrastructure.Llm.CircuitBreaker import CircuitBreaker
+
+
+def test_breaker_opens_after_consecutive_failures(metrics, clock):
+    breaker = CircuitBreaker("gpt", failure_threshold=2, reset_timeout=30, clock=clock, metrics=metrics)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_lets_a_single_probe_through(metrics, clock):
+    breaker = CircuitBreaker("gpt", failure_threshold=1, reset_timeout=30, clock=clock, metrics=metrics)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 29.9
+    assert not breaker.allow()
+
+    clock.now = 30.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    transitions = metrics.counter("llm_circuit_transitions_total")
+    assert [transitions.value(provider="gpt", state=state) for state in ("open", "half_open", "closed")] == [1, 1, 1]
+
+
+def test_breaker_failed_probe_reopens_the_circuit(metrics, clock):
+    breaker = CircuitBreaker("gpt", failure_threshold=3, reset_timeout=30, clock=clock, metrics=metrics)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 30.0
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now = 60.0
+    assert breaker.allow()
+
+
+def test_breaker_released_probe_can_be_retried(metrics, clock):
+    breaker = CircuitBreaker("gpt", failure_threshold=1, reset_timeout=30, clock=clock, metrics=metrics)
+    breaker.record_failure()
+    clock.now = 30.0
+    assert breaker.allow()
+
+    # A chamada de teste foi cancelada (ex.: perdeu o hedge): outra pode tentar
+    breaker.release()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
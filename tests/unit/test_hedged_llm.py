@@ -0,0 +1,159 @@
+import asyncio
+from time import perf_counter
+
+import pytest
+
+from src.Infrastructure.Llm.CircuitBreaker import CircuitBreaker
+from src.Infrastructure.Llm.HedgedLlm import HedgedLlm, HedgingPolicy
+from src.Infrastructure.Llm.MeteredLlm import MeteredLlm
+from src.SharedKernel.Messages.Exceptions import ProviderUnavailableError
+from src.SharedKernel.Tracing.Tracer import Tracer
+from tests.unit.stubs import StubLlm
+
+pytestmark = pytest.mark.anyio
+
+HEDGE_DELAY = 0.05
+
+
+@pytest.fixture
+def policy(metrics, clock) -> HedgingPolicy:
+    # min_samples alto: o atraso do hedge fica fixo em HEDGE_DELAY
+    return HedgingPolicy(
+        default_delay=HEDGE_DELAY,
+        min_samples=1000,
+        breaker_factory=lambda name: CircuitBreaker(
+            name, failure_threshold=2, reset_timeout=30, clock=clock, metrics=metrics
+        ),
+        metrics=metrics,
+    )
+
+
+def hedged(primary: StubLlm, secondary: StubLlm, policy: HedgingPolicy) -> HedgedLlm:
+    return HedgedLlm(primary, secondary, primary_name="gpt", secondary_name="gemini", policy=policy)
+
+
+async def test_fast_primary_does_not_fire_the_hedge(policy):
+    primary, secondary = StubLlm("primario"), StubLlm("secundario")
+
+    response = await hedged(primary, secondary, policy).process("oi")
+
+    assert response.message == "primario"
+    assert secondary.calls == 0
+
+
+async def test_hedge_fires_after_the_delay_and_cancels_the_loser(policy, metrics):
+    primary = StubLlm("primario", delay=1.0)
+    secondary = StubLlm("secundario", model="backup-model")
+    llm = hedged(primary, secondary, policy)
+
+    started = perf_counter()
+    response = await llm.process("oi")
+    elapsed = perf_counter() - started
+
+    assert response.message == "secundario"
+    assert HEDGE_DELAY <= elapsed < 1.0
+    assert primary.cancelled == 1
+    assert (llm.last_provider, llm.last_model) == ("gemini", "backup-model")
+    assert llm.last_usage == secondary.last_usage
+    # O perdedor cancelado nao conta como falha do provedor
+    assert policy.breaker("gpt").state == CircuitBreaker.CLOSED
+    assert metrics.counter("llm_hedge_total").value(provider="gemini", outcome="hedge") == 1
+
+
+async def test_stream_hedge_closes_the_losing_stream(policy):
+    primary = StubLlm(delay=1.0, chunks=["lento"])
+    secondary = StubLlm(chunks=["rapido ", "e ", "completo"])
+    llm = hedged(primary, secondary, policy)
+
+    chunks = [chunk async for chunk in llm.stream("oi")]
+
+    assert chunks == ["rapido ", "e ", "completo"]
+    assert primary.cancelled == 1
+    assert secondary.closed == 0
+    assert llm.last_provider == "gemini"
+
+
+async def test_stream_consumer_leaving_early_closes_the_winner(policy):
+    primary = StubLlm(chunks=["um ", "dois ", "tres"])
+    llm = hedged(primary, StubLlm(), policy)
+
+    chunks = llm.stream("oi")
+    assert await chunks.__anext__() == "um "
+    await chunks.aclose()
+
+    assert primary.closed == 1
+
+
+async def test_primary_error_fails_over_to_the_secondary(policy, metrics):
+    primary = StubLlm(error=RuntimeError("500"))
+    secondary = StubLlm("secundario")
+
+    response = await hedged(primary, secondary, policy).process("oi")
+
+    assert response.message == "secundario"
+    assert metrics.counter("llm_hedge_total").value(provider="gemini", outcome="failover") == 1
+
+
+async def test_open_circuit_skips_the_primary(policy, metrics):
+    primary = StubLlm(error=RuntimeError("500"))
+    secondary = StubLlm("secundario")
+    llm = hedged(primary, secondary, policy)
+    for _ in range(2):
+        await llm.process("oi")
+    assert policy.breaker("gpt").state == CircuitBreaker.OPEN
+
+    response = await llm.process("oi")
+
+    assert response.message == "secundario"
+    assert primary.calls == 2
+    assert metrics.counter("llm_hedge_total").value(provider="gemini", outcome="circuit_open") == 1
+
+
+async def test_half_open_primary_gets_a_single_probe(policy, clock):
+    primary = StubLlm("primario", error=RuntimeError("500"))
+    secondary = StubLlm("secundario")
+    llm = hedged(primary, secondary, policy)
+    for _ in range(2):
+        await llm.process("oi")
+
+    clock.now = 30.0
+    primary.error, primary.delay = None, HEDGE_DELAY / 5
+    responses = await asyncio.gather(llm.process("oi"), hedged(primary, secondary, policy).process("oi"))
+
+    # So uma das chamadas simultaneas testa o primario; a outra vai ao secundario
+    assert sorted(response.message for response in responses) == ["primario", "secundario"]
+    assert primary.calls == 3
+    assert policy.breaker("gpt").state == CircuitBreaker.CLOSED
+
+
+async def test_both_circuits_open_raises_provider_unavailable(policy):
+    for name in ("gpt", "gemini"):
+        breaker = policy.breaker(name)
+        breaker.record_failure()
+        breaker.record_failure()
+
+    with pytest.raises(ProviderUnavailableError):
+        await hedged(StubLlm(), StubLlm(), policy).process("oi")
+
+
+async def test_metered_llm_labels_calls_with_the_provider_that_served_them(policy, metrics):
+    primary = StubLlm("primario", delay=1.0)
+    secondary = StubLlm("secundario", model="backup-model")
+    llm = MeteredLlm(
+        hedged(primary, secondary, policy),
+        agent_type="sintomas",
+        provider="gpt",
+        metrics=metrics,
+        tracer=Tracer(enabled=False, exporters=[]),
+    )
+
+    await llm.process("oi")
+    assert [chunk async for chunk in llm.stream("oi")] == ["secundario"]
+
+    served = {"agent": "sintomas", "provider": "gemini", "model": "backup-model"}
+    assert metrics.histogram("agent_llm_latency_seconds").count(outcome="ok", **served) == 2
+    assert metrics.histogram("agent_llm_first_token_seconds").count(**served) == 1
+    assert metrics.counter("agent_llm_completion_tokens_total").value(**served) == 6
+    assert metrics.histogram("agent_llm_latency_seconds").count(
+        outcome="ok", agent="sintomas", provider="gpt", model="stub-model"
+    ) == 0
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from src.Infrastructure.Llm.SingleFlightLlm import SingleFlightGroup, SingleFlightLlm
+from tests.unit.stubs import StubLlm
+
+pytestmark = pytest.mark.anyio
+
+
+async def settle() -> None:
+    """Deixa as tarefas pendentes chegarem ao proximo ponto de espera."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def group(metrics) -> SingleFlightGroup:
+    return SingleFlightGroup(metrics=metrics)
+
+
+async def test_followers_receive_the_leader_result(group, metrics):
+    llm = StubLlm("resposta")
+    llm.gate = asyncio.Event()
+    callers = [SingleFlightLlm(llm, group=group, provider="gpt") for _ in range(3)]
+
+    tasks = [asyncio.create_task(caller.process("oi")) for caller in callers]
+    await settle()
+    llm.gate.set()
+    responses = await asyncio.gather(*tasks)
+
+    assert llm.calls == 1
+    assert [response.message for response in responses] == ["resposta"] * 3
+    # So o lider carrega o usage; os demais sao marcados como aproveitados
+    assert responses[0].payload["usage"] == {"prompt_tokens": 10, "completion_tokens": 5}
+    assert callers[0].last_usage is not None
+    assert all(response.payload == {"coalesced": True} for response in responses[1:])
+    assert all(caller.last_usage is None for caller in callers[1:])
+
+    requests = metrics.counter("llm_single_flight_total")
+    assert requests.value(provider="gpt", role="leader") == 1
+    assert requests.value(provider="gpt", role="coalesced") == 2
+    assert group.in_flight == 0
+
+
+async def test_followers_receive_the_leader_error(group):
+    llm = StubLlm(error=RuntimeError("provedor fora do ar"))
+    llm.gate = asyncio.Event()
+    callers = [SingleFlightLlm(llm, group=group, provider="gpt") for _ in range(3)]
+
+    tasks = [asyncio.create_task(caller.process("oi")) for caller in callers]
+    await settle()
+    llm.gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert llm.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert {str(result) for result in results} == {"provedor fora do ar"}
+    assert group.in_flight == 0
+
+
+async def test_different_requests_are_not_coalesced(group):
+    llm = StubLlm()
+    caller = SingleFlightLlm(llm, group=group, provider="gpt")
+
+    await asyncio.gather(caller.process("oi"), caller.process("tudo bem?"))
+
+    assert llm.calls == 2
+
+
+async def test_cancelling_one_waiter_keeps_the_request_for_the_others(group):
+    llm = StubLlm("resposta")
+    llm.gate = asyncio.Event()
+    caller = SingleFlightLlm(llm, group=group, provider="gpt")
+
+    leaving = asyncio.create_task(caller.process("oi"))
+    staying = asyncio.create_task(caller.process("oi"))
+    await settle()
+    leaving.cancel()
+    await asyncio.gather(leaving, return_exceptions=True)
+    llm.gate.set()
+
+    assert leaving.cancelled()
+    assert (await staying).message == "resposta"
+    assert llm.calls == 1
+    assert llm.cancelled == 0
+
+
+async def test_last_waiter_leaving_cancels_the_request(group):
+    llm = StubLlm()
+    llm.gate = asyncio.Event()
+    caller = SingleFlightLlm(llm, group=group, provider="gpt")
+
+    tasks = [asyncio.create_task(caller.process("oi")) for _ in range(2)]
+    await settle()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await settle()
+
+    assert llm.cancelled == 1
+    assert group.in_flight == 0
+
+    # A chave foi liberada: a proxima chamada faz uma requisicao nova
+    llm.gate.set()
+    assert (await caller.process("oi")).message == "ok"
+    assert llm.calls == 2
+
+
+async def test_stream_subscriber_leaving_early_does_not_stop_the_others(group):
+    llm = StubLlm(chunks=["um ", "dois ", "tres"])
+    llm.gate = asyncio.Event()
+    caller = SingleFlightLlm(llm, group=group, provider="gpt")
+
+    async def read_first_chunk() -> str:
+        chunks = caller.stream("oi")
+        try:
+            return await chunks.__anext__()
+        finally:
+            await chunks.aclose()
+
+    async def read_all() -> list:
+        return [chunk async for chunk in caller.stream("oi")]
+
+    early = asyncio.create_task(read_first_chunk())
+    full = asyncio.create_task(read_all())
+    await settle()
+    llm.gate.set()
+
+    assert await early == "um "
+    assert await full == ["um ", "dois ", "tres"]
+    assert llm.calls == 1
+    assert llm.closed == 0
+    assert group.in_flight == 0
+
+
+async def test_stream_last_subscriber_leaving_closes_the_provider_stream(group):
+    llm = StubLlm(chunks=["um ", "dois ", "tres"])
+    caller = SingleFlightLlm(llm, group=group, provider="gpt")
+
+    chunks = caller.stream("oi")
+    assert await chunks.__anext__() == "um "
+    await chunks.aclose()
+    await settle()
+
+    assert llm.cancelled + llm.closed == 1
+    assert group.in_flight == 0